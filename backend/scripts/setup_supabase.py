@@ -1,8 +1,9 @@
 """
 Setup script for Supabase database schema and functions.
 """
-from supabase import create_client, Client
-from typing import List
+from typing import Optional
+
+from supabase import Client, create_client
 
 SCHEMA_SQL = """
 -- Enable necessary extensions
@@ -23,17 +24,7 @@ CREATE TABLE IF NOT EXISTS topics (
     metadata JSONB DEFAULT '{}'::jsonb
 );
 
-CREATE TABLE IF NOT EXISTS summaries (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    topic_id UUID REFERENCES topics(id) ON DELETE CASCADE,
-    content TEXT NOT NULL,
-    metadata JSONB DEFAULT '{}'::jsonb,
-    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    source_url TEXT,
-    source_type TEXT,
-    sentiment TEXT,
-    key_concepts TEXT[]
-);
+-- @summaries_table
 
 CREATE TABLE IF NOT EXISTS topic_embeddings (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -48,6 +39,8 @@ CREATE INDEX IF NOT EXISTS idx_topics_keywords ON topics USING GIN (keywords);
 CREATE INDEX IF NOT EXISTS idx_topics_metadata ON topics USING GIN (metadata);
 CREATE INDEX IF NOT EXISTS idx_summaries_topic_id ON summaries(topic_id);
 CREATE INDEX IF NOT EXISTS idx_summaries_created_at ON summaries(created_at);
+-- Keyset pagination over a topic's summaries walks (created_at, id).
+CREATE INDEX IF NOT EXISTS idx_summaries_topic_created_id ON summaries(topic_id, created_at, id);
 CREATE INDEX IF NOT EXISTS idx_topic_embeddings_topic_id ON topic_embeddings(topic_id);
 CREATE INDEX IF NOT EXISTS idx_topic_embeddings_embedding ON topic_embeddings USING ivfflat (embedding vector_cosine_ops);
 
@@ -76,6 +69,22 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+CREATE OR REPLACE FUNCTION store_embeddings_batch(
+    p_rows jsonb
+) RETURNS SETOF UUID AS $$
+BEGIN
+    -- p_rows is an array of {"topic_id", "embedding", "metadata"} objects.
+    RETURN QUERY
+    INSERT INTO topic_embeddings (topic_id, embedding, metadata)
+    SELECT
+        (r->>'topic_id')::uuid,
+        (r->>'embedding')::vector,
+        COALESCE(r->'metadata', '{}'::jsonb)
+    FROM jsonb_array_elements(p_rows) AS r
+    RETURNING id;
+END;
+$$ LANGUAGE plpgsql;
+
 CREATE OR REPLACE FUNCTION search_similar_content(
     query_embedding vector,
     similarity_threshold float DEFAULT 0.8,
@@ -128,11 +137,519 @@ CREATE POLICY "Users can delete their own topics"
 -- Similar policies for summaries and embeddings
 """
 
+SUMMARIES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS summaries (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    topic_id UUID REFERENCES topics(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    source_url TEXT,
+    source_type TEXT,
+    sentiment TEXT,
+    key_concepts TEXT[]
+);
+
+-- Bulk ingest upserts on (topic_id, source_url); NULL source URLs never conflict.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_summaries_topic_source_url ON summaries(topic_id, source_url);
+"""
+
+# Range-partitioned by created_at. Unique keys must include the partition key, so
+# the primary key is (id, created_at) and upserts conflict on
+# (topic_id, source_url, created_at); set SupabaseConfig.partitioned_summaries.
+PARTITIONED_SUMMARIES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS summaries (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    topic_id UUID REFERENCES topics(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    source_url TEXT,
+    source_type TEXT,
+    sentiment TEXT,
+    key_concepts TEXT[],
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside every created partition so inserts never fail.
+CREATE TABLE IF NOT EXISTS summaries_default PARTITION OF summaries DEFAULT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_summaries_topic_source_url
+    ON summaries(topic_id, source_url, created_at);
+
+-- Publish changes under the parent table name so realtime subscribers still see "summaries".
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+        ALTER PUBLICATION supabase_realtime SET (publish_via_partition_root = true);
+    END IF;
+END;
+$$;
+"""
+
+RETENTION_SQL = """
+-- Create the partitions covering the current period and the next p_ahead periods.
+-- Rows already in the default partition for a new range are moved into it.
+CREATE OR REPLACE FUNCTION ensure_summary_partitions(
+    p_interval text DEFAULT 'month',
+    p_ahead integer DEFAULT 3,
+    p_from timestamptz DEFAULT NOW()
+) RETURNS SETOF text AS $$
+DECLARE
+    v_step interval := ('1 ' || p_interval)::interval;
+    v_start timestamptz := date_trunc(p_interval, p_from);
+    v_default regclass := to_regclass('summaries_default');
+    v_name text;
+    v_move boolean;
+BEGIN
+    FOR i IN 0..p_ahead LOOP
+        v_name := format('summaries_p%s', to_char(v_start, 'YYYYMMDD'));
+        IF to_regclass(v_name) IS NULL THEN
+            v_move := false;
+            IF v_default IS NOT NULL THEN
+                EXECUTE format(
+                    'SELECT EXISTS (SELECT 1 FROM %s WHERE created_at >= %L AND created_at < %L)',
+                    v_default, v_start, v_start + v_step
+                ) INTO v_move;
+            END IF;
+            -- Postgres rejects a new partition while the default partition holds
+            -- rows of its range, so detach the default until they are moved.
+            IF v_move THEN
+                EXECUTE format('ALTER TABLE summaries DETACH PARTITION %s', v_default);
+            END IF;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF summaries FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_start, v_start + v_step
+            );
+            IF v_move THEN
+                -- Statements on partitions skip the statement-level rollup
+                -- triggers on summaries, so the rollups are left as they are.
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %s WHERE created_at >= %L AND created_at < %L'
+                    ' RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                    v_default, v_start, v_start + v_step, v_name
+                );
+                EXECUTE format('ALTER TABLE summaries ATTACH PARTITION %s DEFAULT', v_default);
+            END IF;
+            RETURN NEXT v_name;
+        END IF;
+        v_start := v_start + v_step;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop (or detach) every summaries partition that lies entirely before p_cutoff.
+-- Returns nothing on a non-partitioned table.
+CREATE OR REPLACE FUNCTION drop_summary_partitions(
+    p_cutoff timestamptz,
+    p_detach boolean DEFAULT false
+) RETURNS SETOF text AS $$
+DECLARE
+    v_part record;
+BEGIN
+    FOR v_part IN
+        SELECT
+            c.oid::regclass::text AS name,
+            (regexp_match(
+                pg_get_expr(c.relpartbound, c.oid), 'TO [(]''([^'']+)''[)]'
+            ))[1]::timestamptz AS upper_bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'summaries'::regclass
+    LOOP
+        IF v_part.upper_bound IS NOT NULL AND v_part.upper_bound <= p_cutoff THEN
+            IF p_detach THEN
+                EXECUTE format('ALTER TABLE summaries DETACH PARTITION %s', v_part.name);
+            ELSE
+                EXECUTE format('DROP TABLE %s', v_part.name);
+            END IF;
+            -- Dropping a partition bypasses the rollup triggers.
+            DELETE FROM topic_daily_rollups
+            WHERE day < (v_part.upper_bound AT TIME ZONE 'UTC')::date;
+            RETURN NEXT v_part.name;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Delete at most p_batch_size summaries older than p_cutoff, oldest first.
+-- Each call is its own short transaction, so locks are held briefly.
+CREATE OR REPLACE FUNCTION delete_summaries_before(
+    p_cutoff timestamptz,
+    p_batch_size integer DEFAULT 5000
+) RETURNS integer AS $$
+DECLARE
+    v_deleted integer;
+BEGIN
+    DELETE FROM summaries
+    WHERE (id, created_at) IN (
+        SELECT id, created_at
+        FROM summaries
+        WHERE created_at < p_cutoff
+        ORDER BY created_at
+        LIMIT p_batch_size
+    );
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+JOBS_SQL = """
+-- Durable work queue shared by every worker node.
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    dedupe_key TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'done', 'dead')),
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(priority, run_after) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_jobs_leases ON jobs(lease_expires_at) WHERE status = 'running';
+
+-- p_jobs is an array of {"kind", "payload", "dedupe_key", "priority", "run_after",
+-- "max_attempts"} objects. Jobs whose dedupe_key already exists are skipped.
+CREATE OR REPLACE FUNCTION enqueue_jobs(p_jobs jsonb) RETURNS SETOF UUID AS $$
+BEGIN
+    RETURN QUERY
+    INSERT INTO jobs (kind, payload, dedupe_key, priority, run_after, max_attempts)
+    SELECT
+        j->>'kind',
+        COALESCE(j->'payload', '{}'::jsonb),
+        j->>'dedupe_key',
+        COALESCE((j->>'priority')::integer, 0),
+        COALESCE((j->>'run_after')::timestamptz, NOW()),
+        COALESCE((j->>'max_attempts')::integer, 5)
+    FROM jsonb_array_elements(p_jobs) AS j
+    ON CONFLICT (dedupe_key) DO NOTHING
+    RETURNING id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Lease up to p_limit ready jobs to p_worker. SKIP LOCKED lets any number of
+-- workers dequeue concurrently without blocking on each other's rows. Jobs
+-- whose lease expired (their worker died) are picked up again, or dead-lettered
+-- once they have used all their attempts.
+CREATE OR REPLACE FUNCTION dequeue_jobs(
+    p_worker TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_lease_seconds INTEGER DEFAULT 60,
+    p_kinds TEXT[] DEFAULT NULL
+) RETURNS SETOF jobs AS $$
+BEGIN
+    UPDATE jobs
+    SET status = 'dead', locked_by = NULL, lease_expires_at = NULL,
+        last_error = COALESCE(last_error, 'lease expired')
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE status = 'running' AND lease_expires_at < NOW() AND attempts >= max_attempts
+        FOR UPDATE SKIP LOCKED
+    );
+
+    RETURN QUERY
+    UPDATE jobs
+    SET status = 'running',
+        locked_by = p_worker,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = attempts + 1
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE (
+            (status = 'queued' AND run_after <= NOW())
+            OR (status = 'running' AND lease_expires_at < NOW())
+        )
+        AND (p_kinds IS NULL OR kind = ANY(p_kinds))
+        ORDER BY priority, run_after
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Extend the leases p_worker still holds; returns the ids it still owns.
+CREATE OR REPLACE FUNCTION heartbeat_jobs(
+    p_worker TEXT,
+    p_ids UUID[],
+    p_lease_seconds INTEGER DEFAULT 60
+) RETURNS SETOF UUID AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE jobs
+    SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id = ANY(p_ids) AND locked_by = p_worker AND status = 'running'
+    RETURNING id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION complete_jobs(p_worker TEXT, p_ids UUID[]) RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE jobs
+    SET status = 'done', completed_at = NOW(), locked_by = NULL, lease_expires_at = NULL
+    WHERE id = ANY(p_ids) AND locked_by = p_worker AND status = 'running';
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Requeue a failed job with jittered exponential backoff, or dead-letter it
+-- once it has used all its attempts. Returns the job's new status.
+CREATE OR REPLACE FUNCTION fail_job(
+    p_worker TEXT,
+    p_id UUID,
+    p_error TEXT,
+    p_base_delay_seconds DOUBLE PRECISION DEFAULT 5,
+    p_max_delay_seconds DOUBLE PRECISION DEFAULT 3600,
+    p_retry BOOLEAN DEFAULT true
+) RETURNS TEXT AS $$
+DECLARE
+    v_status TEXT;
+BEGIN
+    UPDATE jobs
+    SET status = CASE WHEN p_retry AND attempts < max_attempts THEN 'queued' ELSE 'dead' END,
+        run_after = NOW() + make_interval(secs =>
+            LEAST(p_max_delay_seconds, p_base_delay_seconds * power(2, attempts - 1))
+            * (0.5 + random() / 2)),
+        last_error = p_error,
+        locked_by = NULL,
+        lease_expires_at = NULL
+    WHERE id = p_id AND locked_by = p_worker AND status = 'running'
+    RETURNING status INTO v_status;
+    RETURN v_status;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Put dead-lettered jobs back on the queue with fresh attempts.
+CREATE OR REPLACE FUNCTION requeue_dead_jobs(p_kind TEXT DEFAULT NULL) RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE jobs
+    SET status = 'queued', attempts = 0, run_after = NOW()
+    WHERE status = 'dead' AND (p_kind IS NULL OR kind = p_kind);
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION job_queue_stats() RETURNS TABLE (
+    kind TEXT,
+    status TEXT,
+    count BIGINT
+) AS $$
+    SELECT kind, status, count(*) FROM jobs GROUP BY kind, status;
+$$ LANGUAGE sql;
+"""
+
+
+def schema_sql(partition_interval: Optional[str] = None) -> str:
+    """Return the schema, with ``summaries`` range-partitioned if an interval is given."""
+    summaries = PARTITIONED_SUMMARIES_TABLE_SQL if partition_interval else SUMMARIES_TABLE_SQL
+    return SCHEMA_SQL.replace("-- @summaries_table", summaries.strip())
+
+
+# Per-topic, per-day aggregates kept current by statement-level triggers on
+# summaries, so dashboard reads cost O(days) instead of O(summaries).
+ROLLUPS_SQL = """
+CREATE TABLE IF NOT EXISTS topic_daily_rollups (
+    topic_id UUID NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    summary_count INTEGER NOT NULL DEFAULT 0,
+    source_count INTEGER NOT NULL DEFAULT 0,
+    source_type_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    sentiment_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    concept_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (topic_id, day)
+);
+
+-- Add two {key: count} objects, dropping keys whose total is not positive.
+CREATE OR REPLACE FUNCTION jsonb_add_counts(a JSONB, b JSONB) RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+    FROM (
+        SELECT key, sum(value::bigint) AS total
+        FROM (
+            SELECT key, value FROM jsonb_each_text(COALESCE(a, '{}'::jsonb))
+            UNION ALL
+            SELECT key, value FROM jsonb_each_text(COALESCE(b, '{}'::jsonb))
+        ) e
+        GROUP BY key
+    ) t
+    WHERE total > 0;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE AGGREGATE jsonb_sum_counts(JSONB) (
+    SFUNC = jsonb_add_counts,
+    STYPE = JSONB,
+    INITCOND = '{}'
+);
+
+-- Add (p_sign = 1) or subtract (p_sign = -1) summary rows, given as a JSON
+-- array of objects with the summaries columns, from their topic's daily rollups.
+CREATE OR REPLACE FUNCTION apply_summary_rollups(p_rows JSONB, p_sign INTEGER) RETURNS void AS $$
+BEGIN
+    WITH changed AS (
+        SELECT r.topic_id, (r.created_at AT TIME ZONE 'UTC')::date AS day,
+               r.source_url, r.source_type, r.sentiment, r.key_concepts
+        FROM jsonb_to_recordset(COALESCE(p_rows, '[]'::jsonb)) AS r(
+            topic_id UUID, created_at TIMESTAMPTZ, source_url TEXT,
+            source_type TEXT, sentiment TEXT, key_concepts TEXT[]
+        )
+        WHERE r.topic_id IS NOT NULL
+    ),
+    totals AS (
+        SELECT topic_id, day, count(*) * p_sign AS summaries, count(source_url) * p_sign AS sources
+        FROM changed GROUP BY topic_id, day
+    ),
+    source_types AS (
+        SELECT topic_id, day, jsonb_object_agg(source_type, n) AS counts
+        FROM (
+            SELECT topic_id, day, COALESCE(source_type, 'unknown') AS source_type,
+                   count(*) * p_sign AS n
+            FROM changed GROUP BY 1, 2, 3
+        ) g GROUP BY topic_id, day
+    ),
+    sentiments AS (
+        SELECT topic_id, day, jsonb_object_agg(sentiment, n) AS counts
+        FROM (
+            SELECT topic_id, day, sentiment, count(*) * p_sign AS n
+            FROM changed WHERE sentiment IS NOT NULL GROUP BY 1, 2, 3
+        ) g GROUP BY topic_id, day
+    ),
+    concepts AS (
+        SELECT topic_id, day, jsonb_object_agg(concept, n) AS counts
+        FROM (
+            SELECT topic_id, day, concept, count(*) * p_sign AS n
+            FROM changed, unnest(key_concepts) AS concept GROUP BY 1, 2, 3
+        ) g GROUP BY topic_id, day
+    )
+    INSERT INTO topic_daily_rollups AS t (
+        topic_id, day, summary_count, source_count,
+        source_type_counts, sentiment_counts, concept_counts
+    )
+    SELECT totals.topic_id, totals.day, totals.summaries, totals.sources,
+           COALESCE(source_types.counts, '{}'), COALESCE(sentiments.counts, '{}'),
+           COALESCE(concepts.counts, '{}')
+    FROM totals
+    LEFT JOIN source_types USING (topic_id, day)
+    LEFT JOIN sentiments USING (topic_id, day)
+    LEFT JOIN concepts USING (topic_id, day)
+    ON CONFLICT (topic_id, day) DO UPDATE SET
+        summary_count = t.summary_count + EXCLUDED.summary_count,
+        source_count = t.source_count + EXCLUDED.source_count,
+        source_type_counts = jsonb_add_counts(t.source_type_counts, EXCLUDED.source_type_counts),
+        sentiment_counts = jsonb_add_counts(t.sentiment_counts, EXCLUDED.sentiment_counts),
+        concept_counts = jsonb_add_counts(t.concept_counts, EXCLUDED.concept_counts),
+        updated_at = NOW();
+
+    IF p_sign < 0 THEN
+        DELETE FROM topic_daily_rollups t
+        USING (
+            SELECT DISTINCT r.topic_id, (r.created_at AT TIME ZONE 'UTC')::date AS day
+            FROM jsonb_to_recordset(COALESCE(p_rows, '[]'::jsonb))
+                AS r(topic_id UUID, created_at TIMESTAMPTZ)
+        ) touched
+        WHERE t.topic_id = touched.topic_id
+        AND t.day = touched.day
+        AND t.summary_count <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level trigger: one rollup upsert per (topic, day) per statement,
+-- however many rows a bulk insert or upsert writes.
+CREATE OR REPLACE FUNCTION rollup_summary_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_summary_rollups(
+            (SELECT jsonb_agg(jsonb_build_object(
+                'topic_id', topic_id, 'created_at', created_at, 'source_url', source_url,
+                'source_type', source_type, 'sentiment', sentiment, 'key_concepts', key_concepts
+            )) FROM old_rows),
+            -1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_summary_rollups(
+            (SELECT jsonb_agg(jsonb_build_object(
+                'topic_id', topic_id, 'created_at', created_at, 'source_url', source_url,
+                'source_type', source_type, 'sentiment', sentiment, 'key_concepts', key_concepts
+            )) FROM new_rows),
+            1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS rollup_summaries_insert ON summaries;
+CREATE TRIGGER rollup_summaries_insert
+    AFTER INSERT ON summaries REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_summary_changes();
+
+DROP TRIGGER IF EXISTS rollup_summaries_update ON summaries;
+CREATE TRIGGER rollup_summaries_update
+    AFTER UPDATE ON summaries REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_summary_changes();
+
+DROP TRIGGER IF EXISTS rollup_summaries_delete ON summaries;
+CREATE TRIGGER rollup_summaries_delete
+    AFTER DELETE ON summaries REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_summary_changes();
+
+-- Recompute rollups from summaries, one topic at a time; run once after
+-- installing the triggers on existing data.
+CREATE OR REPLACE FUNCTION rebuild_topic_rollups(p_topic_id UUID DEFAULT NULL) RETURNS integer AS $$
+DECLARE
+    v_topic UUID;
+    v_days integer := 0;
+    v_count integer;
+BEGIN
+    FOR v_topic IN
+        SELECT id FROM topics WHERE p_topic_id IS NULL OR id = p_topic_id
+    LOOP
+        DELETE FROM topic_daily_rollups WHERE topic_id = v_topic;
+        PERFORM apply_summary_rollups(
+            (SELECT jsonb_agg(jsonb_build_object(
+                'topic_id', topic_id, 'created_at', created_at, 'source_url', source_url,
+                'source_type', source_type, 'sentiment', sentiment, 'key_concepts', key_concepts
+            )) FROM summaries WHERE topic_id = v_topic),
+            1
+        );
+        SELECT count(*) INTO v_count FROM topic_daily_rollups WHERE topic_id = v_topic;
+        v_days := v_days + v_count;
+    END LOOP;
+    RETURN v_days;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
 FUNCTIONS_SQL = """
 -- Additional utility functions
+-- Replaces the two-argument version, which re-aggregated every summary in the window.
+DROP FUNCTION IF EXISTS get_topic_summary(UUID, integer);
+
+-- Concepts, dominant sentiment and source count come from the daily rollups of
+-- the last p_days_back days (today included, UTC); the text joins only the
+-- p_max_summaries most recent summaries.
 CREATE OR REPLACE FUNCTION get_topic_summary(
     p_topic_id UUID,
-    p_days_back integer DEFAULT 7
+    p_days_back integer DEFAULT 7,
+    p_max_summaries integer DEFAULT 20
 ) RETURNS TABLE (
     summary_text TEXT,
     key_concepts TEXT[],
@@ -141,38 +658,78 @@ CREATE OR REPLACE FUNCTION get_topic_summary(
 ) AS $$
 BEGIN
     RETURN QUERY
+    WITH totals AS (
+        SELECT
+            COALESCE(sum(r.source_count), 0)::integer AS sources,
+            jsonb_sum_counts(r.concept_counts) AS concepts,
+            jsonb_sum_counts(r.sentiment_counts) AS sentiments
+        FROM topic_daily_rollups r
+        WHERE r.topic_id = p_topic_id
+        AND r.day > (NOW() AT TIME ZONE 'UTC')::date - p_days_back
+    )
     SELECT
-        string_agg(s.content, E'\n\n' ORDER BY s.created_at DESC) as summary_text,
-        array_agg(DISTINCT unnest(s.key_concepts)) as key_concepts,
-        mode() WITHIN GROUP (ORDER BY s.sentiment) as sentiment,
-        count(DISTINCT s.source_url) as source_count
-    FROM summaries s
-    WHERE s.topic_id = p_topic_id
-    AND s.created_at >= NOW() - (p_days_back || ' days')::interval;
+        (
+            SELECT string_agg(recent.content, E'\n\n' ORDER BY recent.created_at DESC)
+            FROM (
+                SELECT s.content, s.created_at
+                FROM summaries s
+                WHERE s.topic_id = p_topic_id
+                AND s.created_at >= NOW() - (p_days_back || ' days')::interval
+                ORDER BY s.created_at DESC
+                LIMIT p_max_summaries
+            ) recent
+        ),
+        ARRAY(
+            SELECT c.key FROM jsonb_each_text(t.concepts) c
+            ORDER BY c.value::bigint DESC, c.key
+        ),
+        (
+            SELECT m.key FROM jsonb_each_text(t.sentiments) m
+            ORDER BY m.value::bigint DESC, m.key
+            LIMIT 1
+        ),
+        t.sources
+    FROM totals t;
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql STABLE;
 """
 
-async def setup_database(client: Client):
-    """Setup the Supabase database schema and functions."""
+async def setup_database(client: Client, partition_interval: Optional[str] = None):
+    """Setup the Supabase database schema and functions.
+
+    Args:
+        client: Supabase client.
+        partition_interval: ``day`` or ``month`` to range-partition ``summaries``
+            by ``created_at``; None keeps a plain table.
+    """
     try:
         # Execute schema SQL
-        await client.postgrest.connection().execute(SCHEMA_SQL)
+        await client.postgrest.connection().execute(schema_sql(partition_interval))
         print("✅ Schema created successfully")
 
-        # Execute functions SQL
+        # Execute functions SQL (rollups first: get_topic_summary reads them)
+        await client.postgrest.connection().execute(ROLLUPS_SQL)
         await client.postgrest.connection().execute(FUNCTIONS_SQL)
+        await client.postgrest.connection().execute(RETENTION_SQL)
+        await client.postgrest.connection().execute(JOBS_SQL)
         print("✅ Functions created successfully")
 
+        if partition_interval:
+            await client.postgrest.connection().execute(
+                f"SELECT ensure_summary_partitions('{partition_interval}', 3);"
+            )
+            print(f"✅ Summary partitions created ({partition_interval})")
+
     except Exception as e:
         print(f"❌ Error setting up database: {str(e)}")
         raise
 
 if __name__ == "__main__":
     import asyncio
-    from dotenv import load_dotenv
     import os
 
+    from dotenv import load_dotenv
+
     load_dotenv()
 
     supabase_url = os.getenv("SUPABASE_URL")
@@ -181,5 +738,9 @@ if __name__ == "__main__":
     if not all([supabase_url, supabase_key]):
         raise ValueError("Missing Supabase credentials")
 
+    partition_interval = os.getenv("SUMMARIES_PARTITION_INTERVAL") or None
+    if partition_interval not in (None, "day", "month"):
+        raise ValueError("SUMMARIES_PARTITION_INTERVAL must be 'day' or 'month'")
+
     client = create_client(supabase_url, supabase_key)
-    asyncio.run(setup_database(client)) 
\ No newline at end of file
+    asyncio.run(setup_database(client, partition_interval)) 
\ No newline at end of file
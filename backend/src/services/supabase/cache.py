@@ -0,0 +1,99 @@
+"""
+Async read-through cache for Supabase queries.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+def _retrieve_exception(task: "asyncio.Task[Any]") -> None:
+    # Mark the exception retrieved in case every caller was cancelled.
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncTTLCache:
+    """LRU cache with a TTL and single-flight loading for async loaders.
+
+    Concurrent misses for the same key share one loader call. Invalidating a key
+    detaches its in-flight load: later misses start a fresh load, and the old
+    one finishes for the callers already waiting on it without being stored.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not None
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del self._data[key]
+            return None
+        return entry
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, loading it on a miss."""
+        entry = self._lookup(key)
+        if entry is not None:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            # The load runs in its own task, so cancelling one caller does not
+            # cancel it for the others sharing it.
+            task = asyncio.ensure_future(self._load(key, loader))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+            # Not stored if the key was invalidated while loading.
+            if self._inflight.get(key) is task:
+                self._store(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop ``key`` and detach any load for it that is in flight."""
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key matching ``predicate`` and return how many were cached."""
+        keys = [key for key in list(self._data) + list(self._inflight) if predicate(key)]
+        cached = sum(1 for key in keys if key in self._data)
+        for key in keys:
+            self.invalidate(key)
+        return cached
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        for key in list(self._data) + list(self._inflight):
+            self.invalidate(key)
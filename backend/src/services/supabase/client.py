@@ -1,13 +1,24 @@
 """
 Supabase client service for database operations and real-time subscriptions.
 """
-from typing import List, Dict, Optional, Any
+import asyncio
+import inspect
 from datetime import datetime, timedelta
-from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-from supabase import create_client, Client
-from supabase.lib.client_options import ClientOptions
+import httpx
+from postgrest.types import ReturnMethod
 from pydantic import BaseModel
+from supabase import AsyncClient, AsyncClientOptions
+
+from topic_insights.metrics import timed_query
+
+from .cache import AsyncTTLCache
+
+# Ranked topic ids fetched per query, as a multiple of ``limit``, when a text
+# index search has filters that only the database can apply.
+_SEARCH_OVERFETCH = 4
+
 
 class SupabaseConfig(BaseModel):
     url: str
@@ -16,38 +27,210 @@ class SupabaseConfig(BaseModel):
     schema: str = "public"
     auto_refresh_token: bool = True
     persist_session: bool = True
+    cache_ttl: float = 60.0
+    cache_size: int = 1000
+    # Set when ``summaries`` is range-partitioned by created_at (see setup_supabase.py).
+    partitioned_summaries: bool = False
+
+
+def _after_cursor(query: Any, after: Tuple[str, str], descending: bool = False) -> Any:
+    """Restrict a query ordered by (created_at, id) to rows past a keyset cursor."""
+    created_at, row_id = after
+    op = 'lt' if descending else 'gt'
+    return query.or_(
+        f'created_at.{op}."{created_at}",'
+        f'and(created_at.eq."{created_at}",id.{op}.{row_id})'
+    )
+
 
 class SupabaseService:
-    def __init__(self, config: SupabaseConfig):
-        options = ClientOptions(
+    def __init__(
+        self,
+        config: SupabaseConfig,
+        vector_index: Optional[Any] = None,
+        client: Optional[AsyncClient] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        text_index: Optional[Any] = None
+    ):
+        """Initialize the service.
+
+        Args:
+            config: Connection settings.
+            vector_index: Optional local mirror of ``topic_embeddings`` (a
+                ``topic_insights.search.vector_index.VectorIndex``). When it is
+                populated and not stale, similarity searches are served from it
+                instead of the RPC. Writes and realtime changes are applied to it.
+            client: Optional pre-built async Supabase client.
+            http_client: Optional pooled HTTP client shared by PostgREST requests.
+            text_index: Optional keyword index over topics and summaries (a
+                ``topic_insights.search.text_index.TextIndex``). It is kept current
+                from realtime changes, and ``search_topics`` uses it when populated.
+        """
+        if client is None:
+            options = AsyncClientOptions(
+                schema=config.schema,
+                auto_refresh_token=config.auto_refresh_token,
+                persist_session=config.persist_session,
+                postgrest_client_timeout=config.timeout,
+                httpx_client=http_client
+            )
+            client = AsyncClient(config.url, config.key, options)
+        self.config = config
+        self.client: AsyncClient = client
+        self.vector_index = vector_index
+        self.text_index = text_index
+        self.topic_cache = AsyncTTLCache(maxsize=config.cache_size, ttl=config.cache_ttl)
+        self.summaries_cache = AsyncTTLCache(maxsize=config.cache_size, ttl=config.cache_ttl)
+        self._change_listeners: List[Callable[[str, str, Dict[str, Any]], Any]] = []
+        self._channel = None
+        self._pending_handlers: Set[asyncio.Task] = set()
+        if text_index is not None:
+            self.add_change_listener(text_index.on_change)
+        if vector_index is not None:
+            self.add_change_listener(vector_index.on_change)
+
+    @classmethod
+    async def create(
+        cls,
+        config: SupabaseConfig,
+        http_client: Optional[httpx.AsyncClient] = None,
+        vector_index: Optional[Any] = None,
+        text_index: Optional[Any] = None
+    ) -> "SupabaseService":
+        """Create a service whose client has loaded any persisted auth session."""
+        options = AsyncClientOptions(
             schema=config.schema,
             auto_refresh_token=config.auto_refresh_token,
             persist_session=config.persist_session,
-            timeout=config.timeout
+            postgrest_client_timeout=config.timeout,
+            httpx_client=http_client
+        )
+        client = await AsyncClient.create(config.url, config.key, options)
+        return cls(config, vector_index=vector_index, client=client, text_index=text_index)
+
+    def _dispatch(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Adapt an async handler to the realtime client's synchronous callbacks."""
+        def callback(payload: Dict[str, Any]) -> None:
+            task = asyncio.ensure_future(handler(payload))
+            self._pending_handlers.add(task)
+            task.add_done_callback(self._pending_handlers.discard)
+        return callback
+
+    async def start_realtime(self) -> None:
+        """Subscribe to topic and summary changes over one realtime channel."""
+        if self._channel is not None:
+            return
+        channel = self.client.channel('topic-insights-changes')
+        channel.on_postgres_changes(
+            '*',
+            self._dispatch(self._handle_topic_changes),
+            table='topics',
+            schema=self.config.schema,
+        )
+        channel.on_postgres_changes(
+            '*',
+            self._dispatch(self._handle_summary_changes),
+            table='summaries',
+            schema=self.config.schema,
         )
-        self.client: Client = create_client(config.url, config.key, options)
-        self._setup_realtime_subscriptions()
+        if self.vector_index is not None:
+            channel.on_postgres_changes(
+                '*',
+                self._dispatch(self._handle_embedding_changes),
+                table='topic_embeddings',
+                schema=self.config.schema,
+            )
+        await channel.subscribe()
+        self._channel = channel
 
-    def _setup_realtime_subscriptions(self):
-        """Setup realtime subscriptions for relevant tables."""
-        self.client.table('topics').on('*', self._handle_topic_changes).subscribe()
-        self.client.table('summaries').on('*', self._handle_summary_changes).subscribe()
+    async def close(self) -> None:
+        """Unsubscribe from realtime changes."""
+        if self._channel is not None:
+            await self.client.remove_channel(self._channel)
+            self._channel = None
+
+    def add_change_listener(
+        self, listener: Callable[[str, str, Dict[str, Any]], Any]
+    ) -> None:
+        """Register a callback for realtime changes.
+
+        The listener is called with the table name, the event type (INSERT,
+        UPDATE or DELETE) and the affected row.
+        """
+        self._change_listeners.append(listener)
+
+    @staticmethod
+    def _event_type(payload: Dict[str, Any]) -> str:
+        data = payload.get('data', payload)
+        return str(data.get('type') or payload.get('eventType') or 'UPDATE').upper()
+
+    @staticmethod
+    def _changed_records(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the new and old rows carried by a realtime change payload."""
+        data = payload.get('data', payload)
+        records = [
+            data.get(key)
+            for key in ('record', 'old_record', 'new', 'old')
+        ]
+        return [record for record in records if record]
+
+    async def _notify(self, table: str, payload: Dict[str, Any]) -> None:
+        records = self._changed_records(payload)
+        if not records or not self._change_listeners:
+            return
+        event_type = self._event_type(payload)
+        for listener in self._change_listeners:
+            result = listener(table, event_type, records[0])
+            if inspect.isawaitable(result):
+                await result
+
+    def invalidate_topic(self, topic_id: Any) -> None:
+        """Evict a topic and its summaries from the read-through caches."""
+        self.topic_cache.invalidate(str(topic_id))
+        self.summaries_cache.invalidate_where(lambda key: key[0] == str(topic_id))
 
     async def _handle_topic_changes(self, payload):
         """Handle real-time topic changes."""
-        # Implementation for real-time updates
+        for record in self._changed_records(payload):
+            if record.get('id') is not None:
+                self.invalidate_topic(record['id'])
+        await self._notify('topics', payload)
 
     async def _handle_summary_changes(self, payload):
         """Handle real-time summary changes."""
-        # Implementation for real-time updates
+        # Topics are fetched with their summaries embedded, so evict both.
+        for record in self._changed_records(payload):
+            if record.get('topic_id') is not None:
+                self.invalidate_topic(record['topic_id'])
+        await self._notify('summaries', payload)
+
+    async def _handle_embedding_changes(self, payload):
+        """Apply real-time embedding changes to the local vector index."""
+        # Only the vector index needs these; other listeners never see raw vectors.
+        records = self._changed_records(payload)
+        if records:
+            self.vector_index.on_change(
+                'topic_embeddings', self._event_type(payload), records[0]
+            )
+
+    def _use_vector_index(self) -> bool:
+        index = self.vector_index
+        return index is not None and len(index) > 0 and not index.stale
 
     # Topic Operations
+    @timed_query('create_topic')
     async def create_topic(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new topic with validation."""
         return await self.client.table('topics').insert(data).execute()
 
     async def get_topic(self, topic_id: int) -> Optional[Dict[str, Any]]:
-        """Retrieve a topic by ID."""
+        """Retrieve a topic by ID, served from the read-through cache."""
+        return await self.topic_cache.get_or_load(
+            str(topic_id), lambda: self._fetch_topic(topic_id)
+        )
+
+    @timed_query('get_topic')
+    async def _fetch_topic(self, topic_id: int) -> Optional[Dict[str, Any]]:
         response = await self.client.table('topics')\
             .select('*, summaries(*)')\
             .eq('id', topic_id)\
@@ -55,13 +238,42 @@ class SupabaseService:
             .execute()
         return response.data if response else None
 
+    async def iter_active_topics(
+        self,
+        page_size: int = 1000,
+        columns: str = 'id, name, description, keywords, user_id, metadata, created_at'
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every active topic, paging by a (created_at, id) cursor."""
+        after = None
+        while True:
+            query = self.client.table('topics')\
+                .select(columns)\
+                .eq('is_active', True)\
+                .order('created_at')\
+                .order('id')\
+                .limit(page_size)
+            if after:
+                query = _after_cursor(query, after)
+            response = await query.execute()
+            page = response.data if response else []
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                return
+            after = (page[-1]['created_at'], page[-1]['id'])
+
+    @timed_query('update_topic')
     async def update_topic(self, topic_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a topic."""
-        return await self.client.table('topics')\
+        response = await self.client.table('topics')\
             .update(data)\
             .eq('id', topic_id)\
             .execute()
+        # Evict after the write so a concurrent read cannot re-cache the old row.
+        self.invalidate_topic(topic_id)
+        return response
 
+    @timed_query('delete_topic')
     async def delete_topic(self, topic_id: int) -> None:
         """Delete a topic and its related data."""
         async with self.client.postgrest.connection() as conn:
@@ -72,8 +284,12 @@ class SupabaseService:
                 DELETE FROM topics WHERE id = $1;
                 COMMIT;
             """, topic_id)
+        self.invalidate_topic(topic_id)
+        if self.vector_index is not None:
+            self.vector_index.remove_topic(str(topic_id))
 
     # Vector Operations
+    @timed_query('store_embeddings')
     async def store_embeddings(
         self, 
         topic_id: int, 
@@ -81,7 +297,7 @@ class SupabaseService:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Store embeddings with metadata."""
-        return await self.client.rpc(
+        response = await self.client.rpc(
             'store_embeddings',
             {
                 'p_topic_id': topic_id,
@@ -89,15 +305,66 @@ class SupabaseService:
                 'p_metadata': metadata
             }
         ).execute()
+        # The RPC returns the new row id.
+        if self.vector_index is not None and response and isinstance(response.data, str):
+            self.vector_index.add(
+                [str(response.data)], [str(topic_id)], [embeddings], [metadata]
+            )
+        return response
+
+    @timed_query('store_embeddings_batch')
+    async def store_embeddings_batch(
+        self,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = 500
+    ) -> List[str]:
+        """Store many embeddings with one RPC call per chunk.
+
+        Each row needs ``topic_id`` and ``embedding`` and may have ``metadata``.
+        Returns the new embedding ids in input order.
+        """
+        ids: List[str] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = [
+                {
+                    'topic_id': str(row['topic_id']),
+                    # pgvector parses the text form, e.g. "[0.1,0.2]"
+                    'embedding': '[' + ','.join(map(str, row['embedding'])) + ']',
+                    'metadata': row.get('metadata') or {}
+                }
+                for row in rows[start:start + chunk_size]
+            ]
+            response = await self.client.rpc(
+                'store_embeddings_batch', {'p_rows': chunk}
+            ).execute()
+            ids.extend(
+                item if isinstance(item, str) else item['store_embeddings_batch']
+                for item in (response.data or [])
+            )
+        if self.vector_index is not None and ids:
+            self.vector_index.add(
+                ids,
+                [str(row['topic_id']) for row in rows],
+                [row['embedding'] for row in rows],
+                [row.get('metadata') for row in rows],
+            )
+        return ids
 
+    @timed_query('search_similar')
     async def search_similar(
         self, 
         embedding: List[float],
         limit: int = 10,
         threshold: float = 0.8
     ) -> List[Dict[str, Any]]:
-        """Search for similar content using vector similarity."""
-        return await self.client.rpc(
+        """Search for similar content using vector similarity.
+
+        Uses the local vector index when one is attached, populated and not
+        stale, and falls back to the ``search_similar_content`` RPC otherwise.
+        """
+        if self._use_vector_index():
+            return self.vector_index.search(embedding, limit, threshold)
+        response = await self.client.rpc(
             'search_similar_content',
             {
                 'query_embedding': embedding,
@@ -105,8 +372,44 @@ class SupabaseService:
                 'match_count': limit
             }
         ).execute()
+        return response.data if response else []
+
+    @timed_query('search_similar_batch')
+    async def search_similar_batch(
+        self,
+        embeddings: List[List[float]],
+        limit: int = 10,
+        threshold: float = 0.8
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for similar content for several query vectors at once."""
+        if self._use_vector_index():
+            return self.vector_index.search_batch(embeddings, limit, threshold)
+        return [await self.search_similar(e, limit, threshold) for e in embeddings]
+
+    @timed_query('get_embeddings_page')
+    async def get_embeddings_page(
+        self,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Get embeddings ordered by (created_at, id), starting after a cursor.
+
+        Used to incrementally sync a local vector index.
+        """
+        query = self.client.table('topic_embeddings')\
+            .select('id, topic_id, embedding, metadata, created_at')\
+            .order('created_at')\
+            .order('id')\
+            .limit(limit)
+
+        if after:
+            query = _after_cursor(query, after)
+
+        response = await query.execute()
+        return response.data if response else []
 
     # Summary Operations
+    @timed_query('create_summary')
     async def create_summary(
         self,
         topic_id: int,
@@ -120,7 +423,10 @@ class SupabaseService:
             'metadata': metadata,
             'created_at': datetime.utcnow().isoformat()
         }
-        return await self.client.table('summaries').insert(data).execute()
+        response = await self.client.table('summaries').insert(data).execute()
+        self.invalidate_topic(topic_id)
+        self._index_summaries(response)
+        return response
 
     async def get_topic_summaries(
         self,
@@ -129,7 +435,28 @@ class SupabaseService:
         end_date: Optional[datetime] = None,
         limit: int = 10
     ) -> List[Dict[str, Any]]:
-        """Get summaries for a topic with optional date range."""
+        """Get summaries for a topic with optional date range, served from the read-through cache.
+
+        On a partitioned table the date range limits the scan to the partitions it overlaps.
+        """
+        key = (
+            str(topic_id),
+            start_date.isoformat() if start_date else None,
+            end_date.isoformat() if end_date else None,
+            limit
+        )
+        return await self.summaries_cache.get_or_load(
+            key, lambda: self._fetch_topic_summaries(topic_id, start_date, end_date, limit)
+        )
+
+    @timed_query('get_topic_summaries')
+    async def _fetch_topic_summaries(
+        self,
+        topic_id: int,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        limit: int
+    ) -> List[Dict[str, Any]]:
         query = self.client.table('summaries')\
             .select('*')\
             .eq('topic_id', topic_id)\
@@ -144,30 +471,210 @@ class SupabaseService:
         response = await query.execute()
         return response.data if response else []
 
+    @timed_query('get_summaries_page')
+    async def get_summaries_page(
+        self,
+        topic_id: int,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 1000,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        descending: bool = False,
+        columns: str = '*'
+    ) -> List[Dict[str, Any]]:
+        """Get one page of a topic's summaries ordered by (created_at, id).
+
+        ``after`` is the (created_at, id) of the last row of the previous page, so
+        each page is an index range scan no matter how deep it is.
+        """
+        query = self.client.table('summaries')\
+            .select(columns)\
+            .eq('topic_id', topic_id)\
+            .order('created_at', desc=descending)\
+            .order('id', desc=descending)\
+            .limit(limit)
+
+        if start_date:
+            query = query.gte('created_at', start_date.isoformat())
+        if end_date:
+            query = query.lte('created_at', end_date.isoformat())
+        if after:
+            query = _after_cursor(query, after, descending)
+
+        response = await query.execute()
+        return response.data if response else []
+
+    async def iter_topic_summaries(
+        self,
+        topic_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 1000,
+        descending: bool = False,
+        columns: str = '*'
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every summary for a topic and date range, one page at a time.
+
+        Only one page is held in memory. ``columns`` must include ``created_at``
+        and ``id``, which form the cursor.
+        """
+        after = None
+        while True:
+            page = await self.get_summaries_page(
+                topic_id,
+                after=after,
+                limit=page_size,
+                start_date=start_date,
+                end_date=end_date,
+                descending=descending,
+                columns=columns
+            )
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                return
+            after = (page[-1]['created_at'], page[-1]['id'])
+
+    async def get_topic_rollups(
+        self,
+        topic_id: int,
+        days: int = 7
+    ) -> List[Dict[str, Any]]:
+        """Get a topic's daily rollups for the last ``days`` UTC days, newest first.
+
+        Each row holds the day's summary, source, source type, sentiment and
+        concept counts, maintained by triggers on ``summaries``, so the read
+        costs one row per day however many summaries the topic has.
+        """
+        key = (str(topic_id), 'rollups', days)
+        return await self.summaries_cache.get_or_load(
+            key, lambda: self._fetch_topic_rollups(topic_id, days)
+        )
+
+    @timed_query('get_topic_rollups')
+    async def _fetch_topic_rollups(self, topic_id: int, days: int) -> List[Dict[str, Any]]:
+        since = (datetime.utcnow() - timedelta(days=days - 1)).date()
+        response = await self.client.table('topic_daily_rollups')\
+            .select('*')\
+            .eq('topic_id', topic_id)\
+            .gte('day', since.isoformat())\
+            .order('day', desc=True)\
+            .limit(days)\
+            .execute()
+        return response.data if response else []
+
+    @timed_query('get_topic_summary')
+    async def get_topic_summary(
+        self,
+        topic_id: int,
+        days_back: int = 7,
+        max_summaries: int = 20
+    ) -> Optional[Dict[str, Any]]:
+        """Get a topic's combined summary text, top concepts, dominant sentiment and source count.
+
+        Aggregates come from the daily rollups; the text joins the
+        ``max_summaries`` most recent summaries.
+        """
+        response = await self.client.rpc(
+            'get_topic_summary',
+            {'p_topic_id': topic_id, 'p_days_back': days_back, 'p_max_summaries': max_summaries}
+        ).execute()
+        return response.data[0] if response and response.data else None
+
     # Batch Operations
+    @timed_query('batch_create_summaries')
     async def batch_create_summaries(
         self,
         summaries: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Batch create summaries for better performance."""
-        return await self.client.table('summaries')\
+        response = await self.client.table('summaries')\
             .insert(summaries)\
             .execute()
+        for topic_id in {summary.get('topic_id') for summary in summaries}:
+            self.invalidate_topic(topic_id)
+        self._index_summaries(response)
+        return response
+
+    def _index_summaries(self, response: Any) -> None:
+        """Add inserted summaries to the text index without waiting for realtime."""
+        if self.text_index is None or not response:
+            return
+        for row in getattr(response, 'data', None) or []:
+            if row.get('id') is not None:
+                self.text_index.add_summary(row)
+
+    @timed_query('upsert_summaries')
+    async def upsert_summaries(
+        self,
+        summaries: List[Dict[str, Any]]
+    ) -> None:
+        """Insert summaries, updating any that already exist for (topic_id, source_url).
+
+        Columns missing from a row keep their database defaults, and no rows are
+        returned, to keep large batches cheap. Rows without a ``source_url`` are
+        always inserted. On a partitioned table the key also includes
+        ``created_at``, so rows should carry a stable one (e.g. the publish date).
+        """
+        on_conflict = 'topic_id,source_url'
+        if self.config.partitioned_summaries:
+            on_conflict += ',created_at'
+        await self.client.table('summaries')\
+            .upsert(
+                summaries,
+                on_conflict=on_conflict,
+                default_to_null=False,
+                returning=ReturnMethod.minimal
+            )\
+            .execute()
+        for topic_id in {summary.get('topic_id') for summary in summaries}:
+            self.invalidate_topic(topic_id)
 
     # Cache Operations
-    @lru_cache(maxsize=1000)
     async def get_cached_topic(self, topic_id: int) -> Optional[Dict[str, Any]]:
-        """Get topic with caching for better performance."""
+        """Get topic with caching for better performance.
+
+        Kept for compatibility; ``get_topic`` is cached itself.
+        """
         return await self.get_topic(topic_id)
 
     # Search Operations
+    @timed_query('search_topics')
     async def search_topics(
         self,
         query: str,
         filters: Optional[Dict[str, Any]] = None,
         limit: int = 10
     ) -> List[Dict[str, Any]]:
-        """Search topics with filters."""
+        """Search topics with filters.
+
+        With a populated ``text_index``, topics are ranked by BM25 over their
+        names, keywords and summaries and only the matches are fetched. With
+        filters, ranked ids are fetched best first in windows of a few times
+        ``limit`` until ``limit`` rows pass them. Otherwise this falls back to
+        full-text search on the topic name.
+        """
+        if self.text_index is not None and len(self.text_index):
+            if limit <= 0:
+                return []
+            hits = self.text_index.search_topics(query, len(self.text_index))
+            ids = [hit['topic_id'] for hit in hits]
+            window = limit * _SEARCH_OVERFETCH if filters else limit
+            rows: List[Dict[str, Any]] = []
+            for start in range(0, len(ids), window):
+                search_query = self.client.table('topics')\
+                    .select('*')\
+                    .in_('id', ids[start:start + window])
+                for key, value in (filters or {}).items():
+                    search_query = search_query.eq(key, value)
+                response = await search_query.execute()
+                rows.extend(response.data if response else [])
+                if len(rows) >= limit:
+                    break
+            rank = {topic_id: position for position, topic_id in enumerate(ids)}
+            rows.sort(key=lambda row: rank.get(str(row['id']), len(rank)))
+            return rows[:limit]
+
         search_query = self.client.table('topics')\
             .select('*')\
             .textSearch('name', query)\
@@ -181,6 +688,7 @@ class SupabaseService:
         return response.data if response else []
 
     # Utility Methods
+    @timed_query('health_check')
     async def health_check(self) -> bool:
         """Check database connection health."""
         try:
@@ -189,10 +697,52 @@ class SupabaseService:
         except Exception:
             return False
 
-    async def cleanup_old_data(self, days: int = 30) -> None:
-        """Clean up old data to maintain performance."""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        await self.client.table('summaries')\
-            .delete()\
-            .lt('created_at', cutoff_date.isoformat())\
-            .execute() 
\ No newline at end of file
+    @timed_query('cleanup_old_data')
+    async def cleanup_old_data(
+        self,
+        days: int = 30,
+        batch_size: int = 5000,
+        max_batches: Optional[int] = None,
+        detach: bool = False
+    ) -> Dict[str, Any]:
+        """Remove summaries older than ``days`` without long-running deletes.
+
+        Partitions entirely before the cutoff are dropped (or detached, for
+        archiving). Remaining old rows, including every old row of a
+        non-partitioned table, are deleted in batches of ``batch_size``, each
+        in its own short transaction.
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        dropped = await self.client.rpc(
+            'drop_summary_partitions', {'p_cutoff': cutoff, 'p_detach': detach}
+        ).execute()
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            response = await self.client.rpc(
+                'delete_summaries_before', {'p_cutoff': cutoff, 'p_batch_size': batch_size}
+            ).execute()
+            count = response.data or 0
+            deleted += count
+            batches += 1
+            if count < batch_size:
+                break
+        self.topic_cache.clear()
+        self.summaries_cache.clear()
+        return {
+            'partitions_dropped': dropped.data or [],
+            'rows_deleted': deleted,
+            'batches': batches
+        }
+
+    @timed_query('ensure_summary_partitions')
+    async def ensure_summary_partitions(
+        self,
+        interval: str = 'month',
+        ahead: int = 3
+    ) -> List[str]:
+        """Create upcoming ``summaries`` partitions; run this periodically."""
+        response = await self.client.rpc(
+            'ensure_summary_partitions', {'p_interval': interval, 'p_ahead': ahead}
+        ).execute()
+        return response.data or [] 
\ No newline at end of file
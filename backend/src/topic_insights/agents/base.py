@@ -1,9 +1,21 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from ..models.agents import ContentAnalysisResult, Entity, parse_entities
+from .batch import BatchResult, run_bounded
+from .chunking import MapReduceSummarizer
+
 
 class BaseAgent(ABC):
     """Base class for all agents in the system."""
     
+    # Maximum number of calls a batch method keeps in flight.
+    max_concurrency: int = 8
+    
+    # Whether embed_many is implemented; check it before embedding.
+    supports_embeddings: bool = False
+    
     @abstractmethod
     async def initialize(self) -> None:
         """Initialize any resources needed by the agent."""
@@ -20,7 +32,7 @@ class BaseAgent(ABC):
         pass
     
     @abstractmethod
-    async def extract_entities(self, content: str) -> List[Dict[str, Any]]:
+    async def extract_entities(self, content: str) -> List[Entity]:
         """Extract named entities and key concepts from content."""
         pass
     
@@ -29,7 +41,140 @@ class BaseAgent(ABC):
         """Generate follow-up questions based on the content."""
         pass
     
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Generate one embedding vector per text, in input order.
+        
+        Only agents whose ``supports_embeddings`` is true implement this.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support embeddings")
+    
+    async def embed(self, text: str) -> List[float]:
+        """Generate an embedding vector for one text."""
+        return (await self.embed_many([text]))[0]
+    
+    async def summarize_long(
+        self,
+        content: str,
+        max_length: Optional[int] = None,
+        chunk_tokens: int = 3000,
+        overlap_tokens: int = 200,
+    ) -> str:
+        """Summarize content of any length with map-reduce over token-bounded chunks.
+        
+        Content that fits in one chunk is summarized directly. Chunks are
+        summarized in parallel under ``max_concurrency``.
+        """
+        summarizer = MapReduceSummarizer(
+            self, chunk_tokens=chunk_tokens, overlap_tokens=overlap_tokens
+        )
+        return await summarizer.summarize(content, max_length)
+    
+    async def stream_analyze_topic(
+        self, topic: str, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Analyze a topic, yielding the analysis text as it is generated.
+        
+        Agents without native streaming yield the full analysis as a single chunk.
+        """
+        result = await self.analyze_topic(topic, context)
+        yield result["analysis"]
+    
+    async def stream_summarize_content(
+        self, content: str, max_length: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Summarize content, yielding the summary text as it is generated.
+        
+        Agents without native streaming yield the full summary as a single chunk.
+        """
+        yield await self.summarize_content(content, max_length)
+    
+    async def stream_extract_entities(self, content: str) -> AsyncIterator[Entity]:
+        """Extract entities, yielding each one as soon as it is available.
+        
+        Agents without native streaming yield all entities once extraction ends.
+        """
+        for entity in parse_entities(await self.extract_entities(content)):
+            yield entity
+    
+    async def process_content(
+        self,
+        content: str,
+        max_length: Optional[int] = None,
+        num_questions: int = 3,
+    ) -> ContentAnalysisResult:
+        """Summarize content, extract its entities and generate follow-up questions.
+        
+        The default implementation runs the three operations concurrently. Agents
+        that can produce all three in a single call should override it.
+        """
+        summary, entities, questions = await asyncio.gather(
+            self.summarize_content(content, max_length),
+            self.extract_entities(content),
+            self.generate_questions(content, num_questions),
+        )
+        return ContentAnalysisResult(
+            summary=summary,
+            entities=parse_entities(entities),
+            questions=questions,
+        )
+    
     @abstractmethod
     async def cleanup(self) -> None:
         """Cleanup any resources used by the agent."""
-        pass 
\ No newline at end of file
+        pass
+    
+    # Batch Operations
+    def analyze_many(
+        self,
+        topics: Iterable[str],
+        context: Optional[Dict[str, Any]] = None,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[BatchResult[str, Dict[str, Any]]]:
+        """Analyze many topics concurrently, yielding results as they complete."""
+        return run_bounded(
+            lambda topic: self.analyze_topic(topic, context),
+            topics,
+            self.max_concurrency if concurrency is None else concurrency,
+        )
+    
+    def summarize_many(
+        self,
+        contents: Iterable[str],
+        max_length: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[BatchResult[str, str]]:
+        """Summarize many pieces of content concurrently, yielding results as they complete."""
+        return run_bounded(
+            lambda content: self.summarize_content(content, max_length),
+            contents,
+            self.max_concurrency if concurrency is None else concurrency,
+        )
+    
+    def process_many(
+        self,
+        contents: Iterable[str],
+        max_length: Optional[int] = None,
+        num_questions: int = 3,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[BatchResult[str, ContentAnalysisResult]]:
+        """Process many pieces of content concurrently, yielding results as they complete."""
+        return run_bounded(
+            lambda content: self.process_content(content, max_length, num_questions),
+            contents,
+            self.max_concurrency if concurrency is None else concurrency,
+        )
+    
+    def extract_entities_many(
+        self,
+        contents: Iterable[str],
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[BatchResult[str, List[Entity]]]:
+        """Extract entities from many pieces of content concurrently.
+        
+        Results are yielded as they complete.
+        """
+        return run_bounded(
+            self.extract_entities,
+            contents,
+            self.max_concurrency if concurrency is None else concurrency,
+        )
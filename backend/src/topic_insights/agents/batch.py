@@ -0,0 +1,70 @@
+"""
+Bounded-concurrency batch execution for agent calls.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class BatchResult(Generic[T, R]):
+    """Outcome of one item in a batch run."""
+
+    index: int
+    item: T
+    result: Optional[R] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_bounded(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    concurrency: int = 8,
+) -> AsyncIterator[BatchResult[T, R]]:
+    """Run ``func`` over ``items`` with at most ``concurrency`` calls in flight.
+
+    Results are yielded in completion order. Items are pulled from ``items``
+    lazily, so large iterables are never materialized. Per-item failures are
+    reported on the result instead of aborting the batch. Closing the generator
+    early cancels the work still in flight.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    source = iter(enumerate(items))
+    results: "asyncio.Queue[Any]" = asyncio.Queue()
+    done = object()
+
+    async def worker() -> None:
+        try:
+            for index, item in source:
+                try:
+                    outcome = BatchResult(index, item, result=await func(item))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    outcome = BatchResult(index, item, error=exc)
+                await results.put(outcome)
+        finally:
+            results.put_nowait(done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    remaining = len(workers)
+    try:
+        while remaining:
+            outcome = await results.get()
+            if outcome is done:
+                remaining -= 1
+                continue
+            yield outcome
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
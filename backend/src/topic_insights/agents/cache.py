@@ -0,0 +1,274 @@
+"""
+Response caching for agent calls.
+
+Responses are keyed on the model, the agent method, a hash of the prompt and the
+call parameters, so identical requests can be answered without an API round trip.
+A ``ResponseCache`` combines an in-memory LRU tier with an optional SQLite tier on
+local disk.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+def make_cache_key(
+    model: str, method: str, prompt: Any, params: Optional[Dict[str, Any]] = None
+) -> str:
+    """Build a stable cache key from the model, method, prompt and parameters."""
+    prompt_hash = hashlib.sha256(
+        json.dumps(prompt, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    payload = json.dumps(
+        {"model": model, "method": method, "prompt": prompt_hash, "params": params or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a response cache."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_ratio": self.hit_ratio}
+
+
+class CacheBackend(ABC):
+    """Base class for cache storage tiers."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None if missing or expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> int:
+        """Store a value and return the number of entries evicted."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+        pass
+
+    # Optional hook: only backends holding resources (e.g. a connection) override it.
+    def close(self) -> None:  # noqa: B027
+        """Release any resources held by the backend."""
+
+
+class MemoryCache(CacheBackend):
+    """In-memory LRU cache with optional TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl is not None and time.time() - stored_at > self.ttl:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> int:
+        self._data[key] = (time.time(), value)
+        self._data.move_to_end(key)
+        evicted = 0
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """Disk cache stored in a local SQLite database.
+
+    Values are stored as JSON. Expired entries are dropped on read, and the least
+    recently accessed entries are evicted once ``max_entries`` is exceeded.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 100_000,
+        ttl: Optional[float] = None,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)"
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> int:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            evicted = self._evict()
+            self._conn.commit()
+        return evicted
+
+    def _evict(self) -> int:
+        evicted = 0
+        if self.ttl is not None:
+            evicted += self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            evicted += self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Two-tier response cache: an in-memory LRU in front of an optional disk tier.
+
+    Disk hits are promoted into the memory tier. Disk access runs in a worker thread
+    so it does not block the event loop.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[MemoryCache] = None,
+        disk: Optional[CacheBackend] = None,
+    ):
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.stats = CacheStats()
+
+    @classmethod
+    def with_disk(
+        cls,
+        path: Union[str, Path],
+        ttl: Optional[float] = None,
+        memory_entries: int = 1024,
+        disk_entries: int = 100_000,
+    ) -> "ResponseCache":
+        """Create a cache with both a memory and a SQLite tier."""
+        return cls(
+            memory=MemoryCache(max_entries=memory_entries, ttl=ttl),
+            disk=SQLiteCache(path, max_entries=disk_entries, ttl=ttl),
+        )
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Look up a key in memory, then on disk."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.hits += 1
+            self.stats.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                self.stats.evictions += self.memory.set(key, value)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value in every tier."""
+        self.stats.evictions += self.memory.set(key, value)
+        if self.disk is not None:
+            self.stats.evictions += await asyncio.to_thread(self.disk.set, key, value)
+
+    async def clear(self) -> None:
+        """Remove every entry from every tier."""
+        self.memory.clear()
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.clear)
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,361 @@
+"""
+Model cascade: route each task to the cheapest model that handles it.
+
+A ``CascadePolicy`` maps each agent method and input size to an ordered list
+of models. ``CascadeAgent`` tries them in turn, validates each result and
+escalates to the next model only when validation fails or the call errors, so
+easy inputs are served by a small, fast model and hard ones still reach the
+large model.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from openai import AsyncOpenAI
+
+from ..metrics import CASCADE_LATENCY, CASCADE_STEPS, CASCADE_TOKENS
+from ..models.agents import ContentAnalysisResult, Entity, parse_entities
+from .base import BaseAgent
+from .cache import ResponseCache
+from .local_agent import LocalAgent
+from .openai_agent import OpenAIAgent
+from .ratelimit import RateLimiter
+from .tokens import count_tokens
+
+T = TypeVar("T")
+
+SMALL_MODEL = "gpt-4o-mini"
+LARGE_MODEL = "gpt-4o"
+
+
+class ValidationFailed(Exception):
+    """A model's output did not pass the method's validation."""
+
+
+@dataclass(frozen=True)
+class Route:
+    """Models to try, in order, for inputs of at most ``max_tokens`` tokens (None: any size)."""
+
+    models: Tuple[str, ...]
+    max_tokens: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if not self.models:
+            raise ValueError("a route needs at least one model")
+
+
+@dataclass
+class CascadePolicy:
+    """Per-method routes, checked in order; the first whose size limit fits is used.
+
+    Methods without a matching route use ``default``.
+    """
+
+    default: Tuple[str, ...] = (LARGE_MODEL,)
+    routes: Dict[str, List[Route]] = field(default_factory=dict)
+
+    def models_for(self, method: str, tokens: int) -> Tuple[str, ...]:
+        for route in self.routes.get(method, []):
+            if route.max_tokens is None or tokens <= route.max_tokens:
+                return route.models
+        return self.default
+
+    @property
+    def models(self) -> List[str]:
+        """Every model the policy can route to, deduplicated in first-use order."""
+        names = list(self.default)
+        for routes in self.routes.values():
+            for route in routes:
+                names.extend(route.models)
+        return list(dict.fromkeys(names))
+
+    @classmethod
+    def tiered(
+        cls, small: str = SMALL_MODEL, large: str = LARGE_MODEL
+    ) -> "CascadePolicy":
+        """Small model first for questions and short content; large model for the rest."""
+        cascade = (small, large)
+        return cls(
+            default=(large,),
+            routes={
+                "generate_questions": [Route(cascade)],
+                "summarize_content": [Route(cascade, 2000)],
+                "extract_entities": [Route(cascade, 4000)],
+                "process_content": [Route(cascade, 2000)],
+            },
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CascadePolicy":
+        """Build a policy from a dict.
+
+        The layout is ``{"default": [...], "routes": {method: [{"models": [...],
+        "max_tokens": n}]}}``. The model name ``"local"`` routes to a ``LocalAgent``.
+        """
+        return cls(
+            default=tuple(data.get("default") or (LARGE_MODEL,)),
+            routes={
+                method: [
+                    Route(tuple(route["models"]), route.get("max_tokens")) for route in routes
+                ]
+                for method, routes in (data.get("routes") or {}).items()
+            },
+        )
+
+    @classmethod
+    def from_env(cls) -> Optional["CascadePolicy"]:
+        """Read ``AGENT_CASCADE_POLICY`` (a JSON file) or ``OPENAI_SMALL_MODEL``.
+
+        Returns None when neither is set, meaning no cascade is configured.
+        """
+        path = os.getenv("AGENT_CASCADE_POLICY")
+        if path:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        small = os.getenv("OPENAI_SMALL_MODEL")
+        if small:
+            return cls.tiered(small, os.getenv("OPENAI_MODEL", LARGE_MODEL))
+        return None
+
+
+def _require_text(text: Optional[str]) -> str:
+    if not text or not text.strip():
+        raise ValidationFailed("empty output")
+    return text
+
+
+class CascadeAgent(BaseAgent):
+    """Agent that routes each call through a model cascade.
+
+    Args:
+        policy: Routing policy. Defaults to ``CascadePolicy.from_env()`` or, if
+            unset, ``CascadePolicy.tiered()``.
+        agents: Optional agent per model name. A missing ``"local"`` model gets a
+            ``LocalAgent``; other missing models get an ``OpenAIAgent`` built
+            from the remaining arguments.
+        api_key, client, cache, rate_limiter, max_concurrency, max_retries:
+            Passed to the ``OpenAIAgent`` instances, which share them.
+    """
+
+    name = "cascade"
+
+    def __init__(
+        self,
+        policy: Optional[CascadePolicy] = None,
+        agents: Optional[Dict[str, BaseAgent]] = None,
+        api_key: Optional[str] = None,
+        client: Optional[AsyncOpenAI] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 3,
+    ):
+        self.policy = policy or CascadePolicy.from_env() or CascadePolicy.tiered()
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        self.agents: Dict[str, BaseAgent] = dict(agents or {})
+        for model in self.policy.models:
+            if model == LocalAgent.model and model not in self.agents:
+                self.agents[model] = LocalAgent(max_concurrency=max_concurrency)
+            elif model not in self.agents:
+                self.agents[model] = OpenAIAgent(
+                    api_key=api_key,
+                    model=model,
+                    client=client,
+                    cache=cache,
+                    rate_limiter=rate_limiter,
+                    max_concurrency=max_concurrency,
+                    max_retries=max_retries,
+                )
+
+    async def initialize(self) -> None:
+        for agent in self.agents.values():
+            await agent.initialize()
+
+    async def _run(
+        self,
+        method: str,
+        content: str,
+        call: Callable[[BaseAgent], Awaitable[T]],
+        validate: Callable[[T], Any],
+    ) -> T:
+        """Try the route's models in order until one returns a valid result.
+
+        The last model's result is returned without validation, and its errors
+        propagate.
+        """
+        tokens = count_tokens(content)
+        models = self.policy.models_for(method, tokens)
+        started = time.perf_counter()
+        for i, model in enumerate(models):
+            CASCADE_TOKENS.inc(tokens, method=method, model=model)
+            last = i == len(models) - 1
+            try:
+                result = await call(self.agents[model])
+                if not last:
+                    validate(result)
+            except Exception:
+                if last:
+                    CASCADE_STEPS.inc(method=method, model=model, outcome="error")
+                    raise
+                CASCADE_STEPS.inc(method=method, model=model, outcome="escalated")
+                continue
+            CASCADE_STEPS.inc(method=method, model=model, outcome="accepted")
+            CASCADE_LATENCY.observe(
+                time.perf_counter() - started, method=method, route=">".join(models[: i + 1])
+            )
+            return result
+        raise AssertionError("unreachable: routes always have a model")
+
+    async def _stream(
+        self,
+        method: str,
+        content: str,
+        stream: Callable[[BaseAgent], AsyncIterator[T]],
+    ) -> AsyncIterator[T]:
+        """Stream from the first model that produces output.
+
+        Streamed output cannot be validated before it is sent, so a model is
+        only skipped when it yields nothing or fails before its first delta.
+        """
+        tokens = count_tokens(content)
+        models = self.policy.models_for(method, tokens)
+        started = time.perf_counter()
+        for i, model in enumerate(models):
+            CASCADE_TOKENS.inc(tokens, method=method, model=model)
+            last = i == len(models) - 1
+            produced = False
+            try:
+                async for delta in stream(self.agents[model]):
+                    if delta:
+                        produced = True
+                        yield delta
+            except Exception:
+                if last or produced:
+                    CASCADE_STEPS.inc(method=method, model=model, outcome="error")
+                    raise
+            if produced or last:
+                CASCADE_STEPS.inc(method=method, model=model, outcome="accepted")
+                CASCADE_LATENCY.observe(
+                    time.perf_counter() - started, method=method, route=">".join(models[: i + 1])
+                )
+                return
+            CASCADE_STEPS.inc(method=method, model=model, outcome="escalated")
+
+    async def analyze_topic(
+        self, topic: str, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return await self._run(
+            "analyze_topic",
+            topic + (json.dumps(context, default=str) if context else ""),
+            lambda agent: agent.analyze_topic(topic, context),
+            lambda result: _require_text(result.get("analysis")),
+        )
+
+    async def stream_analyze_topic(
+        self, topic: str, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        async for delta in self._stream(
+            "analyze_topic",
+            topic + (json.dumps(context, default=str) if context else ""),
+            lambda agent: agent.stream_analyze_topic(topic, context),
+        ):
+            yield delta
+
+    async def summarize_content(self, content: str, max_length: Optional[int] = None) -> str:
+        return await self._run(
+            "summarize_content",
+            content,
+            lambda agent: agent.summarize_content(content, max_length),
+            _require_text,
+        )
+
+    async def stream_summarize_content(
+        self, content: str, max_length: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        async for delta in self._stream(
+            "summarize_content",
+            content,
+            lambda agent: agent.stream_summarize_content(content, max_length),
+        ):
+            yield delta
+
+    async def extract_entities(self, content: str) -> List[Entity]:
+        def validate(result: Any) -> None:
+            # Raises on unparseable JSON or malformed entities.
+            if not parse_entities(result):
+                raise ValidationFailed("no entities")
+
+        return await self._run(
+            "extract_entities", content, lambda agent: agent.extract_entities(content), validate
+        )
+
+    async def stream_extract_entities(self, content: str) -> AsyncIterator[Entity]:
+        async for entity in self._stream(
+            "extract_entities", content, lambda agent: agent.stream_extract_entities(content)
+        ):
+            yield entity
+
+    async def generate_questions(self, content: str, num_questions: int = 3) -> List[str]:
+        def validate(questions: Sequence[str]) -> None:
+            if len(questions) < num_questions or not all(q.strip() for q in questions):
+                raise ValidationFailed(f"expected {num_questions} questions")
+
+        return await self._run(
+            "generate_questions",
+            content,
+            lambda agent: agent.generate_questions(content, num_questions),
+            validate,
+        )
+
+    async def process_content(
+        self,
+        content: str,
+        max_length: Optional[int] = None,
+        num_questions: int = 3,
+    ) -> ContentAnalysisResult:
+        def validate(result: ContentAnalysisResult) -> None:
+            _require_text(result.summary)
+            if len(result.questions) < num_questions:
+                raise ValidationFailed(f"expected {num_questions} questions")
+
+        return await self._run(
+            "process_content",
+            content,
+            lambda agent: agent.process_content(content, max_length, num_questions),
+            validate,
+        )
+
+    def _embedding_agent(self) -> Optional[BaseAgent]:
+        for model in self.policy.models:
+            if self.agents[model].supports_embeddings:
+                return self.agents[model]
+        return None
+
+    @property
+    def supports_embeddings(self) -> bool:
+        return self._embedding_agent() is not None
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed with the first policy model that supports it; embeddings are not cascaded."""
+        agent = self._embedding_agent()
+        if agent is None:
+            return await super().embed_many(texts)
+        return await agent.embed_many(texts)
+
+    async def cleanup(self) -> None:
+        for agent in self.agents.values():
+            await agent.cleanup()
@@ -0,0 +1,167 @@
+"""
+Token-aware chunking and map-reduce summarization for long documents.
+
+Content that does not fit in one prompt is split into overlapping chunks on
+sentence boundaries. Chunks are summarized in parallel (the map step), then the
+partial summaries are merged group by group until one summary remains (the
+reduce step), so every call stays within a bounded prompt size.
+"""
+import re
+from typing import Any, List, Optional
+
+from .batch import run_bounded
+from .tokens import count_tokens
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def _split_units(text: str, max_tokens: int, model: Optional[str]) -> List[str]:
+    """Split text into sentences, breaking any sentence longer than ``max_tokens`` on words."""
+    units = []
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if count_tokens(sentence, model) <= max_tokens:
+            units.append(sentence)
+            continue
+        words: List[str] = []
+        for word in sentence.split():
+            if words and count_tokens(" ".join(words + [word]), model) > max_tokens:
+                units.append(" ".join(words))
+                words = []
+            words.append(word)
+        if words:
+            units.append(" ".join(words))
+    return units
+
+
+def split_by_tokens(
+    text: str,
+    chunk_tokens: int = 3000,
+    overlap_tokens: int = 200,
+    model: Optional[str] = None,
+) -> List[str]:
+    """Split text into chunks of at most ``chunk_tokens`` tokens.
+
+    Chunks end on sentence boundaries where possible, and each chunk starts with
+    up to ``overlap_tokens`` tokens (at most half a chunk) from the end of the
+    previous one so that context is not lost at the seams.
+    """
+    if chunk_tokens <= 0:
+        raise ValueError("chunk_tokens must be positive")
+    if overlap_tokens < 0:
+        raise ValueError("overlap_tokens must be non-negative")
+    overlap_tokens = min(overlap_tokens, chunk_tokens // 2)
+
+    # Count each unit with its joining space so the joined chunk stays within budget.
+    units = [
+        (unit, count_tokens(" " + unit, model))
+        for unit in _split_units(text, chunk_tokens - 1, model)
+    ]
+    chunks: List[str] = []
+    current: List[tuple] = []
+    current_tokens = 0
+    has_new_content = False
+
+    for unit, tokens in units:
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append(" ".join(u for u, _ in current))
+            # Carry trailing units forward as overlap, keeping room for the next unit.
+            overlap: List[tuple] = []
+            overlap_size = 0
+            for carried in reversed(current):
+                if overlap_size + carried[1] > min(overlap_tokens, chunk_tokens - tokens):
+                    break
+                overlap.insert(0, carried)
+                overlap_size += carried[1]
+            current, current_tokens = overlap, overlap_size
+            has_new_content = False
+        current.append((unit, tokens))
+        current_tokens += tokens
+        has_new_content = True
+
+    if current and has_new_content:
+        chunks.append(" ".join(u for u, _ in current))
+    return chunks
+
+
+class MapReduceSummarizer:
+    """Summarize documents of any length with bounded per-call prompt size.
+
+    Args:
+        agent: Agent used for every summarization call.
+        chunk_tokens: Maximum tokens of source text per call.
+        overlap_tokens: Tokens shared between consecutive chunks.
+        fan_in: Maximum number of partial summaries merged by one reduce call.
+        partial_length: Optional word target for the partial summaries.
+        concurrency: Calls in flight; defaults to the agent's ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        chunk_tokens: int = 3000,
+        overlap_tokens: int = 200,
+        fan_in: int = 8,
+        partial_length: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        if fan_in < 2:
+            raise ValueError("fan_in must be at least 2")
+        self.agent = agent
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.fan_in = fan_in
+        self.partial_length = partial_length
+        self.concurrency = (
+            getattr(agent, "max_concurrency", 8) if concurrency is None else concurrency
+        )
+        self.model = getattr(agent, "model", None)
+
+    async def _summarize_all(self, texts: List[str], max_length: Optional[int]) -> List[str]:
+        """Summarize texts concurrently, returning summaries in input order."""
+        summaries: List[Optional[str]] = [None] * len(texts)
+        async for item in run_bounded(
+            lambda text: self.agent.summarize_content(text, max_length), texts, self.concurrency
+        ):
+            if item.error is not None:
+                raise item.error
+            summaries[item.index] = item.result
+        return summaries  # type: ignore[return-value]
+
+    def _group(self, summaries: List[str]) -> List[str]:
+        """Pack consecutive partial summaries into reduce inputs that fit one call."""
+        groups: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for summary in summaries:
+            tokens = count_tokens(summary, self.model)
+            # Always merge at least two summaries per group so each round shrinks the list.
+            if len(current) >= self.fan_in or (
+                len(current) >= 2 and current_tokens + tokens > self.chunk_tokens
+            ):
+                groups.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append("\n\n".join(current))
+        return groups
+
+    async def summarize(self, content: str, max_length: Optional[int] = None) -> str:
+        """Summarize content, chunking and reducing only when it does not fit one call."""
+        if count_tokens(content, self.model) <= self.chunk_tokens:
+            return await self.agent.summarize_content(content, max_length)
+
+        chunks = split_by_tokens(content, self.chunk_tokens, self.overlap_tokens, self.model)
+        if len(chunks) == 1:
+            return await self.agent.summarize_content(chunks[0], max_length)
+        summaries = await self._summarize_all(chunks, self.partial_length)
+
+        while len(summaries) > 1:
+            groups = self._group(summaries)
+            if len(groups) == 1:
+                return await self.agent.summarize_content(groups[0], max_length)
+            summaries = await self._summarize_all(groups, self.partial_length)
+        return summaries[0]
@@ -0,0 +1,550 @@
+"""
+CPU-only agent for offline use and overflow from the API agents.
+
+Summaries are extractive (TextRank over sentence term overlap, solved with
+NumPy), entities come from capitalization, context and suffix rules, and
+keywords from stopword-delimited term statistics. No network calls are made,
+so it keeps working when the API is rate limited or unavailable; one core
+processes several hundred 300-word articles per second.
+"""
+import asyncio
+import heapq
+import re
+import string
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from ..models.agents import ContentAnalysisResult, Entity
+from .base import BaseAgent
+
+T = TypeVar("T")
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])|\n+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9'\-]*|\d+(?:[.,]\d+)*%?")
+_CAPITALIZED = re.compile(
+    r"\b(?:[A-Z][A-Za-z0-9&'\-]*)"
+    r"(?:\s+(?:(?:of|for|and|de|la|von|van)\s+(?:the\s+)?)?[A-Z][A-Za-z0-9&'\-]*)*"
+)
+_CAMEL_CASE = re.compile(r"[a-z][A-Z]")
+_MONTHS = (
+    "January|February|March|April|May|June|July|August|September|October|November|December"
+    "|Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec"
+)
+_DATE = re.compile(
+    # The lookahead lets the scan skip lowercase positions cheaply.
+    rf"\b(?=[A-Z0-9])(?:(?:{_MONTHS})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?"
+    rf"|\d{{1,2}}\s+(?:{_MONTHS})\.?(?:\s+\d{{4}})?"
+    rf"|(?:{_MONTHS})\.?\s+\d{{4}}"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|Q[1-4]\s+\d{4}"
+    r"|(?:19|20)\d{2}s?"
+    r"|(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday))\b"
+)
+
+STOPWORDS = frozenset(
+    """a about above after again against all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down during each
+    few for from further had has have having he her here hers herself him himself his how
+    i if in into is it its itself just me more most my myself no nor not now of off on
+    once only or other our ours ourselves out over own same she should so some such than
+    that the their theirs them themselves then there these they this those through to too
+    under until up very was we were what when where which while who whom why will with
+    would you your yours yourself yourselves said says say according new one two three
+    many much may might must per via yet however also including among within without
+    last next year years week weeks month months day days today yesterday tomorrow""".split()
+)
+
+_ORG_SUFFIXES = frozenset(
+    """inc corp corporation co ltd llc plc gmbh ag group company companies university
+    institute agency bank association council ministry department commission foundation
+    party committee authority labs systems technologies reserve organization organisation
+    fund federation board bureau court parliament congress senate school college hospital
+    network times post news press""".split()
+)
+_LOCATION_SUFFIXES = frozenset(
+    "city county state province river valley island islands mountains bay sea ocean region "
+    "district street avenue coast".split()
+)
+_LOCATION_PREPOSITIONS = frozenset("in at from near across to throughout outside inside".split())
+_PERSON_TITLES = frozenset(
+    "mr mrs ms dr prof president senator minister ceo chairman chairwoman chancellor governor "
+    "mayor judge sir dame professor director secretary rep representative king queen "
+    "commissioner".split()
+)
+_SPEECH_VERBS = frozenset(
+    "said says told added argued wrote noted explained warned announced".split()
+)
+_KEYWORD_BREAKS = STOPWORDS | _SPEECH_VERBS
+# Words, numbers and the punctuation that ends a keyword phrase.
+_KEYWORD_TOKEN = re.compile(r"[a-z][a-z0-9'\-]*|\d[\d.,]*%?|[.!?,;:()\"“”]")
+_LOWER_WORD = re.compile(r"\b[a-z][a-z0-9'\-]*")
+TECHNOLOGIES = frozenset(
+    """ai api apis gpu gpus cpu cpus llm llms 5g 6g iot ml nlp blockchain bitcoin crypto
+    cryptocurrency cloud software hardware semiconductor semiconductors chip chips robotics
+    robot robots drone drones quantum solar battery batteries lidar vr ar internet
+    smartphone smartphones database databases kubernetes linux python javascript""".split()
+)
+_TECH_PHRASES = (
+    "artificial intelligence",
+    "machine learning",
+    "deep learning",
+    "large language model",
+    "large language models",
+    "quantum computing",
+    "electric vehicle",
+    "electric vehicles",
+    "neural network",
+    "neural networks",
+    "computer vision",
+    "renewable energy",
+    "gene editing",
+)
+# Matched against lowercased text; case-insensitive matching is much slower.
+_TECH_PHRASE = re.compile(
+    r"\b(?=[" + "".join(sorted({p[0] for p in _TECH_PHRASES})) + "])"
+    r"(?:" + "|".join(_TECH_PHRASES) + r")\b"
+)
+
+# TextRank splits words with str.translate and str.split, which is several
+# times faster than a regex scan; apostrophes and hyphens stay inside words.
+_TERM_SEPARATORS = str.maketrans(
+    dict.fromkeys(string.punctuation.replace("'", "").replace("-", "") + "“”‘’—–…", " ")
+)
+_NON_TERMS = STOPWORDS | frozenset(string.ascii_lowercase + string.digits + "'-")
+
+# Larger documents use power iteration instead of an O(n^3) solve.
+_DIRECT_SOLVE_MAX = 300
+# Summaries rank only the leading sentences, bounding the O(n^2) similarity
+# matrix for very long documents.
+_MAX_RANKED_SENTENCES = 200
+
+# Filled with the top keywords (themes) and named entities of the content.
+QUESTION_TEMPLATES = (
+    "What is driving the recent developments in {theme}?",
+    "What role does {entity} play in {theme}, and what comes next?",
+    "Which stakeholders are most affected by changes in {other_theme}?",
+    "What evidence would show whether the trend in {theme} will last?",
+    "How does {other_entity} relate to {other_theme}?",
+    "What risks or open questions remain around {other_theme}?",
+)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation and line breaks."""
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+def content_terms(text: str) -> List[str]:
+    """Lowercase words of ``text`` without stopwords or single characters."""
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS]
+
+
+def textrank(sentences: Sequence[str], damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """TextRank score per sentence.
+
+    Sentences are linked by shared content terms, normalized by the log of
+    their lengths as in the original TextRank; scores are the stationary
+    distribution of the resulting random walk.
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+    if n <= 2:
+        return np.full(n, 1.0 / n)
+    # One pass over all sentences; NUL never occurs in text.
+    lowered = "\0".join(sentences).lower().translate(_TERM_SEPARATORS).split("\0")
+    term_sets = [set(sentence.split()) - _NON_TERMS for sentence in lowered]
+    vocabulary: Dict[str, int] = {}
+    cols = [vocabulary.setdefault(term, len(vocabulary)) for terms in term_sets for term in terms]
+    if not cols:
+        return np.full(n, 1.0 / n)
+    counts = np.fromiter(map(len, term_sets), dtype=np.intp, count=n)
+    terms = np.zeros((n, len(vocabulary)))
+    terms[np.repeat(np.arange(n), counts), cols] = 1.0
+    log_lengths = np.log(np.maximum(counts, 2))
+    similarity = (terms @ terms.T) / (log_lengths[:, None] + log_lengths[None, :])
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences sharing no terms with any other spread their rank evenly.
+    transition = np.divide(
+        similarity, out_weight, out=np.full((n, n), 1.0 / n), where=out_weight > 0
+    ).T
+    if n <= _DIRECT_SOLVE_MAX:
+        # Solve (I - dT) s = (1 - d) / n directly instead of iterating.
+        return np.linalg.solve(np.eye(n) - damping * transition, np.full(n, (1 - damping) / n))
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+def extract_keywords(text: str, limit: int = 10) -> List[Tuple[str, float]]:
+    """Top keyword phrases with scores in (0, 1].
+
+    Candidates are words and recurring two- or three-word runs between
+    stopwords and punctuation. A phrase scores its count times its length, so
+    repeated multi-word terms outrank their parts, which are then skipped.
+    """
+    tokens = _KEYWORD_TOKEN.findall(text.lower())
+    keep = [len(t) > 1 and t[0].isalpha() and t not in _KEYWORD_BREAKS for t in tokens]
+    grams = [t for t, k in zip(tokens, keep) if k]
+    grams += [
+        f"{a} {b}" for a, b, ka, kb in zip(tokens, tokens[1:], keep, keep[1:]) if ka and kb
+    ]
+    grams += [
+        f"{a} {b} {c}"
+        for a, b, c, ka, kb, kc in zip(tokens, tokens[1:], tokens[2:], keep, keep[1:], keep[2:])
+        if ka and kb and kc
+    ]
+    counts = Counter(grams)
+    scored = {
+        phrase: count * (phrase.count(" ") + 1)
+        for phrase, count in counts.items()
+        if count > 1 or " " not in phrase
+    }
+    if not scored:
+        return []
+    # Phrases contained in better ones are skipped, so rank a few spares.
+    ranked = heapq.nsmallest(limit * 4, scored.items(), key=lambda item: (-item[1], item[0]))
+    top = ranked[0][1]
+    keywords: List[Tuple[str, float]] = []
+    for phrase, score in ranked:
+        if any(f" {phrase} " in f" {kept} " for kept, _ in keywords):
+            continue
+        keywords.append((phrase, round(score / top, 3)))
+        if len(keywords) == limit:
+            break
+    return keywords
+
+
+def _categorize(name: str, before: str, after: str) -> str:
+    words = name.split()
+    last = words[-1].lower().rstrip(".")
+    if last in _ORG_SUFFIXES:
+        return "Organizations"
+    if last in _LOCATION_SUFFIXES:
+        return "Locations"
+    if any(c.isdigit() for c in name) or _CAMEL_CASE.search(name):
+        return "Technologies"
+    if before in _PERSON_TITLES:
+        return "People"
+    if name.isupper() and 2 <= len(name) <= 6:
+        return "Organizations"
+    if 2 <= len(words) <= 3 and after in _SPEECH_VERBS:
+        return "People"
+    if before in _LOCATION_PREPOSITIONS:
+        return "Locations"
+    if len(words) in (2, 3) and all(w[0].isupper() and w[1:].islower() for w in words):
+        return "People"
+    return "Concepts"
+
+
+def extract_entities(text: str, limit: int = 20) -> List[Entity]:
+    """Rule-based entities with relevance from mention frequency and position."""
+    # (name, category) -> [mention count, first position]
+    mentions: Dict[Tuple[str, str], List[int]] = {}
+
+    def add(name: str, category: str, position: int, count: int = 1) -> None:
+        entry = mentions.get((name, category))
+        if entry is None:
+            mentions[(name, category)] = [count, position]
+        else:
+            entry[0] += count
+            entry[1] = min(entry[1], position)
+
+    dates = []
+    for match in _DATE.finditer(text):
+        dates.append(match.span())
+        add(match.group(0), "Dates", match.start())
+    for match in _TECH_PHRASE.finditer(text.lower()):
+        add(match.group(0), "Technologies", match.start())
+    words = _LOWER_WORD.findall(text)
+    lowercase_words = set(words)
+    technologies = lowercase_words & TECHNOLOGIES
+    if technologies:
+        counts = Counter(words)
+        # Rescan for first positions; a word may be followed by "_" or a capital.
+        for match in _LOWER_WORD.finditer(text):
+            word = match.group(0)
+            if word in technologies:
+                technologies.discard(word)
+                add(word, "Technologies", match.start(), counts[word])
+                if not technologies:
+                    break
+
+    for match in _CAPITALIZED.finditer(text):
+        start, end = match.span()
+        if dates and any(s <= start < e for s, e in dates):
+            continue
+        words = match.group(0).split()
+        # Drop leading stopwords and titles ("The", "Dr") from the span.
+        before = ""
+        while words and (
+            words[0].lower() in STOPWORDS or words[0].lower().rstrip(".") in _PERSON_TITLES
+        ):
+            before = words[0].lower().rstrip(".")
+            start += len(words[0]) + 1
+            words = words[1:]
+        if not words:
+            continue
+        name = " ".join(words)
+        lowered = name.lower()
+        if lowered in _TECH_PHRASES:
+            continue
+        if lowered in TECHNOLOGIES:
+            add(name if name.isupper() else lowered, "Technologies", start)
+            continue
+        if not before:
+            preceding = text[max(0, start - 20) : start].rstrip()
+            if len(words) == 1 and (not preceding or preceding[-1] in ".!?\"'"):
+                # Sentence-initial single words are usually ordinary words
+                # unless they recur in lowercase-free form elsewhere.
+                if lowered in lowercase_words or name.endswith(("s", "ing", "ed", "ly")):
+                    continue
+            before = preceding.rsplit(None, 1)[-1].lower().rstrip(".,") if preceding else ""
+        elif len(words) == 1 and lowered in lowercase_words:
+            continue
+        following = text[end : end + 20].split()
+        after = following[0].lower().strip(".,") if following else ""
+        add(name, _categorize(name, before, after), start)
+
+    # Later mentions of a person by surname count towards the full name.
+    people = [key for key in mentions if key[1] == "People"]
+    for person in people:
+        surname = person[0].split()[-1]
+        for key in list(mentions):
+            if key != person and key[0] == surname and key[1] != "Dates" and person in mentions:
+                count, position = mentions.pop(key)
+                add(*person, position, count)
+
+    if not mentions:
+        return []
+    top = max(count for count, _ in mentions.values())
+    length = max(len(text), 1)
+    scored = sorted(
+        (
+            -round(min(1.0, 0.3 + 0.5 * count / top + 0.2 * (1 - first / length)), 3),
+            name,
+            category,
+        )
+        for (name, category), (count, first) in mentions.items()
+    )
+    return [
+        Entity.model_construct(entity=name, category=category, relevance=-score)
+        for score, name, category in scored[:limit]
+    ]
+
+
+def summarize(text: str, max_length: Optional[int] = None, sentences: int = 3) -> str:
+    """Extractive summary of the top TextRank sentences, in document order.
+
+    With ``max_length`` sentences are added best-first while they fit in that
+    many words; otherwise the top ``sentences`` are used. Only the first
+    ``_MAX_RANKED_SENTENCES`` sentences are candidates.
+    """
+    parts = split_sentences(text)[:_MAX_RANKED_SENTENCES]
+    if not parts:
+        return ""
+    scores = textrank(parts)
+    # Break ties towards earlier sentences, which lead news articles.
+    order = np.lexsort((np.arange(len(parts)), -scores))
+    chosen: List[int] = []
+    words = 0
+    for i in order:
+        count = len(parts[i].split())
+        if max_length is None:
+            if len(chosen) == sentences:
+                break
+        elif words + count > max_length:
+            if chosen:
+                continue
+            return " ".join(parts[i].split()[:max_length])
+        chosen.append(int(i))
+        words += count
+    return " ".join(parts[i] for i in sorted(chosen))
+
+
+def relevance(query: str, contents: Sequence[str], k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+    """BM25-style relevance of each content to ``query``, scaled to [0, 1].
+
+    1.0 means every query term occurs with saturated frequency. Useful as a
+    cheap pre-filter before sending articles to an API agent.
+    """
+    terms = list(dict.fromkeys(content_terms(query)))
+    if not terms or not contents:
+        return np.zeros(len(contents))
+    index = {term: i for i, term in enumerate(terms)}
+    counts = np.zeros((len(contents), len(terms)))
+    lengths = np.zeros(len(contents))
+    for row, content in enumerate(contents):
+        words = content_terms(content)
+        lengths[row] = len(words)
+        for word in words:
+            column = index.get(word)
+            if column is not None:
+                counts[row, column] += 1
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log1p((len(contents) - document_frequency + 0.5) / (document_frequency + 0.5))
+    norm = lengths / max(lengths.mean(), 1.0)
+    saturation = counts * (k1 + 1) / (counts + k1 * (1 - b + b * norm)[:, None])
+    return (saturation @ idf) / ((k1 + 1) * idf.sum())
+
+
+@dataclass
+class _Analysis:
+    summary: str
+    entities: List[Entity]
+    keywords: List[Tuple[str, float]]
+
+
+def _analyze(
+    content: str, max_length: Optional[int], summary_sentences: int, max_entities: int
+) -> _Analysis:
+    # Module-level so that it can be sent to a process pool.
+    return _Analysis(
+        summary=summarize(content, max_length, summary_sentences),
+        entities=extract_entities(content, max_entities),
+        keywords=extract_keywords(content),
+    )
+
+
+class LocalAgent(BaseAgent):
+    """Agent that runs entirely on CPU without network access.
+
+    The regex and NumPy work runs in an executor so that it never blocks the
+    event loop. Threads keep the loop responsive but share the GIL; pass
+    ``processes`` to spread batches such as ``process_many`` over cores.
+
+    Args:
+        summary_sentences: Sentences in a summary when no length is given.
+        max_entities: Maximum entities returned per text.
+        max_concurrency: Limit on in-flight calls for the batch methods.
+        executor: Executor for the CPU-bound work; the event loop's default
+            thread pool if None.
+        processes: Size of a process pool that the agent creates in
+            ``initialize`` and shuts down in ``cleanup``, instead of
+            ``executor``. Use ``os.cpu_count()`` for one worker per core.
+    """
+
+    name = "local"
+    model = "local"
+
+    def __init__(
+        self,
+        summary_sentences: int = 3,
+        max_entities: int = 20,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        processes: Optional[int] = None,
+    ):
+        if executor is not None and processes is not None:
+            raise ValueError("pass either executor or processes, not both")
+        if processes is not None and processes < 1:
+            raise ValueError(f"processes must be at least 1, got {processes}")
+        self.summary_sentences = summary_sentences
+        self.max_entities = max_entities
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.processes = processes
+
+    async def initialize(self) -> None:
+        if self.processes is not None and self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _analyze(self, content: str, max_length: Optional[int] = None) -> _Analysis:
+        return await self._run(
+            _analyze, content, max_length, self.summary_sentences, self.max_entities
+        )
+
+    def _questions(self, analysis: _Analysis, num_questions: int) -> List[str]:
+        themes = [phrase for phrase, _ in analysis.keywords]
+        entities = [e.entity for e in analysis.entities if e.category != "Dates"] or themes
+        if not themes:
+            return []
+        questions = []
+        for i in range(num_questions):
+            template = QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)]
+            questions.append(
+                template.format(
+                    theme=themes[i // 2 % len(themes)],
+                    other_theme=themes[(i // 2 + 1) % len(themes)],
+                    entity=entities[i // 2 % len(entities)],
+                    other_entity=entities[(i // 2 + 1) % len(entities)],
+                )
+            )
+        return list(dict.fromkeys(questions))
+
+    async def analyze_topic(
+        self, topic: str, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Outline a topic from the text in ``context`` (e.g. article contents).
+
+        Without context only the topic's own terms are available.
+        """
+        text = "\n".join(
+            value if isinstance(value, str) else "\n".join(str(v) for v in value)
+            for value in (context or {}).values()
+            if isinstance(value, (str, list, tuple))
+        )
+        analysis = await self._analyze(f"{topic}.\n{text}")
+        stakeholders = [
+            e.entity for e in analysis.entities if e.category in ("People", "Organizations")
+        ]
+        related = [
+            e.entity
+            for e in analysis.entities
+            if e.category in ("Technologies", "Concepts", "Locations")
+        ]
+        lines = [
+            f"Topic: {topic}",
+            f"1. Main themes: {', '.join(k for k, _ in analysis.keywords[:5]) or 'n/a'}",
+            f"2. Key stakeholders: {', '.join(stakeholders[:5]) or 'n/a'}",
+            f"3. Related topics: {', '.join(related[:5]) or 'n/a'}",
+        ]
+        if text:
+            summary = await self._run(summarize, text, None, self.summary_sentences)
+            lines.append(f"4. Summary: {summary}")
+        return {"analysis": "\n".join(lines), "model": self.model, "tokens_used": 0}
+
+    async def summarize_content(self, content: str, max_length: Optional[int] = None) -> str:
+        return await self._run(summarize, content, max_length, self.summary_sentences)
+
+    async def extract_entities(self, content: str) -> List[Entity]:
+        return await self._run(extract_entities, content, self.max_entities)
+
+    async def extract_keywords(self, content: str, limit: int = 10) -> List[Tuple[str, float]]:
+        return await self._run(extract_keywords, content, limit)
+
+    async def generate_questions(self, content: str, num_questions: int = 3) -> List[str]:
+        return self._questions(await self._analyze(content), num_questions)
+
+    async def process_content(
+        self,
+        content: str,
+        max_length: Optional[int] = None,
+        num_questions: int = 3,
+    ) -> ContentAnalysisResult:
+        """Summary, entities and questions from a single pass over the content."""
+        analysis = await self._analyze(content, max_length)
+        return ContentAnalysisResult(
+            summary=analysis.summary,
+            entities=analysis.entities,
+            questions=self._questions(analysis, num_questions),
+        )
+
+    async def cleanup(self) -> None:
+        if self.processes is not None and self.executor is not None:
+            # Only the pool created in initialize is owned by the agent.
+            await asyncio.to_thread(self.executor.shutdown)
+            self.executor = None
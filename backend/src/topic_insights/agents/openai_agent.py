@@ -1,131 +1,562 @@
-from typing import Any, Dict, List, Optional
 import os
-from openai import AsyncOpenAI
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from openai import APIConnectionError, AsyncOpenAI
+from pydantic import BaseModel, ValidationError
+
+from ..metrics import (
+    AGENT_LATENCY,
+    AGENT_REQUESTS,
+    STRUCTURED_OUTPUTS,
+    count_retry,
+    record_cache,
+    record_prompt,
+    record_usage,
+)
+from ..models.agents import (
+    CONTENT_ANALYSIS_JSON_SCHEMA,
+    ENTITY_LIST_JSON_SCHEMA,
+    QUESTION_LIST_JSON_SCHEMA,
+    ContentAnalysisResult,
+    Entity,
+    EntityList,
+    QuestionList,
+)
 from .base import BaseAgent
+from .batch import run_bounded
+from .cache import ResponseCache, make_cache_key
+from .prompts import (
+    ANALYZE_TOPIC,
+    EXTRACT_ENTITIES,
+    GENERATE_QUESTIONS,
+    PROCESS_CONTENT,
+    SUMMARIZE_CONTENT,
+    PromptBuilder,
+    PromptTemplate,
+)
+from .ratelimit import RateLimiter, is_retryable_error, retry_async
+from .structured import JSONArrayStream, StructuredOutputError, parse_model
+from .tokens import count_message_tokens, count_tokens
+
+M = TypeVar("M", bound=BaseModel)
+
+# Per-request limits of the OpenAI embeddings endpoint.
+EMBEDDING_MAX_INPUTS = 2048
+EMBEDDING_MAX_REQUEST_TOKENS = 300_000
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry throttling, server errors and connection failures."""
+    return isinstance(exc, APIConnectionError) or is_retryable_error(exc)
 
 class OpenAIAgent(BaseAgent):
     """OpenAI-based implementation of the agent interface."""
     
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    name = "openai"
+    supports_embeddings = True
+    
+    # Calls re-asked with the validation error when structured output is invalid.
+    max_output_retries: int = 1
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        embedding_model: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        client: Optional[AsyncOpenAI] = None,
+        max_input_tokens: Optional[int] = None,
+    ):
         """Initialize the OpenAI agent.
         
         Args:
             api_key: Optional API key. If not provided, will use OPENAI_API_KEY env var.
             model: Optional model name. If not provided, will use OPENAI_MODEL env var or default to gpt-4o.
+            embedding_model: Optional embedding model. If not provided, will use
+                OPENAI_EMBEDDING_MODEL env var or default to text-embedding-3-small.
+            cache: Optional response cache. Identical calls are served from it instead of the API.
+            rate_limiter: Optional requests/tokens-per-minute limiter applied to every API call.
+            max_concurrency: Optional limit on in-flight calls for the batch methods.
+            max_retries: Number of jittered retries for throttled (429) or failed (5xx) calls.
+            client: Optional shared client (and connection pool). It is not closed by ``cleanup``.
+            max_input_tokens: Optional per-call prompt budget; source content is trimmed to fit.
+                If not provided, will use OPENAI_MAX_INPUT_TOKENS env var or leave
+                prompts untrimmed.
         """
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.api_key = (
+            api_key or (client.api_key if client else None) or os.getenv("OPENAI_API_KEY")
+        )
         if not self.api_key:
             raise ValueError("OpenAI API key not provided and OPENAI_API_KEY env var not set")
             
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o")
-        self.client = None
+        self.embedding_model = embedding_model or os.getenv(
+            "OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"
+        )
+        self.client = client
+        self._owns_client = client is None
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if max_input_tokens is None and os.getenv("OPENAI_MAX_INPUT_TOKENS"):
+            max_input_tokens = int(os.environ["OPENAI_MAX_INPUT_TOKENS"])
+        self.prompts = PromptBuilder(self.model, max_input_tokens)
         
     async def initialize(self) -> None:
         """Initialize the OpenAI client."""
-        self.client = AsyncOpenAI(api_key=self.api_key)
+        if self.client is not None:
+            return
+        # Retries are handled by _chat so they can respect the rate limiter.
+        self.client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
         
-    async def analyze_topic(self, topic: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Analyze a topic using OpenAI."""
+    def _count(self, method: str, model: str, outcome: str) -> None:
+        AGENT_REQUESTS.inc(agent=self.name, method=method, model=model, outcome=outcome)
+        
+    async def _cache_get(self, key: str) -> Any:
+        """Look up the response cache and publish its hit ratio."""
+        cached = await self.cache.get(key)
+        record_cache(f"{self.name}_responses", self.cache.stats.hits, self.cache.stats.misses)
+        return cached
+        
+    async def _call(
+        self,
+        method: str,
+        model: str,
+        call: Callable[[], Awaitable[Any]],
+        observe_latency: bool = True,
+    ) -> Any:
+        """Run an API call with retries, recording its latency, outcome and retries."""
+        started = time.perf_counter()
+        try:
+            response = await retry_async(
+                call,
+                max_retries=self.max_retries,
+                is_retryable=_is_retryable,
+                on_retry=count_retry(self.name, method),
+            )
+        except Exception:
+            self._count(method, model, "error")
+            raise
+        finally:
+            if observe_latency:
+                AGENT_LATENCY.observe(
+                    time.perf_counter() - started, agent=self.name, method=method, model=model
+                )
+        self._count(method, model, "ok")
+        return response
+        
+    async def _cache_set(
+        self,
+        method: str,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        result: Dict[str, Any],
+    ) -> None:
+        """Cache a chat result for callers that only store output they validated."""
+        if self.cache is not None:
+            await self.cache.set(make_cache_key(self.model, method, messages, params), result)
+            
+    async def _chat(
+        self,
+        method: str,
+        messages: List[Dict[str, str]],
+        cache_result: bool = True,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Run a chat completion, consulting the response cache first.
+        
+        Returns a dict with the completion ``content`` and ``tokens_used``. With
+        ``cache_result`` false the reply is not cached; the caller stores it
+        with ``_cache_set`` once it is known to be valid.
+        """
         if not self.client:
             await self.initialize()
             
-        prompt = f"""Analyze the following topic and provide key insights:
-Topic: {topic}
-{f'Additional Context: {context}' if context else ''}
-
-Please provide:
-1. Main themes
-2. Key stakeholders
-3. Potential impact areas
-4. Related topics
-5. Current trends"""
-
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert analyst providing insights on topics."},
-                {"role": "user", "content": prompt}
-            ]
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(self.model, method, messages, params)
+            cached = await self._cache_get(key)
+            if cached is not None:
+                self._count(method, self.model, "cached")
+                return cached
+                
+        estimated_tokens = count_message_tokens(messages, self.model)
+        
+        async def call() -> Any:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(estimated_tokens)
+            return await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                **params
+            )
+            
+        response = await self._call(method, self.model, call)
+        
+        usage = getattr(response, "usage", None)
+        record_usage(self.model, usage)
+        if self.rate_limiter is not None and usage is not None:
+            self.rate_limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+        result = {
+            "content": response.choices[0].message.content,
+            "tokens_used": getattr(usage, "total_tokens", None) if usage else None,
+        }
+        if key is not None and cache_result and result["content"] is not None:
+            await self.cache.set(key, result)
+        return result
+        
+    async def _chat_stream(
+        self,
+        method: str,
+        messages: List[Dict[str, str]],
+        cache_result: bool = True,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive.
+        
+        Cached responses are yielded as a single chunk, and completed streams are
+        written back to the cache unless ``cache_result`` is false. Retries only
+        happen before the stream opens. Closing the generator early closes the
+        underlying HTTP stream.
+        """
+        if not self.client:
+            await self.initialize()
+            
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(self.model, method, messages, params)
+            cached = await self._cache_get(key)
+            if cached is not None:
+                self._count(method, self.model, "cached")
+                yield cached["content"]
+                return
+                
+        estimated_tokens = count_message_tokens(messages, self.model)
+        
+        async def call() -> Any:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(estimated_tokens)
+            return await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **params
+            )
+            
+        started = time.perf_counter()
+        stream = await self._call(method, self.model, call, observe_latency=False)
+        parts: List[str] = []
+        tokens_used = None
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    tokens_used = chunk.usage.total_tokens
+                    record_usage(self.model, chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        finally:
+            await stream.close()
+            AGENT_LATENCY.observe(
+                time.perf_counter() - started, agent=self.name, method=method, model=self.model
+            )
+            
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_usage(estimated_tokens, tokens_used)
+        if key is not None and cache_result and parts:
+            await self.cache.set(key, {"content": "".join(parts), "tokens_used": tokens_used})
+            
+    def _prompt(
+        self,
+        template: PromptTemplate,
+        content: Optional[str] = None,
+        params: Sequence[Tuple[str, Any]] = (),
+        context: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, str]]:
+        """Build a prompt from a template and record its token accounting."""
+        prompt = self.prompts.build(template, content, params, context)
+        record_prompt(
+            self.name, template.name, prompt.prefix_tokens, prompt.tokens, prompt.saved_tokens
         )
+        return prompt.messages
         
+    def _json_schema(self, name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a strict ``response_format`` for a JSON schema."""
         return {
-            "analysis": response.choices[0].message.content,
+            "type": "json_schema",
+            "json_schema": {"name": name, "strict": True, "schema": schema},
+        }
+        
+    async def _structured(
+        self,
+        method: str,
+        messages: List[Dict[str, str]],
+        output: Type[M],
+        schema: Dict[str, Any],
+        list_key: Optional[str] = None,
+    ) -> M:
+        """Run a schema-constrained chat completion and validate it into ``output``.
+        
+        Invalid output is repaired locally when possible. Otherwise the call is
+        re-asked up to ``max_output_retries`` times with the validation error,
+        after which ``StructuredOutputError`` is raised. Only a reply that
+        validates is cached, under the original request.
+        """
+        params = {"response_format": self._json_schema(method, schema)}
+        request = messages
+        for attempt in range(self.max_output_retries + 1):
+            response = await self._chat(method, messages, cache_result=False, **params)
+            content = response["content"]
+            try:
+                result, repaired = parse_model(content, output, list_key)
+            except StructuredOutputError as exc:
+                STRUCTURED_OUTPUTS.inc(agent=self.name, method=method, outcome="invalid")
+                if attempt == self.max_output_retries:
+                    raise
+                messages = messages + [
+                    {"role": "assistant", "content": content or ""},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"That reply was invalid ({exc}). "
+                            "Reply with only the corrected JSON."
+                        ),
+                    },
+                ]
+                continue
+            outcome = "repaired" if repaired else "retried" if attempt else "valid"
+            STRUCTURED_OUTPUTS.inc(agent=self.name, method=method, outcome=outcome)
+            await self._cache_set(method, request, params, response)
+            return result
+        raise AssertionError("unreachable: the last attempt returns or raises")
+        
+    def _analyze_topic_messages(
+        self, topic: str, context: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for topic analysis."""
+        return self._prompt(ANALYZE_TOPIC, params=[("Topic", topic)], context=context)
+        
+    async def analyze_topic(
+        self, topic: str, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Analyze a topic using OpenAI."""
+        if not self.client:
+            await self.initialize()
+            
+        response = await self._chat("analyze_topic", self._analyze_topic_messages(topic, context))
+        
+        return {
+            "analysis": response["content"],
             "model": self.model,
-            "tokens_used": response.usage.total_tokens
+            "tokens_used": response["tokens_used"]
         }
         
+    async def stream_analyze_topic(
+        self, topic: str, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Analyze a topic using OpenAI, yielding token deltas as they arrive."""
+        messages = self._analyze_topic_messages(topic, context)
+        async for delta in self._chat_stream("analyze_topic", messages):
+            yield delta
+            
+    def _summarize_messages(
+        self, content: str, max_length: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for content summarization."""
+        return self._prompt(SUMMARIZE_CONTENT, content, [("Target length in words", max_length)])
+        
     async def summarize_content(self, content: str, max_length: Optional[int] = None) -> str:
         """Generate a summary using OpenAI."""
         if not self.client:
             await self.initialize()
             
-        length_guidance = f"in approximately {max_length} words" if max_length else "concisely"
-        prompt = f"Please summarize the following content {length_guidance}, capturing the key points and main message:\n\n{content}"
+        messages = self._summarize_messages(content, max_length)
+        response = await self._chat("summarize_content", messages)
         
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert at summarizing content accurately and concisely."},
-                {"role": "user", "content": prompt}
-            ]
+        return response["content"]
+        
+    async def stream_summarize_content(
+        self, content: str, max_length: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Generate a summary using OpenAI, yielding token deltas as they arrive."""
+        messages = self._summarize_messages(content, max_length)
+        async for delta in self._chat_stream("summarize_content", messages):
+            yield delta
+            
+    async def extract_entities(self, content: str) -> List[Entity]:
+        """Extract entities using OpenAI structured outputs."""
+        result = await self._structured(
+            "extract_entities",
+            self._prompt(EXTRACT_ENTITIES, content),
+            EntityList,
+            ENTITY_LIST_JSON_SCHEMA,
+            list_key="entities",
         )
+        return result.entities
         
-        return response.choices[0].message.content
+    async def stream_extract_entities(self, content: str) -> AsyncIterator[Entity]:
+        """Extract entities using OpenAI, yielding each one as soon as it is complete.
         
-    async def extract_entities(self, content: str) -> List[Dict[str, Any]]:
-        """Extract entities using OpenAI."""
-        if not self.client:
-            await self.initialize()
+        Streamed items cannot be re-asked, so ones that fail validation are
+        skipped and counted as invalid.
+        """
+        messages = self._prompt(EXTRACT_ENTITIES, content)
+        params = {
+            "response_format": self._json_schema("extract_entities", ENTITY_LIST_JSON_SCHEMA)
+        }
+        parser = JSONArrayStream("entities")
+        parts: List[str] = []
+        invalid = 0
+        async for delta in self._chat_stream(
+            "extract_entities", messages, cache_result=False, **params
+        ):
+            parts.append(delta)
+            for item in parser.feed(delta):
+                try:
+                    entity = Entity.model_validate(item)
+                except ValidationError:
+                    invalid += 1
+                    STRUCTURED_OUTPUTS.inc(
+                        agent=self.name, method="extract_entities", outcome="invalid"
+                    )
+                    continue
+                yield entity
+        for _ in range(parser.skipped):
+            STRUCTURED_OUTPUTS.inc(agent=self.name, method="extract_entities", outcome="invalid")
+        # Cache only complete, valid documents; extract_entities reads the same key.
+        if parser.done and not parser.skipped and not invalid:
+            result = {"content": "".join(parts), "tokens_used": None}
+            await self._cache_set("extract_entities", messages, params, result)
             
-        prompt = """Please analyze the following content and extract key entities in the following categories:
-- People
-- Organizations
-- Locations
-- Technologies
-- Concepts
-- Dates
-
-Format the response as a JSON array where each item has 'entity', 'category', and 'relevance' (0-1) fields.
-
-Content:
-{content}"""
-        
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert at entity extraction and analysis."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={ "type": "json_object" }
+    async def generate_questions(self, content: str, num_questions: int = 3) -> List[str]:
+        """Generate follow-up questions using OpenAI structured outputs."""
+        result = await self._structured(
+            "generate_questions",
+            self._prompt(GENERATE_QUESTIONS, content, [("Number of questions", num_questions)]),
+            QuestionList,
+            QUESTION_LIST_JSON_SCHEMA,
+            list_key="questions",
         )
+        questions = [q.strip() for q in result.questions if q.strip()]
+        return questions[:num_questions]
         
-        return response.choices[0].message.content
+    async def process_content(
+        self,
+        content: str,
+        max_length: Optional[int] = None,
+        num_questions: int = 3,
+    ) -> ContentAnalysisResult:
+        """Summarize, extract entities and generate questions in one structured-output call."""
+        result = await self._structured(
+            "process_content",
+            self._prompt(
+                PROCESS_CONTENT,
+                content,
+                [
+                    ("Target summary length in words", max_length),
+                    ("Number of questions", num_questions),
+                ],
+            ),
+            ContentAnalysisResult,
+            CONTENT_ANALYSIS_JSON_SCHEMA,
+        )
+        result.questions = result.questions[:num_questions]
+        return result
         
-    async def generate_questions(self, content: str, num_questions: int = 3) -> List[str]:
-        """Generate follow-up questions using OpenAI."""
+    def _pack_embedding_batches(
+        self, texts: List[str], indexes: List[int], max_tokens: int
+    ) -> List[List[int]]:
+        """Group input indexes into requests under the input-count and token limits."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i in indexes:
+            tokens = count_tokens(texts[i], self.embedding_model)
+            full = len(current) >= EMBEDDING_MAX_INPUTS or current_tokens + tokens > max_tokens
+            if current and full:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+        
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one packed request of texts."""
+        tokens = sum(count_tokens(text, self.embedding_model) for text in texts)
+        
+        async def call() -> Any:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(tokens)
+            return await self.client.embeddings.create(model=self.embedding_model, input=texts)
+            
+        response = await self._call("embed", self.embedding_model, call)
+        record_usage(self.embedding_model, getattr(response, "usage", None))
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        
+    async def embed_many(
+        self,
+        texts: List[str],
+        max_request_tokens: int = EMBEDDING_MAX_REQUEST_TOKENS,
+    ) -> List[List[float]]:
+        """Generate embeddings, packing many inputs into each API request.
+        
+        Cached inputs are skipped; the remaining ones are packed into requests
+        under the input-count and token limits and sent concurrently.
+        """
         if not self.client:
             await self.initialize()
             
-        prompt = f"""Based on the following content, generate {num_questions} insightful follow-up questions that would help deepen understanding or explore related areas:
-
-Content:
-{content}"""
-        
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert at generating insightful questions for further research."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        # Parse the response into a list of questions
-        questions_text = response.choices[0].message.content
-        questions = [q.strip() for q in questions_text.split("\n") if q.strip()]
-        return questions[:num_questions]
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        keys: List[Optional[str]] = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if self.cache is not None:
+                keys[i] = make_cache_key(self.embedding_model, "embed", text)
+                cached = await self._cache_get(keys[i])
+                if cached is not None:
+                    vectors[i] = cached
+                    continue
+            pending.append(i)
+            
+        batches = self._pack_embedding_batches(texts, pending, max_request_tokens)
+        async for item in run_bounded(
+            lambda batch: self._embed_batch([texts[i] for i in batch]),
+            batches,
+            self.max_concurrency,
+        ):
+            if item.error is not None:
+                raise item.error
+            for i, vector in zip(item.item, item.result):
+                vectors[i] = vector
+                if keys[i] is not None:
+                    await self.cache.set(keys[i], vector)
+        return vectors
         
     async def cleanup(self) -> None:
         """Cleanup resources."""
-        if self.client:
+        if self.client and self._owns_client:
             await self.client.close()
-            self.client = None 
\ No newline at end of file
+        self.client = None 
\ No newline at end of file
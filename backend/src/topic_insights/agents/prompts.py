@@ -0,0 +1,273 @@
+"""
+Prompt building with token budgets and a cache-friendly layout.
+
+Every prompt is a fixed system message (role and full instructions) followed by
+one user message holding the per-call parameters and content. The system
+message is identical across calls of a method, so provider-side prefix caching
+can reuse it and only the variable tail is processed in full. Source text is
+stripped of markup and boilerplate, and context is serialized as compact JSON;
+both are trimmed to fit the call's token budget.
+"""
+import html
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens, truncate_tokens
+
+_TAG = re.compile(r"<[^>]+>")
+_SCRIPT = re.compile(r"<(script|style|noscript)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+_SPACES = re.compile(r"[ \t\f\v\xa0]+")
+_BOILERPLATE = re.compile(
+    "|".join(
+        [
+            r"^(advertisement|sponsored( content)?|ad)$",
+            r"\b(accept|manage|reject) (all )?cookies\b",
+            r"\bcookie (policy|preferences|settings)\b",
+            r"^(subscribe|sign up|log in|sign in)\b.{0,80}$",
+            r"^(share|tweet|email) (this|on)\b",
+            r"^(read more|continue reading|click here|see also)\b.{0,80}$",
+            r"\ball rights reserved\b",
+            r"^follow us\b",
+            r"^(related|recommended)( articles| stories| posts)?:?$",
+            r"^(photo|image|video)( credit)?:",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+
+def clean_source(text: Optional[str]) -> str:
+    """Strip markup, boilerplate lines, repeated lines and redundant whitespace."""
+    if not text:
+        return ""
+    text = html.unescape(_TAG.sub(" ", _SCRIPT.sub(" ", text)))
+    lines: List[str] = []
+    seen = set()
+    for line in text.splitlines():
+        line = _SPACES.sub(" ", line).strip()
+        if not line or _BOILERPLATE.search(line):
+            continue
+        if line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _prune(value: Any, max_chars: int, max_items: int) -> Any:
+    if isinstance(value, dict):
+        pruned = {str(k): _prune(v, max_chars, max_items) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple, set)):
+        items = [_prune(v, max_chars, max_items) for v in list(value)[:max_items]]
+        return [v for v in items if v not in (None, "", [], {})]
+    if isinstance(value, str):
+        value = _SPACES.sub(" ", value).strip()
+        return value if len(value) <= max_chars else value[: max_chars - 1].rstrip() + "…"
+    return value
+
+
+def compact_context(
+    context: Optional[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    model: Optional[str] = None,
+    max_chars: int = 500,
+    max_items: int = 10,
+) -> str:
+    """Serialize context as compact, key-sorted JSON within ``max_tokens``.
+
+    Empty values are dropped, long strings and lists are shortened, and the
+    limits are halved until the result fits the budget.
+    """
+    if not context:
+        return ""
+    while True:
+        text = json.dumps(
+            _prune(context, max_chars, max_items),
+            ensure_ascii=False,
+            separators=(",", ":"),
+            sort_keys=True,
+            default=str,
+        )
+        if max_tokens is None or count_tokens(text, model) <= max_tokens:
+            return text if text != "{}" else ""
+        if max_chars <= 20 and max_items <= 1:
+            return truncate_tokens(text, max_tokens, model)
+        max_chars = max(20, max_chars // 2)
+        max_items = max(1, max_items // 2)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A method's fixed instructions; everything per-call goes in the user message."""
+
+    name: str
+    system: str
+
+
+@dataclass
+class Prompt:
+    """Messages ready to send, with their token accounting.
+
+    ``prefix_tokens`` is the cacheable fixed part. ``source_tokens`` counts the
+    raw content and context before cleaning and trimming, so ``saved_tokens``
+    is what compaction removed.
+    """
+
+    messages: List[Dict[str, str]]
+    tokens: int
+    prefix_tokens: int
+    source_tokens: int
+    content_tokens: int
+    trimmed: bool = False
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.source_tokens - self.content_tokens)
+
+
+class PromptBuilder:
+    """Builds prompts within a per-call input token budget.
+
+    Args:
+        model: Model whose tokenizer is used for counting.
+        max_input_tokens: Budget for the whole prompt; content is trimmed to fit.
+            None means only cleaning is applied.
+        max_context_tokens: Budget for the serialized context.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        max_input_tokens: Optional[int] = None,
+        max_context_tokens: int = 500,
+    ):
+        self.model = model
+        self.max_input_tokens = max_input_tokens
+        self.max_context_tokens = max_context_tokens
+        self._prefix_tokens: Dict[str, int] = {}
+
+    def prefix_tokens(self, template: PromptTemplate) -> int:
+        tokens = self._prefix_tokens.get(template.system)
+        if tokens is None:
+            tokens = count_tokens(template.system, self.model) + MESSAGE_OVERHEAD_TOKENS
+            self._prefix_tokens[template.system] = tokens
+        return tokens
+
+    def build(
+        self,
+        template: PromptTemplate,
+        content: Optional[str] = None,
+        params: Sequence[Tuple[str, Any]] = (),
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Prompt:
+        """Lay out ``params``, ``context`` and ``content`` after the fixed instructions.
+
+        ``params`` are short ``(label, value)`` pairs such as the topic or the
+        target length; pairs with a None value are omitted.
+        """
+        prefix_tokens = self.prefix_tokens(template)
+        head = [f"{label}: {value}" for label, value in params if value is not None]
+        source_tokens = content_tokens = 0
+        if context:
+            source_tokens += count_tokens(str(context), self.model)
+            serialized = compact_context(context, self.max_context_tokens, self.model)
+            if serialized:
+                content_tokens += count_tokens(serialized, self.model)
+                head.append(f"Context: {serialized}")
+        header = "\n".join(head)
+
+        body = ""
+        trimmed = False
+        if content is not None:
+            source_tokens += count_tokens(content, self.model)
+            body = clean_source(content)
+            if self.max_input_tokens is not None:
+                budget = (
+                    self.max_input_tokens
+                    - prefix_tokens
+                    - MESSAGE_OVERHEAD_TOKENS
+                    - count_tokens(header + "\n\nContent:\n", self.model)
+                )
+                if count_tokens(body, self.model) > budget:
+                    body = truncate_tokens(body, budget, self.model)
+                    trimmed = True
+            content_tokens += count_tokens(body, self.model)
+
+        parts = [header] if header else []
+        if content is not None:
+            parts.append(f"Content:\n{body}")
+        user = "\n\n".join(parts)
+        return Prompt(
+            messages=[
+                {"role": "system", "content": template.system},
+                {"role": "user", "content": user},
+            ],
+            tokens=prefix_tokens + count_tokens(user, self.model) + MESSAGE_OVERHEAD_TOKENS,
+            prefix_tokens=prefix_tokens,
+            source_tokens=source_tokens,
+            content_tokens=content_tokens,
+            trimmed=trimmed,
+        )
+
+
+ANALYZE_TOPIC = PromptTemplate(
+    "analyze_topic",
+    """You are an expert analyst providing insights on topics.
+
+Analyze the topic given by the user, taking any context into account, and provide:
+1. Main themes
+2. Key stakeholders
+3. Potential impact areas
+4. Related topics
+5. Current trends""",
+)
+
+SUMMARIZE_CONTENT = PromptTemplate(
+    "summarize_content",
+    """You are an expert at summarizing content accurately and concisely.
+
+Summarize the content given by the user, capturing the key points and main message. \
+If a target length in words is given, write approximately that many words; otherwise be concise.""",
+)
+
+EXTRACT_ENTITIES = PromptTemplate(
+    "extract_entities",
+    """You are an expert at entity extraction and analysis.
+
+Extract the key entities from the content given by the user, in these categories:
+- People
+- Organizations
+- Locations
+- Technologies
+- Concepts
+- Dates
+
+Respond with a JSON object with an "entities" array where each item has 'entity', \
+'category', and 'relevance' (0-1) fields.""",
+)
+
+GENERATE_QUESTIONS = PromptTemplate(
+    "generate_questions",
+    """You are an expert at generating insightful questions for further research.
+
+Based on the content given by the user, generate the requested number of insightful \
+follow-up questions that would help deepen understanding or explore related areas. \
+Respond with a JSON object with a "questions" array of strings.""",
+)
+
+PROCESS_CONTENT = PromptTemplate(
+    "process_content",
+    """You are an expert analyst who summarizes content, extracts entities and generates \
+research questions.
+
+Analyze the content given by the user and return:
+- summary: a summary capturing the key points and main message, of approximately the \
+target length in words if one is given, otherwise concise
+- entities: key entities, each with 'entity', 'category' (People, Organizations, \
+Locations, Technologies, Concepts or Dates) and 'relevance' (0-1)
+- questions: the requested number of insightful follow-up questions that would help \
+deepen understanding or explore related areas""",
+)
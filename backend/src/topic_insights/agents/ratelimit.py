@@ -0,0 +1,124 @@
+"""
+Rate limiting and retry helpers for agent API calls.
+
+``RateLimiter`` enforces requests-per-minute and tokens-per-minute budgets with a
+pair of token buckets. ``retry_async`` retries throttled or failed calls with
+jittered exponential backoff.
+"""
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Async token bucket that refills continuously up to ``capacity``.
+
+    The level may go negative when usage is recorded after the fact; later
+    acquisitions then wait until the debt has been refilled.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive")
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._level = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self._level
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated_at) * self.refill_per_second
+        )
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until ``amount`` tokens are available, then take them."""
+        # Requests larger than the bucket would never fit; cap them at capacity.
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                await asyncio.sleep((amount - self._level) / self.refill_per_second)
+
+    def consume(self, amount: float) -> None:
+        """Take tokens without waiting, allowing the level to go negative."""
+        self._refill()
+        self._level -= amount
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60)
+            if requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+        )
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait for one request slot and ``tokens`` tokens of budget."""
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+
+    def record_usage(self, estimated: int, actual: Optional[int]) -> None:
+        """Charge the difference between actual and estimated token usage."""
+        if self.tokens is not None and isinstance(actual, int) and actual > estimated:
+            self.tokens.consume(actual - estimated)
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Return True for throttling (429), server (5xx) and transport errors."""
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError))
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 30.0) -> float:
+    """Full-jitter exponential backoff delay for the given attempt number."""
+    return random.uniform(0, min(max_delay, base_delay * (2**attempt)))
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[T]],
+    max_retries: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    is_retryable: Callable[[BaseException], bool] = is_retryable_error,
+    on_retry: Optional[Callable[[int, BaseException], Any]] = None,
+) -> T:
+    """Call ``func`` and retry retryable failures with jittered backoff."""
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as exc:
+            if attempt >= max_retries or not is_retryable(exc):
+                raise
+            if on_retry is not None:
+                on_retry(attempt, exc)
+            await asyncio.sleep(backoff_delay(attempt, base_delay, max_delay))
+            attempt += 1
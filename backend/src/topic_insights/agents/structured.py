@@ -0,0 +1,205 @@
+"""
+Structured (JSON) model outputs: fast parsing, repair and incremental parsing.
+
+``parse_model`` validates output straight from JSON with pydantic-core and
+only falls back to ``repair_json`` for the usual failure modes: code fences
+or prose around the JSON, trailing commas and output cut off mid-document.
+``JSONArrayStream`` decodes the items of an array in a streamed document as
+soon as each one is complete, so they can be used before the stream ends.
+
+Uses ``orjson`` when it is installed and the standard library otherwise.
+"""
+import json
+from typing import Any, List, Optional, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(ValueError):
+    """Model output could not be parsed or validated, even after repair."""
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON, raising ``ValueError`` on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def repair_json(text: str, drop_partial: bool = False) -> str:
+    """Extract and fix the first JSON object or array in ``text``.
+
+    Text before and after the document is dropped, trailing commas are
+    removed and a truncated document is closed. With ``drop_partial``, a
+    truncated document is cut back to its last complete array item or object
+    member instead of closing the value that was being written.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise StructuredOutputError("no JSON object or array in output")
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    # Output length and open brackets just after the last complete member.
+    safe: Tuple[int, List[str]] = (0, [])
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            if stack and stack[-1] == "]":
+                # A new array item: cutting back drops it entirely.
+                safe = (len(out), list(stack))
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            out.append(stack.pop())
+            if not stack:
+                return "".join(out)
+            continue
+        elif ch == ",":
+            _strip_trailing_comma(out)
+            safe = (len(out), list(stack))
+        out.append(ch)
+        if ch in _CLOSERS and (len(stack) == 1 or stack[-2] != "]"):
+            safe = (len(out), list(stack))
+
+    if not drop_partial:
+        closed = out + (['"'] if in_string else [])
+        _strip_trailing_comma(closed)
+        if closed and closed[-1] == ":":
+            closed.append("null")
+        candidate = "".join(closed + stack[::-1])
+        try:
+            loads(candidate)
+            return candidate
+        except ValueError:
+            pass
+    length, open_brackets = safe
+    kept = out[:length]
+    _strip_trailing_comma(kept)
+    return "".join(kept + open_brackets[::-1])
+
+
+def parse_model(
+    text: Optional[str], model: Type[M], list_key: Optional[str] = None
+) -> Tuple[M, bool]:
+    """Validate model output into ``model``, repairing it if needed.
+
+    ``list_key`` names the field a bare JSON array is wrapped in, for models
+    that reply with the array instead of the requested object. Returns the
+    result and whether repair was needed; raises ``StructuredOutputError``.
+    """
+    if not text or not text.strip():
+        raise StructuredOutputError("empty output")
+    try:
+        return model.model_validate_json(text), False
+    except ValidationError as exc:
+        error: Exception = exc
+    for drop_partial in (False, True):
+        try:
+            data = loads(repair_json(text, drop_partial))
+            if list_key is not None and isinstance(data, list):
+                data = {list_key: data}
+            return model.model_validate(data), True
+        except ValueError as exc:
+            error = exc
+    raise StructuredOutputError(f"output does not match {model.__name__}: {error}") from error
+
+
+class JSONArrayStream:
+    """Decode the items of an array from a JSON document fed in pieces.
+
+    The array is the value of ``key`` in the top-level object or, without a
+    key, the top-level array. ``feed`` returns the items completed by each
+    piece; items that fail to decode are skipped and counted in ``skipped``.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.skipped = 0
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Any]:
+        items: List[Any] = []
+        if self.done:
+            return items
+        self._buffer += text
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._array_depth is None:
+                        self._last_key = buffer[self._string_start + 1 : i]
+                continue
+            in_array = self._array_depth is not None and self._depth == self._array_depth
+            if in_array and self._item_start is None and not ch.isspace() and ch not in ",]":
+                self._item_start = i
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in _CLOSERS:
+                self._depth += 1
+                if ch == "[" and self._array_depth is None and (
+                    (self.key is None and self._depth == 1)
+                    or (self.key is not None and self._depth == 2 and self._last_key == self.key)
+                ):
+                    self._array_depth = self._depth
+            elif ch in ",]}" and in_array:
+                if self._item_start is not None:
+                    self._decode(buffer[self._item_start : i], items)
+                    self._item_start = None
+                if ch != ",":
+                    self.done = True
+                    self._buffer = ""
+                    self._pos = 0
+                    return items
+            if ch in "]}":
+                self._depth -= 1
+        self._pos = len(buffer)
+        return items
+
+    def _decode(self, raw: str, items: List[Any]) -> None:
+        try:
+            items.append(loads(raw))
+        except ValueError:
+            self.skipped += 1
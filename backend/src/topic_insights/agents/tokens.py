@@ -0,0 +1,67 @@
+"""
+Token counting helpers for agent prompts.
+
+Uses ``tiktoken`` when it is installed and falls back to a character-based
+estimate otherwise, which is close enough for rate limiting and budgeting.
+"""
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encodings: Dict[str, Any] = {}
+
+
+def _encoding_for(model: Optional[str]) -> Any:
+    if tiktoken is None:
+        return None
+    name = model or "gpt-4o"
+    if name not in _encodings:
+        try:
+            _encodings[name] = tiktoken.encoding_for_model(name)
+        except KeyError:
+            _encodings[name] = tiktoken.get_encoding("o200k_base")
+    return _encodings[name]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count (or estimate) the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    encoding = _encoding_for(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def count_message_tokens(
+    messages: List[Dict[str, Union[str, Any]]], model: Optional[str] = None
+) -> int:
+    """Count (or estimate) the prompt tokens of a list of chat messages."""
+    return sum(
+        count_tokens(str(message.get("content") or ""), model) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text to at most ``max_tokens`` tokens, preferring to end on a sentence."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding_for(model)
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(text)[:max_tokens])
+    else:
+        cut = text[: max_tokens * CHARS_PER_TOKEN]
+    # Drop a trailing partial sentence unless that would lose too much.
+    end = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("! "), cut.rfind("? "))
+    if end >= len(cut) * 0.8:
+        cut = cut[: end + 1]
+    return cut.rstrip()
@@ -0,0 +1,45 @@
+"""
+Streaming analysis endpoints.
+"""
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ..models.api import AnalyzeTopicRequest, ExtractEntitiesRequest, SummarizeRequest
+from .dependencies import AgentDep
+from .sse import sse_response, stream_deltas
+
+router = APIRouter(prefix="/api/v1", tags=["analysis"])
+
+
+@router.post("/analyze/stream")
+async def stream_topic_analysis(
+    body: AnalyzeTopicRequest,
+    request: Request,
+    agent: AgentDep,
+) -> StreamingResponse:
+    """Stream a topic analysis as Server-Sent Events."""
+    return sse_response(
+        stream_deltas(request, agent.stream_analyze_topic(body.topic, body.context))
+    )
+
+
+@router.post("/summarize/stream")
+async def stream_summary(
+    body: SummarizeRequest,
+    request: Request,
+    agent: AgentDep,
+) -> StreamingResponse:
+    """Stream a content summary as Server-Sent Events."""
+    return sse_response(
+        stream_deltas(request, agent.stream_summarize_content(body.content, body.max_length))
+    )
+
+
+@router.post("/entities/stream")
+async def stream_entities(
+    body: ExtractEntitiesRequest,
+    request: Request,
+    agent: AgentDep,
+) -> StreamingResponse:
+    """Stream extracted entities as Server-Sent Events, one entity per event."""
+    return sse_response(stream_deltas(request, agent.stream_extract_entities(body.content)))
@@ -0,0 +1,57 @@
+"""
+Shared FastAPI dependencies.
+"""
+from typing import Annotated, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from openai import AsyncOpenAI
+
+from services.supabase.client import SupabaseService
+
+from ..agents.base import BaseAgent
+from ..agents.cascade import CascadeAgent, CascadePolicy
+from ..agents.openai_agent import OpenAIAgent
+
+
+async def create_agent(client: Optional[AsyncOpenAI] = None) -> BaseAgent:
+    """Create and initialize the application's agent.
+
+    Called once by the lifespan, which stores the agent on ``app.state``. When a
+    model cascade is configured (``AGENT_CASCADE_POLICY`` or
+    ``OPENAI_SMALL_MODEL``) calls are routed through a ``CascadeAgent``. Raises
+    ``ValueError`` when the agent is not configured.
+    """
+    policy = CascadePolicy.from_env()
+    if policy is not None:
+        agent: BaseAgent = CascadeAgent(policy, client=client)
+    else:
+        agent = OpenAIAgent(client=client)
+    await agent.initialize()
+    return agent
+
+
+def get_agent(request: Request) -> BaseAgent:
+    """Return the application's agent, or 503 if it could not be created."""
+    agent = getattr(request.app.state, "agent", None)
+    if agent is None:
+        detail = getattr(request.app.state, "agent_error", None) or "Agent is not available"
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+    return agent
+
+
+# Endpoint parameter types; Annotated keeps Depends() out of argument defaults.
+AgentDep = Annotated[BaseAgent, Depends(get_agent)]
+
+
+def get_supabase(request: Request) -> SupabaseService:
+    """Return the application's Supabase service, or 503 if it is not configured."""
+    clients = getattr(request.app.state, "clients", None)
+    if clients is None or clients.supabase is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Supabase is not configured (set SUPABASE_URL and SUPABASE_KEY)",
+        )
+    return clients.supabase
+
+
+SupabaseDep = Annotated[SupabaseService, Depends(get_supabase)]
@@ -0,0 +1,86 @@
+"""
+Streaming export endpoints.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Annotated, Any, AsyncIterator, Dict, Literal, Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from .dependencies import SupabaseDep
+
+router = APIRouter(prefix="/api/v1", tags=["export"])
+
+SUMMARY_COLUMNS = [
+    "id",
+    "topic_id",
+    "created_at",
+    "source_url",
+    "source_type",
+    "sentiment",
+    "key_concepts",
+    "metadata",
+    "content",
+]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _csv_line(values: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def _csv_value(value: Any) -> Any:
+    """Encode nested values as JSON so every cell is a scalar."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return "" if value is None else value
+
+
+async def encode_rows(
+    request: Request, rows: AsyncIterator[Dict[str, Any]], fmt: str
+) -> AsyncIterator[str]:
+    """Encode rows as NDJSON or CSV, stopping when the client disconnects."""
+    try:
+        if fmt == "csv":
+            yield _csv_line(SUMMARY_COLUMNS)
+        async for row in rows:
+            if await request.is_disconnected():
+                return
+            if fmt == "csv":
+                yield _csv_line([_csv_value(row.get(column)) for column in SUMMARY_COLUMNS])
+            else:
+                yield json.dumps(row, default=str) + "\n"
+    finally:
+        await rows.aclose()
+
+
+@router.get("/topics/{topic_id}/summaries/export")
+async def export_summaries(
+    topic_id: str,
+    request: Request,
+    supabase: SupabaseDep,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    page_size: Annotated[int, Query(ge=1, le=10000)] = 1000,
+) -> StreamingResponse:
+    """Stream every summary of a topic in the date range, oldest first."""
+    rows = supabase.iter_topic_summaries(
+        topic_id,
+        start_date=start_date,
+        end_date=end_date,
+        page_size=page_size,
+        columns=",".join(SUMMARY_COLUMNS),
+    )
+    filename = f"summaries-{topic_id}.{format}"
+    return StreamingResponse(
+        encode_rows(request, rows, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,84 @@
+"""
+Realtime topic and summary updates over WebSocket and Server-Sent Events.
+"""
+import asyncio
+from typing import Annotated, AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from ..realtime import RealtimeHub, Subscription
+from .sse import format_sse, sse_response
+
+router = APIRouter(prefix="/api/v1", tags=["realtime"])
+
+# Seconds between SSE keep-alive comments on an idle stream.
+KEEPALIVE_INTERVAL = 15.0
+
+# WebSocket close code sent to subscribers dropped as slow consumers.
+TRY_AGAIN_LATER = 1013
+
+
+def get_realtime_hub(request: Request) -> RealtimeHub:
+    """Return the application's realtime hub."""
+    return request.app.state.realtime_hub
+
+
+@router.websocket("/ws/topics")
+async def topic_updates_ws(
+    websocket: WebSocket, topic_id: Annotated[Optional[List[str]], Query()] = None
+) -> None:
+    """Push topic and summary changes for the given topics (or all topics)."""
+    hub: RealtimeHub = websocket.app.state.realtime_hub
+    # Subscribe before accepting so no change is missed once the client is connected.
+    subscription = hub.subscribe(topic_id)
+    try:
+        await websocket.accept()
+    except Exception:
+        hub.unsubscribe(subscription)
+        raise
+
+    async def watch_disconnect() -> None:
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            hub.unsubscribe(subscription)
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        async for event in subscription:
+            await websocket.send_json(event.to_dict())
+        if subscription.close_reason:
+            await websocket.close(code=TRY_AGAIN_LATER, reason=subscription.close_reason)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(subscription)
+        watcher.cancel()
+
+
+async def _sse_events(hub: RealtimeHub, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                if subscription.close_reason:
+                    yield format_sse({"reason": subscription.close_reason}, event="close")
+                return
+            yield format_sse(event.to_dict(), event=event.table)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("/topics/{topic_id}/events")
+async def topic_updates_sse(topic_id: str, request: Request) -> StreamingResponse:
+    """Stream topic and summary changes for one topic as Server-Sent Events."""
+    hub = get_realtime_hub(request)
+    return sse_response(_sse_events(hub, hub.subscribe([topic_id])))
@@ -0,0 +1,49 @@
+"""
+Server-Sent Events helpers.
+"""
+import json
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # Disable proxy buffering so events are flushed immediately.
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Encode one Server-Sent Event."""
+    message = f"event: {event}\n" if event else ""
+    return f"{message}data: {json.dumps(data)}\n\n"
+
+
+async def stream_deltas(request: Request, deltas: AsyncIterator[Any]) -> AsyncIterator[str]:
+    """Relay deltas as SSE ``data`` events, ending with a ``done`` event.
+
+    Text deltas are sent as strings and models (e.g. entities) as objects.
+
+    Stops as soon as the client disconnects and always closes ``deltas`` so the
+    upstream generation is cancelled rather than left running.
+    """
+    try:
+        async for delta in deltas:
+            if await request.is_disconnected():
+                return
+            if isinstance(delta, BaseModel):
+                delta = delta.model_dump()
+            yield format_sse({"delta": delta})
+        yield format_sse({}, event="done")
+    except Exception as exc:
+        yield format_sse({"error": str(exc)}, event="error")
+    finally:
+        await deltas.aclose()
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an iterator of encoded events in an SSE response."""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
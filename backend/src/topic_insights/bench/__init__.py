@@ -0,0 +1,6 @@
+"""
+Benchmark suite run against local stand-ins for the upstream APIs.
+
+Run ``python -m topic_insights.bench --output results.json`` and pass
+``--baseline`` to compare with the results of an earlier commit.
+"""
@@ -0,0 +1,51 @@
+"""
+Command line entry point: ``python -m topic_insights.bench``.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from .suite import BENCHMARKS, BenchConfig, compare, run_suite
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the Topic Insights benchmarks.")
+    parser.add_argument(
+        "--only", nargs="+", choices=BENCHMARKS, help="Benchmarks to run (default: all)"
+    )
+    parser.add_argument("--quick", action="store_true", help="Small sizes, for smoke runs")
+    parser.add_argument("--output", type=Path, help="Write the results JSON here")
+    parser.add_argument("--baseline", type=Path, help="Results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative change counted as a regression (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    config = BenchConfig.quick() if args.quick else BenchConfig()
+    results = asyncio.run(run_suite(config, args.only))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['metric']}: {regression['baseline']:.4g} -> "
+                f"{regression['current']:.4g} ({regression['change']:+.0%})",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Local stand-ins for the OpenAI, PostgREST and news feed upstreams.
+
+One FastAPI app serves all three with configurable latency, so benchmarks
+exercise the real clients, connection pools and serialization without network
+access, API keys or cost.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+_CURSOR = re.compile(
+    r'created_at\.(gt|lt)\."([^"]+)",and\(created_at\.eq\."[^"]+",id\.(?:gt|lt)\.([^)]+)\)'
+)
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "or", "on_conflict", "columns"}
+
+
+@dataclass
+class FakeLatency:
+    """Simulated upstream latency in seconds; each call adds up to ``jitter`` at random."""
+
+    chat: float = 0.25
+    embedding: float = 0.05
+    database: float = 0.005
+    feed: float = 0.02
+    jitter: float = 0.5
+
+    @classmethod
+    def none(cls) -> "FakeLatency":
+        return cls(chat=0.0, embedding=0.0, database=0.0, feed=0.0, jitter=0.0)
+
+
+def _tokens(text: str) -> int:
+    # Roughly four characters per token, which is close enough for usage reports.
+    return max(1, len(text) // 4)
+
+
+def _embedding(text: str, dim: int) -> List[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).normal(size=dim)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+
+def _row_matches(row: Dict[str, Any], column: str, condition: str) -> bool:
+    op, _, value = condition.partition(".")
+    actual = row.get(column)
+    if op == "eq":
+        return str(actual).lower() == value.lower()
+    if op == "in":
+        return str(actual) in {v.strip('"') for v in value.strip("()").split(",")}
+    if op in ("gte", "lte", "gt", "lt"):
+        actual, value = str(actual), value.strip('"')
+        return {
+            "gte": actual >= value,
+            "lte": actual <= value,
+            "gt": actual > value,
+            "lt": actual < value,
+        }[op]
+    return True
+
+
+def create_fake_app(
+    latency: Optional[FakeLatency] = None,
+    articles_per_feed: int = 10,
+    embedding_dim: int = 1536,
+    seed: int = 0,
+) -> FastAPI:
+    """Build the fake upstream app.
+
+    Routes:
+        ``POST /v1/chat/completions`` and ``POST /v1/embeddings`` answer like OpenAI.
+        ``/rest/v1/{table}`` supports PostgREST selects with ``eq``/``in``/range
+        filters, keyset cursors and limits, and inserts or upserts.
+        ``GET /feed?q=...`` returns an RSS feed of articles for the query.
+    """
+    latency = latency or FakeLatency()
+    rng = random.Random(seed)
+    app = FastAPI()
+    # table -> primary key -> row
+    tables: Dict[str, Dict[Any, Dict[str, Any]]] = defaultdict(dict)
+    app.state.tables = tables
+    app.state.requests = Counter()
+
+    async def delay(base: float) -> None:
+        if base > 0:
+            await asyncio.sleep(base * (1 + rng.uniform(0, latency.jitter)))
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Dict[str, Any]:
+        body = await request.json()
+        app.state.requests["chat"] += 1
+        await delay(latency.chat)
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        words = body["messages"][-1]["content"].split()
+        content = "Summary: " + " ".join(words[-40:])
+        if body.get("response_format", {}).get("type") in ("json_object", "json_schema"):
+            content = json.dumps({"summary": content, "entities": [], "questions": []})
+        prompt_tokens, completion_tokens = _tokens(prompt), _tokens(content)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request) -> Dict[str, Any]:
+        body = await request.json()
+        app.state.requests["embeddings"] += 1
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await delay(latency.embedding)
+        tokens = sum(_tokens(text) for text in inputs)
+        return {
+            "object": "list",
+            "model": body.get("model", "fake"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": _embedding(text, embedding_dim)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/rest/v1/{table}")
+    async def select(table: str, request: Request) -> List[Dict[str, Any]]:
+        app.state.requests[f"select:{table}"] += 1
+        await delay(latency.database)
+        params = request.query_params
+        rows = sorted(
+            tables[table].values(), key=lambda row: (str(row["created_at"]), str(row["id"]))
+        )
+        for column, condition in params.items():
+            if column not in _RESERVED_PARAMS:
+                rows = [row for row in rows if _row_matches(row, column, condition)]
+        descending = ".desc" in params.get("order", "")
+        if descending:
+            rows.reverse()
+        cursor = _CURSOR.search(params.get("or", ""))
+        if cursor:
+            op, created_at, row_id = cursor.groups()
+            key = (created_at, row_id)
+            rows = [
+                row
+                for row in rows
+                if ((str(row["created_at"]), str(row["id"])) > key) == (op == "gt")
+                and (str(row["created_at"]), str(row["id"])) != key
+            ]
+        offset = int(params.get("offset", 0))
+        limit = int(params["limit"]) if "limit" in params else None
+        return rows[offset : offset + limit if limit is not None else None]
+
+    @app.post("/rest/v1/{table}")
+    async def insert(table: str, request: Request) -> Response:
+        body = await request.json()
+        app.state.requests[f"insert:{table}"] += 1
+        await delay(latency.database)
+        rows = body if isinstance(body, list) else [body]
+        conflict = request.query_params.get("on_conflict")
+        now = datetime.now(timezone.utc).isoformat()
+        stored = []
+        for incoming in rows:
+            row = {"id": str(uuid.uuid4()), "created_at": now}
+            key: Any = incoming.get("id") or row["id"]
+            if conflict:
+                values = tuple(incoming.get(column) for column in conflict.split(","))
+                # As in SQL, NULLs never conflict.
+                if None not in values:
+                    key = tuple(str(value) for value in values)
+            row = {**tables[table].get(key, row), **incoming}
+            tables[table][key] = row
+            stored.append(row)
+        if "return=minimal" in request.headers.get("prefer", ""):
+            return Response(status_code=201)
+        return Response(json.dumps(stored), status_code=201, media_type="application/json")
+
+    @app.post("/rest/v1/rpc/{function}")
+    async def rpc(function: str) -> List[Any]:
+        app.state.requests[f"rpc:{function}"] += 1
+        await delay(latency.database)
+        return []
+
+    @app.get("/feed")
+    async def feed(q: str) -> Response:
+        app.state.requests["feed"] += 1
+        await delay(latency.feed)
+        published = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        items = "".join(
+            f"<item><title>{escape(q)} update {i}</title>"
+            f"<link>https://feed.example/{escape(q.replace(' ', '-'))}/{i}</link>"
+            f"<description>{escape(_article_text(q, i))}</description>"
+            f"<pubDate>{(published + timedelta(hours=i)).strftime('%a, %d %b %Y %H:%M:%S +0000')}"
+            "</pubDate></item>"
+            for i in range(articles_per_feed)
+        )
+        return Response(
+            f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>',
+            media_type="application/rss+xml",
+        )
+
+    return app
+
+
+def _article_text(query: str, index: int, words: int = 300) -> str:
+    rng = random.Random(f"{query}:{index}")
+    vocabulary = SAMPLE_WORDS + query.split()
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+SAMPLE_WORDS = (
+    "market policy research energy climate model data growth study report results "
+    "network system security health analysis trend industry impact development risk "
+    "investment technology science global regional local team launch release update "
+    "quarter forecast demand supply cost price revenue survey trial evidence review"
+).split()
+
+
+class FakeServer:
+    """Serves an app on a background thread with its own event loop.
+
+    Use as a context manager; ``base_url`` is available inside the block.
+    """
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off")
+        )
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+        self.base_url = ""
+
+    def __enter__(self) -> "FakeServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("fake server did not start")
+            time.sleep(0.01)
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        self.base_url = f"http://{host}:{port}"
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
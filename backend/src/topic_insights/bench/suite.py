@@ -0,0 +1,427 @@
+"""
+Benchmarks for agent throughput, ingest rate, search latency and the pipeline.
+
+Each benchmark returns a flat-ish dict of measurements. Keys ending in
+``_per_second`` are better when higher; keys ending in ``_ms`` or ``seconds``
+are better when lower. ``compare`` uses that convention to flag regressions
+between two result files.
+"""
+import asyncio
+import platform
+import random
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+from openai import AsyncOpenAI
+
+from services.supabase.client import SupabaseConfig, SupabaseService
+
+from ..agents.batch import run_bounded
+from ..agents.local_agent import LocalAgent
+from ..agents.openai_agent import OpenAIAgent
+from ..clients import PoolSettings, create_http_client
+from ..fetchers.client import FetchClient, HostLimits
+from ..fetchers.sources import FeedSource
+from ..fetchers.topic import TopicFetcher
+from ..pipeline.ingest import BulkIngester
+from ..scheduler.queue import TopicJob
+from ..scheduler.runner import Scheduler
+from ..scheduler.stages import TopicPipeline
+from ..search.text_index import TextIndex
+from ..search.vector_index import VectorIndex
+from .fakes import SAMPLE_WORDS, FakeLatency, FakeServer, create_fake_app
+
+BENCHMARKS = ("agent", "local", "ingest", "search", "pipeline")
+
+
+@dataclass
+class BenchConfig:
+    """Sizes and concurrency of a benchmark run."""
+
+    summaries: int = 200
+    embeddings: int = 1000
+    local_articles: int = 2000
+    ingest_rows: int = 20_000
+    search_documents: int = 20_000
+    search_queries: int = 500
+    search_vocabulary: int = 20_000
+    vector_dim: int = 256
+    topics: int = 20
+    keywords_per_topic: int = 2
+    articles_per_feed: int = 10
+    concurrency: int = 16
+    latency: FakeLatency = field(default_factory=FakeLatency)
+    seed: int = 0
+
+    @classmethod
+    def quick(cls) -> "BenchConfig":
+        """A small run for smoke tests and CI."""
+        return cls(
+            summaries=40,
+            embeddings=100,
+            local_articles=200,
+            ingest_rows=2000,
+            search_documents=2000,
+            search_queries=100,
+            topics=4,
+            latency=FakeLatency(chat=0.02, embedding=0.01, database=0.001, feed=0.005),
+        )
+
+
+def latency_stats(seconds: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of durations, in milliseconds."""
+    if not seconds:
+        return {}
+    values = sorted(seconds)
+
+    def pick(q: float) -> float:
+        return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+    return {
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "mean_ms": statistics.fmean(values) * 1000,
+        "max_ms": values[-1] * 1000,
+    }
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(SAMPLE_WORDS) for _ in range(words))
+
+
+def _openai_client(base_url: str) -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key="bench",
+        base_url=f"{base_url}/v1",
+        http_client=create_http_client(PoolSettings(http2=False)),
+        max_retries=0,
+    )
+
+
+def _agent(client: AsyncOpenAI, config: BenchConfig) -> OpenAIAgent:
+    return OpenAIAgent(client=client, model="gpt-4o-mini", max_concurrency=config.concurrency)
+
+
+def _service(base_url: str, http_client: httpx.AsyncClient) -> SupabaseService:
+    return SupabaseService(SupabaseConfig(url=base_url, key="bench"), http_client=http_client)
+
+
+async def _timed(
+    func: Callable[[Any], Awaitable[Any]], items: Sequence[Any], concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    async def call(item: Any) -> None:
+        started = time.perf_counter()
+        await func(item)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async for outcome in run_bounded(call, items, concurrency):
+        errors += not outcome.ok
+    seconds = time.perf_counter() - started
+    return {
+        "calls": len(items),
+        "errors": errors,
+        "seconds": seconds,
+        "calls_per_second": len(items) / seconds if seconds else 0.0,
+        **latency_stats(latencies),
+    }
+
+
+async def bench_agent(base_url: str, config: BenchConfig) -> Dict[str, Any]:
+    """Summaries per second under bounded concurrency, and embedding throughput."""
+    rng = random.Random(config.seed)
+    client = _openai_client(base_url)
+    agent = _agent(client, config)
+    try:
+        contents = [_text(rng, 300) for _ in range(config.summaries)]
+        summarize = await _timed(agent.summarize_content, contents, config.concurrency)
+
+        texts = [_text(rng, 50) for _ in range(config.embeddings)]
+        started = time.perf_counter()
+        await agent.embed_many(texts)
+        seconds = time.perf_counter() - started
+    finally:
+        await client.close()
+    return {
+        "summarize": summarize,
+        "embed": {
+            "inputs": len(texts),
+            "seconds": seconds,
+            "inputs_per_second": len(texts) / seconds if seconds else 0.0,
+        },
+    }
+
+
+_NAMES = (
+    "Acme Corp", "Maria Lopez", "the European Commission", "Berlin", "Stanford University",
+    "Nvidia", "March 2024", "the World Health Organization", "Tokyo", "James Chen",
+)
+
+
+def _article(rng: random.Random, words: int) -> str:
+    """News-like text: capitalized sentences mixing sample words and named entities."""
+    sentences = []
+    written = 0
+    while written < words:
+        length = rng.randint(12, 25)
+        parts = [rng.choice(SAMPLE_WORDS) for _ in range(length)]
+        parts.insert(rng.randrange(length), rng.choice(_NAMES))
+        sentence = " ".join(parts)
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        written += length
+    return " ".join(sentences)
+
+
+def bench_local(config: BenchConfig) -> Dict[str, Any]:
+    """Single-core throughput of the CPU-only agent's summary, entities and questions."""
+    rng = random.Random(config.seed)
+    agent = LocalAgent()
+    articles = [_article(rng, 300) for _ in range(config.local_articles)]
+
+    async def process_all() -> List[float]:
+        latencies = []
+        for article in articles:
+            started = time.perf_counter()
+            await agent.process_content(article)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    started = time.perf_counter()
+    latencies = asyncio.run(process_all())
+    seconds = time.perf_counter() - started
+    return {
+        "articles": len(articles),
+        "seconds": seconds,
+        "articles_per_second": len(articles) / seconds if seconds else 0.0,
+        **latency_stats(latencies),
+    }
+
+
+async def bench_ingest(base_url: str, config: BenchConfig) -> Dict[str, Any]:
+    """Rows per second through ``BulkIngester`` into the fake PostgREST."""
+    rng = random.Random(config.seed)
+    rows = [
+        {
+            "topic_id": f"topic-{i % 50}",
+            "content": _text(rng, 60),
+            "source_url": f"https://bench.example/{i}",
+            "source_type": "news",
+            "metadata": {"n": i},
+        }
+        for i in range(config.ingest_rows)
+    ]
+    http_client = create_http_client(PoolSettings(http2=False))
+    try:
+        report = await BulkIngester(
+            _service(base_url, http_client), chunk_size=500, concurrency=4
+        ).ingest(rows)
+    finally:
+        await http_client.aclose()
+    return {
+        **report.to_dict(),
+        "rows_per_second": report.rows_per_second,
+        "chunk_latency": latency_stats([chunk.seconds for chunk in report.chunks]),
+    }
+
+
+def _zipf_corpus(
+    rng: np.random.Generator, vocabulary: int, documents: int, words: int
+) -> Tuple[List[str], np.ndarray]:
+    """Synthetic words and a documents x words matrix of word ids with Zipfian frequencies."""
+    names = [f"w{i}" for i in range(vocabulary)]
+    weights = 1.0 / np.arange(1, vocabulary + 1)
+    ids = rng.choice(vocabulary, size=(documents, words), p=weights / weights.sum())
+    return names, ids
+
+
+def bench_search(config: BenchConfig) -> Dict[str, Any]:
+    """Index build rate and query latency of the local text and vector indexes."""
+    rng = np.random.default_rng(config.seed)
+    names, ids = _zipf_corpus(rng, config.search_vocabulary, config.search_documents, 80)
+    topic_ids = [f"topic-{i % 500}" for i in range(config.search_documents)]
+    text_index = TextIndex()
+    started = time.perf_counter()
+    for i, row in enumerate(ids):
+        words = [names[w] for w in row]
+        text_index.add_summary(
+            {
+                "id": i,
+                "topic_id": topic_ids[i],
+                "content": " ".join(words[3:]),
+                "key_concepts": words[:3],
+            }
+        )
+    build_seconds = time.perf_counter() - started
+
+    # Queries are drawn from the documents themselves, like a user searching for
+    # terms they have seen, so most of them match.
+    samples = ids[rng.integers(0, len(ids), size=config.search_queries)]
+    queries = []
+    for n, row in enumerate(samples):
+        first, second = names[row[10]], names[row[11]]
+        if n % 4 == 0:
+            queries.append(f"{first[:3]}*")
+        elif n % 4 == 1:
+            queries.append(f'"{first} {second}"')
+        else:
+            queries.append(f"{first} {second}")
+    text_latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        text_index.search(query, limit=10)
+        text_latencies.append(time.perf_counter() - started)
+
+    vectors = rng.normal(size=(config.search_documents, config.vector_dim)).astype(np.float32)
+    vector_index = VectorIndex(dim=config.vector_dim)
+    vector_index.add([str(i) for i in range(len(vectors))], topic_ids, vectors)
+    vector_latencies = []
+    for query in vectors[: config.search_queries]:
+        started = time.perf_counter()
+        vector_index.search(query, limit=10)
+        vector_latencies.append(time.perf_counter() - started)
+
+    return {
+        "documents": len(ids),
+        "text_build_seconds": build_seconds,
+        "text_documents_per_second": len(ids) / build_seconds if build_seconds else 0.0,
+        "text_query": latency_stats(text_latencies),
+        "vector_query": latency_stats(vector_latencies),
+    }
+
+
+async def bench_pipeline(base_url: str, config: BenchConfig) -> Dict[str, Any]:
+    """End-to-end fetch -> dedup -> summarize -> store time per topic."""
+    openai_client = _openai_client(base_url)
+    http_client = create_http_client(PoolSettings(http2=False))
+    fetch_client = FetchClient(default_limits=HostLimits(max_connections=config.concurrency))
+    fetcher = TopicFetcher(fetch_client, [FeedSource("bench", f"{base_url}/feed?q={{query}}")])
+    pipeline = TopicPipeline(
+        fetcher, _agent(openai_client, config), BulkIngester(_service(base_url, http_client))
+    )
+    rng = random.Random(config.seed)
+    jobs = [
+        TopicJob.from_topic(
+            {
+                "id": f"topic-{i}",
+                "name": f"Topic {i}",
+                "keywords": [
+                    f"{rng.choice(SAMPLE_WORDS)} {i}-{k}" for k in range(config.keywords_per_topic)
+                ],
+            }
+        )
+        for i in range(config.topics)
+    ]
+    try:
+        report = await Scheduler(
+            pipeline.stages, concurrency=config.concurrency, budget_seconds=None
+        ).run(jobs, run_id="bench")
+    finally:
+        await openai_client.close()
+        await fetch_client.close()
+        await http_client.aclose()
+    return {
+        "topics": len(report.results),
+        "failed": len(report.failed),
+        "seconds": report.seconds,
+        "topics_per_second": len(report.results) / report.seconds if report.seconds else 0.0,
+        "per_topic": latency_stats([result.seconds for result in report.results]),
+        "stages": report.stage_stats(),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_suite(
+    config: Optional[BenchConfig] = None, only: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Run the selected benchmarks against a fresh fake upstream server."""
+    config = config or BenchConfig()
+    selected = list(only or BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Any] = {}
+    app = create_fake_app(
+        config.latency, articles_per_feed=config.articles_per_feed, seed=config.seed
+    )
+    with FakeServer(app) as server:
+        for name in selected:
+            if name == "agent":
+                results[name] = await bench_agent(server.base_url, config)
+            elif name == "local":
+                results[name] = await asyncio.to_thread(bench_local, config)
+            elif name == "ingest":
+                results[name] = await bench_ingest(server.base_url, config)
+            elif name == "search":
+                results[name] = await asyncio.to_thread(bench_search, config)
+            elif name == "pipeline":
+                results[name] = await bench_pipeline(server.base_url, config)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": asdict(config),
+        },
+        "results": results,
+    }
+
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def _direction(path: str) -> int:
+    """1 if higher is better, -1 if lower is better, 0 if not compared."""
+    name = path.rsplit(".", 1)[-1]
+    if name.endswith("_per_second"):
+        return 1
+    if name.endswith("_ms") or name.endswith("seconds") or name in ("total", "mean", "p95", "max"):
+        return -1
+    return 0
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2
+) -> List[Dict[str, Any]]:
+    """Metrics that got worse than ``baseline`` by more than ``threshold`` (a fraction)."""
+    now = _flatten(current["results"])
+    before = _flatten(baseline["results"])
+    regressions = []
+    for path, value in sorted(now.items()):
+        direction = _direction(path)
+        old = before.get(path)
+        if not direction or not old:
+            continue
+        change = (value - old) / old
+        if -direction * change > threshold:
+            regressions.append(
+                {"metric": path, "baseline": old, "current": value, "change": change}
+            )
+    return regressions
@@ -0,0 +1,199 @@
+"""
+Shared, pooled API clients managed by the application lifespan.
+
+One keep-alive connection pool per upstream (OpenAI and Supabase PostgREST) is
+created at startup and reused by every request, so requests do not pay for new
+TCP/TLS handshakes. HTTP/2 is used when the ``h2`` package is installed.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from services.supabase.client import SupabaseConfig, SupabaseService
+
+from .metrics import HTTP_POOL_CONNECTIONS, REGISTRY, record_cache
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class PoolSettings:
+    """Connection pool settings for one upstream."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "PoolSettings":
+        """Read ``<PREFIX>_MAX_CONNECTIONS``, ``<PREFIX>_MAX_KEEPALIVE`` and friends."""
+        defaults = cls()
+        return cls(
+            max_connections=int(os.getenv(f"{prefix}_MAX_CONNECTIONS", defaults.max_connections)),
+            max_keepalive_connections=int(
+                os.getenv(f"{prefix}_MAX_KEEPALIVE", defaults.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(
+                os.getenv(f"{prefix}_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)
+            ),
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT", defaults.timeout)),
+            http2=os.getenv(f"{prefix}_HTTP2", "true").lower() in ("1", "true", "yes"),
+        )
+
+
+def create_http_client(settings: PoolSettings, **kwargs: Any) -> httpx.AsyncClient:
+    """Create a pooled keep-alive HTTP client."""
+    return httpx.AsyncClient(
+        http2=settings.http2 and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        timeout=settings.timeout,
+        **kwargs,
+    )
+
+
+def pool_stats(client: httpx.AsyncClient, settings: PoolSettings) -> Dict[str, Any]:
+    """Report connection counts and utilization for a pooled client."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for connection in connections if connection.is_idle())
+    active = len(connections) - idle
+    return {
+        "connections": len(connections),
+        "active": active,
+        "idle": idle,
+        "max_connections": settings.max_connections,
+        "utilization": active / settings.max_connections if settings.max_connections else 0.0,
+        "http2": settings.http2 and HTTP2_AVAILABLE,
+    }
+
+
+class ClientManager:
+    """Owns the process-wide OpenAI and Supabase clients.
+
+    Clients are only created for upstreams that are configured (``OPENAI_API_KEY``,
+    ``SUPABASE_URL``/``SUPABASE_KEY``); the others stay ``None``.
+    """
+
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = None,
+        supabase_config: Optional[SupabaseConfig] = None,
+        openai_pool: Optional[PoolSettings] = None,
+        supabase_pool: Optional[PoolSettings] = None,
+    ):
+        self.openai_api_key = openai_api_key
+        self.supabase_config = supabase_config
+        self.openai_pool = openai_pool or PoolSettings()
+        self.supabase_pool = supabase_pool or PoolSettings()
+        self.openai: Optional[AsyncOpenAI] = None
+        self.supabase: Optional[SupabaseService] = None
+        self._openai_http: Optional[httpx.AsyncClient] = None
+        self._supabase_http: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> "ClientManager":
+        """Build a manager from environment variables."""
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_KEY")
+        return cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            supabase_config=(
+                SupabaseConfig(url=supabase_url, key=supabase_key)
+                if supabase_url and supabase_key
+                else None
+            ),
+            openai_pool=PoolSettings.from_env("OPENAI_POOL"),
+            supabase_pool=PoolSettings.from_env("SUPABASE_POOL"),
+        )
+
+    async def start(self) -> None:
+        """Open the connection pools and clients."""
+        if self.openai_api_key:
+            self._openai_http = create_http_client(self.openai_pool)
+            # Agents retry with their own rate limiter, so the client must not.
+            self.openai = AsyncOpenAI(
+                api_key=self.openai_api_key, http_client=self._openai_http, max_retries=0
+            )
+        if self.supabase_config is not None:
+            self._supabase_http = create_http_client(self.supabase_pool)
+            self.supabase = await SupabaseService.create(
+                self.supabase_config, http_client=self._supabase_http
+            )
+        REGISTRY.set_collector("clients", self.collect_metrics)
+
+    async def close(self) -> None:
+        """Close every client and its connection pool."""
+        REGISTRY.set_collector("clients", None)
+        if self.supabase is not None:
+            await self.supabase.close()
+            self.supabase = None
+        if self.openai is not None:
+            await self.openai.close()
+            self.openai = None
+        for client in (self._openai_http, self._supabase_http):
+            if client is not None:
+                await client.aclose()
+        self._openai_http = self._supabase_http = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilization for each open upstream."""
+        stats = {}
+        if self._openai_http is not None:
+            stats["openai"] = pool_stats(self._openai_http, self.openai_pool)
+        if self._supabase_http is not None:
+            stats["supabase"] = pool_stats(self._supabase_http, self.supabase_pool)
+        return stats
+
+    def collect_metrics(self) -> None:
+        """Publish pool usage and query cache hit ratios to the metrics registry."""
+        for upstream, stats in self.stats().items():
+            HTTP_POOL_CONNECTIONS.set(stats["active"], upstream=upstream, state="active")
+            HTTP_POOL_CONNECTIONS.set(stats["idle"], upstream=upstream, state="idle")
+        if self.supabase is not None:
+            for name, cache in (
+                ("supabase_topics", self.supabase.topic_cache),
+                ("supabase_summaries", self.supabase.summaries_cache),
+            ):
+                record_cache(name, cache.hits, cache.misses)
+
+    async def probe(self, timeout: float = 5.0) -> Dict[str, Dict[str, Any]]:
+        """Check each upstream with a cheap request, concurrently.
+
+        Returns ``{"status", "latency_ms"}`` per upstream, where status is
+        ``healthy``, ``unhealthy`` or ``not_configured``.
+        """
+
+        async def check(probe: Optional[Callable[[], Awaitable[Any]]]) -> Dict[str, Any]:
+            if probe is None:
+                return {"status": "not_configured", "latency_ms": None}
+            started = time.perf_counter()
+            try:
+                healthy = await asyncio.wait_for(probe(), timeout) is not False
+            except Exception:
+                healthy = False
+            return {
+                "status": "healthy" if healthy else "unhealthy",
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+
+        database, llm = await asyncio.gather(
+            check(self.supabase.health_check if self.supabase is not None else None),
+            check(self.openai.models.list if self.openai is not None else None),
+        )
+        return {"database": database, "llm": llm}
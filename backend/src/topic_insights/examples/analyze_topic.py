@@ -23,16 +23,18 @@ async def main():
         print(analysis["analysis"])
         print(f"\nTokens used: {analysis['tokens_used']}")
         
-        # Generate follow-up questions
-        questions = await agent.generate_questions(analysis["analysis"])
+        # Summarize, generate follow-up questions and extract entities in one call
+        result = await agent.process_content(analysis["analysis"])
+        print("\nSummary:")
+        print(result.summary)
+        
         print("\nFollow-up questions:")
-        for i, question in enumerate(questions, 1):
+        for i, question in enumerate(result.questions, 1):
             print(f"{i}. {question}")
             
-        # Extract entities
-        entities = await agent.extract_entities(analysis["analysis"])
         print("\nExtracted entities:")
-        print(entities)
+        for entity in result.entities:
+            print(f"- {entity.entity} ({entity.category}, {entity.relevance:.2f})")
         
     finally:
         # Clean up resources
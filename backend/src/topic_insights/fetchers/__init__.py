@@ -0,0 +1,3 @@
+"""
+Source fetchers that feed articles into the topic pipeline.
+"""
@@ -0,0 +1,54 @@
+"""
+Compact, source-independent article records.
+"""
+import html
+import re
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+def clean_text(text: Optional[str], max_chars: Optional[int] = None) -> str:
+    """Strip markup and collapse whitespace, truncating to ``max_chars``."""
+    if not text:
+        return ""
+    cleaned = _SPACE.sub(" ", html.unescape(_TAG.sub(" ", text))).strip()
+    if max_chars is not None and len(cleaned) > max_chars:
+        cleaned = cleaned[:max_chars].rsplit(" ", 1)[0]
+    return cleaned
+
+
+def to_iso(value: Optional[str]) -> Optional[str]:
+    """Normalize an ISO 8601 or RFC 2822 timestamp to ISO 8601 in UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+@dataclass
+class Article:
+    """One fetched item, in the shape the pipeline stages consume."""
+
+    url: str
+    title: str
+    content: str
+    source: str
+    source_type: str
+    published_at: Optional[str] = None
+    author: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
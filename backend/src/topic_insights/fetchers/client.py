@@ -0,0 +1,191 @@
+"""
+Pooled HTTP client with per-host limits and conditional requests.
+"""
+import asyncio
+import json
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..agents.cache import CacheBackend, MemoryCache
+from ..agents.ratelimit import TokenBucket, is_retryable_error, retry_async
+from ..clients import PoolSettings, create_http_client
+from ..metrics import RETRIES
+
+logger = logging.getLogger(__name__)
+
+
+class FetchError(Exception):
+    """An upstream responded with an error status."""
+
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"GET {url} returned {status_code}")
+        self.url = url
+        self.status_code = status_code
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, httpx.TransportError) or is_retryable_error(exc)
+
+
+@dataclass
+class HostLimits:
+    """Politeness limits for one host.
+
+    Args:
+        max_connections: Requests in flight to the host at once.
+        requests_per_second: Sustained request rate, or None for no rate limit.
+        burst: Requests that may be sent back to back before the rate applies.
+    """
+
+    max_connections: int = 4
+    requests_per_second: Optional[float] = None
+    burst: float = 1.0
+
+
+@dataclass
+class FetchResponse:
+    """A fetched resource.
+
+    ``not_modified`` is True for a 304 to a conditional request; ``text`` is
+    then the body cached from the last full response.
+    """
+
+    url: str
+    status_code: int
+    text: str = ""
+    not_modified: bool = False
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class _HostState:
+    def __init__(self, limits: HostLimits):
+        self.semaphore = asyncio.Semaphore(limits.max_connections)
+        self.bucket = (
+            TokenBucket(limits.burst, limits.requests_per_second)
+            if limits.requests_per_second
+            else None
+        )
+
+
+class FetchClient:
+    """Fetches URLs over one keep-alive pool, politely and conditionally.
+
+    The ``ETag`` and ``Last-Modified`` of every successful response are kept in
+    ``validators`` with its body and sent back as ``If-None-Match``/
+    ``If-Modified-Since``, so unchanged resources cost a bodiless 304. The
+    cached body is returned for a 304, so a caller that failed to process the
+    last response (e.g. a retried job) still sees its content; skipping
+    content that was already processed is left to the caller. Use a
+    ``SQLiteCache`` to keep the validators across runs.
+
+    Args:
+        http_client: Optional pooled client; one is created (and owned) if None.
+        default_limits: Limits for hosts without an entry in ``host_limits``.
+        host_limits: Limits per host name.
+        validators: Store for conditional-request validators and cached bodies.
+        max_retries: Retries for transport errors, 429s and 5xx responses.
+        base_delay: Base of the jittered backoff between retries.
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        default_limits: Optional[HostLimits] = None,
+        host_limits: Optional[Dict[str, HostLimits]] = None,
+        validators: Optional[CacheBackend] = None,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        user_agent: str = "topic-insights/0.1",
+    ):
+        self._owns_client = http_client is None
+        self.http = http_client or create_http_client(
+            PoolSettings(timeout=30.0), follow_redirects=True
+        )
+        self.default_limits = default_limits or HostLimits()
+        self.host_limits = host_limits or {}
+        self.validators = validators if validators is not None else MemoryCache(max_entries=10_000)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.user_agent = user_agent
+        self.stats: Counter = Counter()
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.host_limits.get(host, self.default_limits))
+        return state
+
+    async def _send(self, url: httpx.URL, headers: Dict[str, str]) -> httpx.Response:
+        host = self._host(url.host)
+        if host.bucket is not None:
+            await host.bucket.acquire()
+        async with host.semaphore:
+            self.stats["requests"] += 1
+            response = await self.http.get(url, headers=headers)
+        if response.status_code >= 400:
+            raise FetchError(str(url), response.status_code)
+        return response
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        conditional: bool = True,
+    ) -> FetchResponse:
+        """GET ``url``; returns ``not_modified=True`` if it is unchanged since the last fetch.
+
+        A 304 response carries the body cached from the last full response.
+        """
+        # Merge rather than replace, so a query string already in ``url`` is kept.
+        target = httpx.URL(url).copy_merge_params(params or {})
+        key = str(target)
+        request_headers = {"User-Agent": self.user_agent, **(headers or {})}
+        cached = self.validators.get(key) if conditional else None
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        def on_retry(attempt: int, exc: BaseException) -> None:
+            self.stats["retries"] += 1
+            RETRIES.inc(component="fetch", operation=target.host)
+            logger.debug("Retrying %s after %s", target.host, exc)
+
+        try:
+            response = await retry_async(
+                lambda: self._send(target, request_headers),
+                max_retries=self.max_retries,
+                base_delay=self.base_delay,
+                is_retryable=_is_retryable,
+                on_retry=on_retry,
+            )
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+            body = cached.get("body", "") if cached else ""
+            return FetchResponse(key, 304, body, not_modified=True)
+
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": response.text,
+        }
+        if conditional and (validators["etag"] or validators["last_modified"]):
+            self.validators.set(key, validators)
+        return FetchResponse(key, response.status_code, response.text)
+
+    async def close(self) -> None:
+        if self._owns_client:
+            await self.http.aclose()
@@ -0,0 +1,225 @@
+"""
+Article sources: news APIs, arXiv, YouTube and RSS/Atom search feeds.
+"""
+import os
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+from .article import Article, clean_text, to_iso
+from .client import FetchClient, FetchResponse
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+# Longest article body kept; summaries only need the lead of an article.
+MAX_CONTENT_CHARS = 4000
+
+Request = Tuple[str, Dict[str, Any], Dict[str, str]]
+
+
+class Source(ABC):
+    """A searchable source of articles."""
+
+    name: str = "source"
+    source_type: str = "web"
+
+    @abstractmethod
+    def request(self, query: str, limit: int) -> Request:
+        """Return the ``(url, params, headers)`` that search for ``query``."""
+        pass
+
+    @abstractmethod
+    def parse(self, response: FetchResponse) -> List[Article]:
+        """Turn a response into articles."""
+        pass
+
+    async def fetch(self, client: FetchClient, query: str, limit: int = 20) -> List[Article]:
+        """Search for ``query``.
+
+        An unchanged result (304) is parsed from the body cached with its
+        validators, so it yields the same articles as the last fetch.
+        """
+        url, params, headers = self.request(query, limit)
+        response = await client.get(url, params=params, headers=headers)
+        if response.not_modified and not response.text:
+            return []
+        return [article for article in self.parse(response) if article.url][:limit]
+
+    def _article(self, **fields: Any) -> Article:
+        return Article(
+            url=fields.get("url") or "",
+            title=clean_text(fields.get("title")),
+            content=clean_text(fields.get("content"), MAX_CONTENT_CHARS),
+            source=fields.get("source") or self.name,
+            source_type=self.source_type,
+            published_at=to_iso(fields.get("published_at")),
+            author=fields.get("author") or None,
+        )
+
+
+class NewsAPISource(Source):
+    """newsapi.org ``/v2/everything`` search."""
+
+    name = "newsapi"
+    source_type = "news"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://newsapi.org/v2/everything",
+        language: Optional[str] = "en",
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.language = language
+
+    def request(self, query: str, limit: int) -> Request:
+        params: Dict[str, Any] = {"q": query, "pageSize": limit, "sortBy": "publishedAt"}
+        if self.language:
+            params["language"] = self.language
+        return self.base_url, params, {"X-Api-Key": self.api_key}
+
+    def parse(self, response: FetchResponse) -> List[Article]:
+        return [
+            self._article(
+                url=item.get("url"),
+                title=item.get("title"),
+                content=item.get("content") or item.get("description"),
+                source=(item.get("source") or {}).get("name"),
+                published_at=item.get("publishedAt"),
+                author=item.get("author"),
+            )
+            for item in response.json().get("articles", [])
+        ]
+
+
+class ArxivSource(Source):
+    """arXiv API search, newest submissions first."""
+
+    name = "arxiv"
+    source_type = "paper"
+
+    def __init__(self, base_url: str = "https://export.arxiv.org/api/query"):
+        self.base_url = base_url
+
+    def request(self, query: str, limit: int) -> Request:
+        params = {
+            "search_query": f'all:"{query}"',
+            "max_results": limit,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        }
+        return self.base_url, params, {}
+
+    def parse(self, response: FetchResponse) -> List[Article]:
+        root = ET.fromstring(response.text)
+        return [
+            self._article(
+                url=entry.findtext(f"{ATOM}id"),
+                title=entry.findtext(f"{ATOM}title"),
+                content=entry.findtext(f"{ATOM}summary"),
+                published_at=entry.findtext(f"{ATOM}published"),
+                author=", ".join(
+                    name.text or "" for name in entry.findall(f"{ATOM}author/{ATOM}name")
+                ),
+            )
+            for entry in root.findall(f"{ATOM}entry")
+        ]
+
+
+class YouTubeSource(Source):
+    """YouTube Data API video search."""
+
+    name = "youtube"
+    source_type = "video"
+
+    def __init__(
+        self, api_key: str, base_url: str = "https://www.googleapis.com/youtube/v3/search"
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def request(self, query: str, limit: int) -> Request:
+        params = {
+            "part": "snippet",
+            "q": query,
+            "type": "video",
+            "order": "date",
+            "maxResults": min(limit, 50),
+        }
+        # The key goes in a header so it never ends up in cache keys or logs.
+        return self.base_url, params, {"X-Goog-Api-Key": self.api_key}
+
+    def parse(self, response: FetchResponse) -> List[Article]:
+        articles = []
+        for item in response.json().get("items", []):
+            video_id = (item.get("id") or {}).get("videoId")
+            snippet = item.get("snippet") or {}
+            articles.append(
+                self._article(
+                    url=f"https://www.youtube.com/watch?v={video_id}" if video_id else None,
+                    title=snippet.get("title"),
+                    content=snippet.get("description"),
+                    source=snippet.get("channelTitle"),
+                    published_at=snippet.get("publishedAt"),
+                )
+            )
+        return articles
+
+
+class FeedSource(Source):
+    """RSS 2.0 or Atom search feed, e.g. a news search engine's RSS endpoint.
+
+    Args:
+        name: Source name recorded on each article.
+        url: Feed URL; ``{query}`` is replaced by the URL-encoded query if present,
+            otherwise the query is sent as the ``query_param`` parameter.
+    """
+
+    def __init__(self, name: str, url: str, query_param: str = "q", source_type: str = "news"):
+        self.name = name
+        self.url = url
+        self.query_param = query_param
+        self.source_type = source_type
+
+    def request(self, query: str, limit: int) -> Request:
+        if "{query}" in self.url:
+            return self.url.format(query=quote_plus(query)), {}, {}
+        return self.url, {self.query_param: query}, {}
+
+    def parse(self, response: FetchResponse) -> List[Article]:
+        root = ET.fromstring(response.text)
+        articles = [
+            self._article(
+                url=item.findtext("link"),
+                title=item.findtext("title"),
+                content=item.findtext("description"),
+                source=item.findtext("source"),
+                published_at=item.findtext("pubDate"),
+                author=item.findtext("author"),
+            )
+            for item in root.iter("item")
+        ]
+        for entry in root.iter(f"{ATOM}entry"):
+            link = entry.find(f"{ATOM}link")
+            articles.append(
+                self._article(
+                    url=link.get("href") if link is not None else entry.findtext(f"{ATOM}id"),
+                    title=entry.findtext(f"{ATOM}title"),
+                    content=entry.findtext(f"{ATOM}summary") or entry.findtext(f"{ATOM}content"),
+                    published_at=entry.findtext(f"{ATOM}updated")
+                    or entry.findtext(f"{ATOM}published"),
+                )
+            )
+        return articles
+
+
+def sources_from_env() -> List[Source]:
+    """arXiv, plus NewsAPI and YouTube when ``NEWSAPI_KEY``/``YOUTUBE_API_KEY`` are set."""
+    sources: List[Source] = [ArxivSource()]
+    if os.getenv("NEWSAPI_KEY"):
+        sources.append(NewsAPISource(os.environ["NEWSAPI_KEY"]))
+    if os.getenv("YOUTUBE_API_KEY"):
+        sources.append(YouTubeSource(os.environ["YOUTUBE_API_KEY"]))
+    return sources
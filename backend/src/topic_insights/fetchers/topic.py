@@ -0,0 +1,66 @@
+"""
+Fetch stage: search every source for every keyword of a topic, concurrently.
+"""
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+
+from ..agents.batch import run_bounded
+from .client import FetchClient
+from .sources import Source
+
+logger = logging.getLogger(__name__)
+
+
+class TopicFetcher:
+    """Collects a topic's articles from all sources; usable as a ``TopicPipeline`` fetcher.
+
+    Args:
+        client: Shared fetch client; its per-host limits keep the fan-out polite.
+        sources: Sources to search.
+        per_query_limit: Articles requested per (source, keyword) search.
+        concurrency: Searches in flight at once across all hosts.
+        max_keywords: Keywords searched per topic.
+    """
+
+    def __init__(
+        self,
+        client: FetchClient,
+        sources: Sequence[Source],
+        per_query_limit: int = 20,
+        concurrency: int = 16,
+        max_keywords: int = 10,
+    ):
+        self.client = client
+        self.sources = list(sources)
+        self.per_query_limit = per_query_limit
+        self.concurrency = concurrency
+        self.max_keywords = max_keywords
+
+    def queries(self, topic: Dict[str, Any]) -> List[str]:
+        """The topic's keywords, or its name if it has none."""
+        keywords = [k.strip() for k in topic.get("keywords") or [] if k and k.strip()]
+        if not keywords and topic.get("name"):
+            keywords = [topic["name"]]
+        return list(dict.fromkeys(keywords))[: self.max_keywords]
+
+    async def __call__(self, topic: Dict[str, Any]) -> List[Dict[str, Any]]:
+        searches: List[Tuple[Source, str]] = [
+            (source, query) for query in self.queries(topic) for source in self.sources
+        ]
+        articles: Dict[str, Dict[str, Any]] = {}
+        failures = 0
+        async for outcome in run_bounded(
+            lambda search: search[0].fetch(self.client, search[1], self.per_query_limit),
+            searches,
+            self.concurrency,
+        ):
+            if not outcome.ok:
+                failures += 1
+                source, query = outcome.item
+                logger.warning("Fetching %r from %s failed: %s", query, source.name, outcome.error)
+                continue
+            for article in outcome.result:
+                articles.setdefault(article.url, article.to_dict())
+        if searches and failures == len(searches):
+            raise RuntimeError(f"all {failures} searches failed for topic {topic.get('id')}")
+        return list(articles.values())
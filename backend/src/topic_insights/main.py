@@ -2,15 +2,56 @@
 Topic Insights Backend Entry Point
 """
 
-from typing import Any
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from topic_insights.api import analysis, export, realtime
+from topic_insights.api.dependencies import create_agent
+from topic_insights.clients import ClientManager
+from topic_insights.metrics import CONTENT_TYPE, HTTP_LATENCY, REGISTRY
+from topic_insights.realtime import RealtimeHub
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open the shared API clients and the agent on startup and close them on shutdown."""
+    clients = ClientManager.from_env()
+    await clients.start()
+    app.state.clients = clients
+    app.state.agent_error = None
+    try:
+        app.state.agent = await create_agent(clients.openai)
+    except ValueError as exc:
+        logger.warning("Agent is not configured; analysis endpoints return 503: %s", exc)
+        app.state.agent = None
+        app.state.agent_error = str(exc)
+    if clients.supabase is not None:
+        clients.supabase.add_change_listener(app.state.realtime_hub.on_change)
+        try:
+            await clients.supabase.start_realtime()
+        except Exception:
+            logger.exception("Realtime subscription failed; change events are disabled")
+    try:
+        yield
+    finally:
+        agent, app.state.agent = app.state.agent, None
+        if agent is not None:
+            await agent.cleanup()
+        await clients.close()
+
+
 app = FastAPI(
     title="Topic Insights API",
     description="API for Topic Insights content aggregation and analysis",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -22,6 +63,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Change events from the database subscription are fanned out through this hub.
+app.state.realtime_hub = RealtimeHub()
+
+@app.middleware("http")
+async def record_request_latency(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Time every request by its route template (time to response headers)."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_LATENCY.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status_code,
+        )
+
+
+app.include_router(analysis.router)
+app.include_router(realtime.router)
+app.include_router(export.router)
+
 
 @app.get("/")
 async def root() -> dict[str, str]:
@@ -31,18 +100,29 @@ async def root() -> dict[str, str]:
 
 @app.get("/api/v1/health")
 async def health_check() -> dict[str, Any]:
-    """Detailed health check endpoint."""
+    """Detailed health check endpoint.
+
+    Probes each configured upstream; the status is ``degraded`` if any fails.
+    """
+    clients = getattr(app.state, "clients", None)
+    probes = await clients.probe() if clients else {}
+    services = {"api": "healthy", "database": "not_configured", "llm": "not_configured"}
+    services.update({name: probe["status"] for name, probe in probes.items()})
     return {
-        "status": "ok",
+        "status": "degraded" if "unhealthy" in services.values() else "ok",
         "version": "0.1.0",
-        "services": {
-            "api": "healthy",
-            "database": "not_configured",  # Will be updated when Supabase is configured
-            "llm": "not_configured",  # Will be updated when LLM is configured
-        },
+        "services": services,
+        "latency_ms": {name: probe["latency_ms"] for name, probe in probes.items()},
+        "pools": clients.stats() if clients else {},
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
 
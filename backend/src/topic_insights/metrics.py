@@ -0,0 +1,394 @@
+"""
+In-process metrics exported in the Prometheus text format.
+
+Counters, gauges and histograms are kept per label set in a ``Registry`` and
+rendered by the ``/metrics`` endpoint. The metrics below cover agent calls
+(latency, tokens, estimated cost, retries), response and query caches, and
+database query timings.
+"""
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per million (input, output) tokens. Dated snapshots such as
+# ``gpt-4o-2024-08-06`` are priced by their longest matching prefix.
+# Input tokens served from the provider's prompt cache are billed at
+# ``CACHED_INPUT_DISCOUNT`` of the input price.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+CACHED_INPUT_DISCOUNT = 0.5
+
+
+def estimate_cost(
+    model: str, input_tokens: int, output_tokens: int = 0, cached_tokens: int = 0
+) -> Optional[float]:
+    """Estimated USD cost of a call, or None for models without a known price.
+
+    ``cached_tokens`` is the part of ``input_tokens`` served from the prompt cache.
+    """
+    matches = [name for name in MODEL_PRICES if model == name or model.startswith(name + "-")]
+    if not matches:
+        return None
+    input_price, output_price = MODEL_PRICES[max(matches, key=len)]
+    cached_tokens = min(cached_tokens, input_tokens)
+    billed_input = input_tokens - cached_tokens + cached_tokens * CACHED_INPUT_DISCOUNT
+    return (billed_input * input_price + output_tokens * output_price) / 1_000_000
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        """``(suffix, label values, extra label, value)`` for every series."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self.samples():
+            labels = _format_labels(self.labelnames, values, extra)
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        return [("", key, "", value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        return [("", key, "", value) for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts, sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the ``with`` block, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        samples = []
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                samples.append(("_bucket", key, f'le="{_format_value(bound)}"', cumulative))
+            samples.append(("_sum", key, "", total))
+            samples.append(("_count", key, "", count))
+        return samples
+
+
+class Registry:
+    """Named metrics plus collectors that refresh gauges at scrape time."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, help: str, labelnames: Sequence[str], **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} is already registered differently")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def set_collector(self, name: str, collect: Optional[Callable[[], None]]) -> None:
+        """Run ``collect`` before every render; None removes the collector."""
+        if collect is None:
+            self._collectors.pop(name, None)
+        else:
+            self._collectors[name] = collect
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        for collect in list(self._collectors.values()):
+            collect()
+        lines: List[str] = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+AGENT_LATENCY = REGISTRY.histogram(
+    "agent_request_seconds", "Agent API call latency.", ["agent", "method", "model"]
+)
+AGENT_REQUESTS = REGISTRY.counter(
+    "agent_requests_total",
+    "Agent calls by outcome (ok, error or cached).",
+    ["agent", "method", "model", "outcome"],
+)
+AGENT_TOKENS = REGISTRY.counter(
+    "agent_tokens_total",
+    "Tokens reported by the API, by direction (input, cached_input or output).",
+    ["model", "direction"],
+)
+PROMPT_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "agent_prompt_cache_hit_ratio",
+    "Share of input tokens served from the provider's prompt cache since startup.",
+    ["model"],
+)
+PROMPT_TOKENS = REGISTRY.counter(
+    "agent_prompt_tokens_total",
+    "Estimated prompt tokens by part (prefix, variable, or saved by compaction).",
+    ["agent", "method", "part"],
+)
+AGENT_COST = REGISTRY.counter(
+    "agent_cost_usd_total", "Estimated spend from reported token usage.", ["model"]
+)
+CASCADE_STEPS = REGISTRY.counter(
+    "agent_cascade_steps_total",
+    "Model cascade attempts by outcome (accepted, escalated or error).",
+    ["method", "model", "outcome"],
+)
+CASCADE_LATENCY = REGISTRY.histogram(
+    "agent_cascade_seconds",
+    "End-to-end cascade latency by the route taken, e.g. gpt-4o-mini>gpt-4o.",
+    ["method", "route"],
+)
+CASCADE_TOKENS = REGISTRY.counter(
+    "agent_cascade_input_tokens_total",
+    "Estimated input tokens sent to each cascade model.",
+    ["method", "model"],
+)
+STRUCTURED_OUTPUTS = REGISTRY.counter(
+    "agent_structured_outputs_total",
+    "Structured outputs by outcome (valid, repaired, retried or invalid).",
+    ["agent", "method", "outcome"],
+)
+RETRIES = REGISTRY.counter(
+    "retries_total", "Retried upstream calls.", ["component", "operation"]
+)
+CACHE_LOOKUPS = REGISTRY.gauge(
+    "cache_lookups", "Lookups per cache since startup, by result.", ["cache", "result"]
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "cache_hit_ratio", "Hits over lookups per cache since startup.", ["cache"]
+)
+DB_LATENCY = REGISTRY.histogram(
+    "db_query_seconds", "Database query latency.", ["operation"]
+)
+DB_ERRORS = REGISTRY.counter(
+    "db_query_errors_total", "Failed database queries.", ["operation"]
+)
+HTTP_POOL_CONNECTIONS = REGISTRY.gauge(
+    "http_pool_connections", "Pooled upstream connections by state.", ["upstream", "state"]
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_seconds", "API request latency.", ["method", "route", "status"]
+)
+
+
+def record_usage(model: str, usage: Any) -> None:
+    """Count the tokens and estimated cost of an API ``usage`` object."""
+    if usage is None:
+        return
+    input_tokens = getattr(usage, "prompt_tokens", None)
+    output_tokens = getattr(usage, "completion_tokens", None)
+    cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+    input_tokens = input_tokens if isinstance(input_tokens, int) else 0
+    output_tokens = output_tokens if isinstance(output_tokens, int) else 0
+    cached_tokens = cached_tokens if isinstance(cached_tokens, int) else 0
+    if input_tokens:
+        AGENT_TOKENS.inc(input_tokens, model=model, direction="input")
+        if cached_tokens:
+            AGENT_TOKENS.inc(cached_tokens, model=model, direction="cached_input")
+        total = AGENT_TOKENS.value(model=model, direction="input")
+        cached = AGENT_TOKENS.value(model=model, direction="cached_input")
+        PROMPT_CACHE_HIT_RATIO.set(cached / total, model=model)
+    if output_tokens:
+        AGENT_TOKENS.inc(output_tokens, model=model, direction="output")
+    cost = estimate_cost(model, input_tokens, output_tokens, cached_tokens)
+    if cost:
+        AGENT_COST.inc(cost, model=model)
+
+
+def record_prompt(
+    agent: str, method: str, prefix_tokens: int, total_tokens: int, saved_tokens: int
+) -> None:
+    """Count a built prompt's fixed prefix, variable tail and compaction savings."""
+    PROMPT_TOKENS.inc(prefix_tokens, agent=agent, method=method, part="prefix")
+    variable_tokens = max(0, total_tokens - prefix_tokens)
+    PROMPT_TOKENS.inc(variable_tokens, agent=agent, method=method, part="variable")
+    if saved_tokens:
+        PROMPT_TOKENS.inc(saved_tokens, agent=agent, method=method, part="saved")
+
+
+def record_cache(cache: str, hits: int, misses: int) -> None:
+    """Publish a cache's cumulative hit and miss counts."""
+    CACHE_LOOKUPS.set(hits, cache=cache, result="hit")
+    CACHE_LOOKUPS.set(misses, cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(hits / (hits + misses) if hits + misses else 0.0, cache=cache)
+
+
+def count_retry(component: str, operation: str) -> Callable[[int, BaseException], None]:
+    """An ``on_retry`` callback for ``retry_async`` that counts retries."""
+    def on_retry(attempt: int, exc: BaseException) -> None:
+        RETRIES.inc(component=component, operation=operation)
+
+    return on_retry
+
+
+def timed_query(
+    operation: str,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate an async database method to record its latency and failures."""
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with DB_LATENCY.time(operation=operation):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    DB_ERRORS.inc(operation=operation)
+                    raise
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,3 @@
+"""
+Pydantic models for Topic Insights.
+"""
@@ -0,0 +1,99 @@
+"""
+Agent-related models.
+"""
+import json
+from typing import Any, Dict, List, Union
+
+from pydantic import BaseModel, Field
+
+
+class Entity(BaseModel):
+    """A named entity or key concept extracted from content."""
+
+    entity: str = Field(description="Entity name")
+    category: str = Field(
+        description="One of People, Organizations, Locations, Technologies, Concepts, Dates"
+    )
+    relevance: float = Field(description="Relevance to the content", ge=0, le=1)
+
+
+class ContentAnalysisResult(BaseModel):
+    """Summary, entities and follow-up questions for one piece of content."""
+
+    summary: str = Field(description="Concise summary of the content")
+    entities: List[Entity] = Field(default_factory=list, description="Key entities extracted")
+    questions: List[str] = Field(
+        default_factory=list, description="Insightful follow-up questions"
+    )
+
+
+class EntityList(BaseModel):
+    """Structured output of entity extraction."""
+
+    entities: List[Entity] = Field(default_factory=list, description="Key entities extracted")
+
+
+class QuestionList(BaseModel):
+    """Structured output of question generation."""
+
+    questions: List[str] = Field(description="Insightful follow-up questions")
+
+
+ENTITY_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "entity": {"type": "string"},
+        "category": {
+            "type": "string",
+            "enum": ["People", "Organizations", "Locations", "Technologies", "Concepts", "Dates"],
+        },
+        "relevance": {"type": "number"},
+    },
+    "required": ["entity", "category", "relevance"],
+    "additionalProperties": False,
+}
+
+ENTITY_LIST_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"entities": {"type": "array", "items": ENTITY_JSON_SCHEMA}},
+    "required": ["entities"],
+    "additionalProperties": False,
+}
+
+QUESTION_LIST_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"questions": {"type": "array", "items": {"type": "string"}}},
+    "required": ["questions"],
+    "additionalProperties": False,
+}
+
+CONTENT_ANALYSIS_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "entities": {"type": "array", "items": ENTITY_JSON_SCHEMA},
+        "questions": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["summary", "entities", "questions"],
+    "additionalProperties": False,
+}
+
+
+def parse_entities(raw: Union[str, List[Any], Dict[str, Any], None]) -> List[Entity]:
+    """Coerce an entity extraction result into a list of ``Entity`` models.
+
+    Accepts a JSON string, a list of dicts, or an object wrapping the list (JSON
+    mode always returns an object, e.g. ``{"entities": [...]}``).
+    """
+    if raw is None:
+        return []
+    data = json.loads(raw) if isinstance(raw, str) else raw
+    if isinstance(data, dict):
+        data = next((value for value in data.values() if isinstance(value, list)), [])
+    entities = []
+    for item in data:
+        if isinstance(item, Entity):
+            entities.append(item)
+        elif isinstance(item, dict):
+            entities.append(Entity.model_validate(item))
+    return entities
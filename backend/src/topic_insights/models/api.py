@@ -0,0 +1,26 @@
+"""
+Request and response models for the HTTP API.
+"""
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AnalyzeTopicRequest(BaseModel):
+    """Request body for topic analysis."""
+
+    topic: str = Field(min_length=1)
+    context: Optional[Dict[str, Any]] = None
+
+
+class ExtractEntitiesRequest(BaseModel):
+    """Request body for entity extraction."""
+
+    content: str = Field(min_length=1)
+
+
+class SummarizeRequest(BaseModel):
+    """Request body for content summarization."""
+
+    content: str = Field(min_length=1)
+    max_length: Optional[int] = Field(default=None, gt=0)
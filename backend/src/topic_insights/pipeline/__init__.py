@@ -0,0 +1,3 @@
+"""
+Content processing pipeline stages for Topic Insights.
+"""
@@ -0,0 +1,230 @@
+"""
+Near-duplicate detection for incoming articles.
+
+Articles are reduced to word shingles and a MinHash signature. Signatures are
+bucketed with locality-sensitive hashing (LSH) so that a new article is only
+compared against the few indexed articles that share a band with it, which keeps
+lookups cheap as the index grows. Duplicates can then be dropped or clustered
+before any agent call.
+"""
+import re
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """Return the distinct 32-bit hashes of the word ``size``-shingles of ``text``."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    if len(words) <= size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+
+
+def _choose_bands(num_perm: int, threshold: float) -> int:
+    """Pick the band count whose LSH threshold (1/b)^(1/r) is closest to ``threshold``."""
+    candidates = [b for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(candidates, key=lambda b: abs((1 / b) ** (b / num_perm) - threshold))
+
+
+@dataclass
+class DedupResult:
+    """Outcome of checking one article against the index."""
+
+    doc_id: str
+    is_duplicate: bool
+    duplicate_of: Optional[str] = None
+    similarity: float = 0.0
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash/LSH index of recently seen articles.
+
+    Args:
+        threshold: Estimated Jaccard similarity at or above which two articles
+            are near-duplicates.
+        num_perm: Number of MinHash permutations (signature length).
+        shingle_size: Number of words per shingle.
+        window_days: If set, ``prune`` drops articles older than this many days.
+        seed: Seed for the permutation parameters. Indexes can only be compared
+            or merged when they share a seed.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        window_days: Optional[float] = 7,
+        seed: int = 1,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.window_days = window_days
+        self.seed = seed
+        self.bands = _choose_bands(num_perm, threshold)
+        self.rows = num_perm // self.bands
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._timestamps: Dict[str, float] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [defaultdict(set) for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._signatures
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Compute the MinHash signature of ``text``, or None if it has no words."""
+        hashes = shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return None
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)
+        ]
+
+    def query(self, signature: np.ndarray) -> List[Tuple[str, float]]:
+        """Return indexed articles similar to ``signature``, most similar first."""
+        candidates: Set[str] = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        matches = []
+        for doc_id in candidates:
+            similarity = float(np.mean(self._signatures[doc_id] == signature))
+            if similarity >= self.threshold:
+                matches.append((doc_id, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def add(self, doc_id: str, signature: np.ndarray, timestamp: Optional[float] = None) -> None:
+        """Insert a signature, replacing any previous entry for ``doc_id``."""
+        if doc_id in self._signatures:
+            self.remove(doc_id)
+        self._signatures[doc_id] = signature
+        self._timestamps[doc_id] = time.time() if timestamp is None else timestamp
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket[key].add(doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        """Remove an article from the index."""
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        del self._timestamps[doc_id]
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(doc_id)
+                if not members:
+                    del bucket[key]
+
+    def check(
+        self, doc_id: str, text: str, timestamp: Optional[float] = None, add: bool = True
+    ) -> DedupResult:
+        """Check an article against the index and, if it is new, index it.
+
+        Near-duplicates are not indexed; ``duplicate_of`` names the indexed
+        article they belong with, so callers can drop or cluster them.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return DedupResult(doc_id, is_duplicate=False)
+        matches = [match for match in self.query(signature) if match[0] != doc_id]
+        if matches:
+            original, similarity = matches[0]
+            return DedupResult(doc_id, True, duplicate_of=original, similarity=similarity)
+        if add:
+            self.add(doc_id, signature, timestamp)
+        return DedupResult(doc_id, is_duplicate=False)
+
+    def deduplicate(
+        self, articles: Iterable[Tuple[str, str]], timestamp: Optional[float] = None
+    ) -> List[DedupResult]:
+        """Check a batch of ``(doc_id, text)`` pairs, including against each other."""
+        return [self.check(doc_id, text, timestamp) for doc_id, text in articles]
+
+    def merge(self, other: "NearDuplicateIndex") -> None:
+        """Add every article of ``other``, which must use the same permutations."""
+        if (other.num_perm, other.seed) != (self.num_perm, self.seed):
+            raise ValueError("indexes with different num_perm or seed cannot be merged")
+        for doc_id, signature in other._signatures.items():
+            self.add(doc_id, signature, other._timestamps[doc_id])
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop articles older than the window and return how many were removed."""
+        if self.window_days is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.window_days * 86400
+        expired = [doc_id for doc_id, ts in self._timestamps.items() if ts < cutoff]
+        for doc_id in expired:
+            self.remove(doc_id)
+        return len(expired)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the index to a compressed ``.npz`` file."""
+        ids = list(self._signatures)
+        signatures = (
+            np.stack([self._signatures[doc_id] for doc_id in ids])
+            if ids
+            else np.empty((0, self.num_perm), dtype=np.uint32)
+        )
+        np.savez_compressed(
+            path,
+            ids=np.array(ids, dtype=str),
+            signatures=signatures,
+            timestamps=np.array([self._timestamps[doc_id] for doc_id in ids], dtype=np.float64),
+            config=np.array(
+                [
+                    self.threshold,
+                    self.num_perm,
+                    self.shingle_size,
+                    -1 if self.window_days is None else self.window_days,
+                    self.seed,
+                ],
+                dtype=np.float64,
+            ),
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "NearDuplicateIndex":
+        """Load an index written by ``save``."""
+        with np.load(path) as data:
+            threshold, num_perm, shingle_size, window_days, seed = data["config"].tolist()
+            index = cls(
+                threshold=threshold,
+                num_perm=int(num_perm),
+                shingle_size=int(shingle_size),
+                window_days=None if window_days < 0 else window_days,
+                seed=int(seed),
+            )
+            for doc_id, signature, timestamp in zip(
+                data["ids"].tolist(), data["signatures"], data["timestamps"].tolist()
+            ):
+                index.add(doc_id, signature, timestamp)
+        return index
@@ -0,0 +1,193 @@
+"""
+Bulk, idempotent ingest of summaries.
+
+Rows are de-duplicated on (topic_id, source_url), split into fixed-size chunks
+and upserted with several chunks in flight at once. Because every write is an
+upsert on that key, a run (or just its failed chunks) can be repeated safely.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Protocol
+
+import httpx
+from postgrest.exceptions import APIError
+
+from ..agents.batch import run_bounded
+from ..agents.ratelimit import is_retryable_error, retry_async
+
+logger = logging.getLogger(__name__)
+
+# Transient Postgres failures by SQLSTATE: connection exceptions (08),
+# insufficient resources (53) and operator intervention such as shutdowns
+# (57P), plus serialization failures, deadlocks and statement timeouts.
+_RETRYABLE_SQLSTATE_CLASSES = ("08", "53", "57P")
+_RETRYABLE_SQLSTATES = frozenset({"40001", "40P01", "57014"})
+# PostgREST's own codes for an unreachable database or an exhausted pool.
+_RETRYABLE_POSTGREST_CODES = frozenset({"PGRST000", "PGRST001", "PGRST002", "PGRST003"})
+
+
+class SummaryStore(Protocol):
+    """Anything that can upsert a list of summary rows (e.g. ``SupabaseService``)."""
+
+    async def upsert_summaries(self, summaries: List[Dict[str, Any]]) -> Any: ...
+
+
+def _is_retryable_api_error(exc: APIError) -> bool:
+    """Classify a PostgREST ``APIError``, which carries no ``status_code``.
+
+    A JSON error body has a Postgres SQLSTATE or a PostgREST code. Any other
+    body, e.g. a gateway's 502 page, is reported with the HTTP status as code.
+    """
+    code = exc.code
+    if isinstance(code, int) or (isinstance(code, str) and len(code) == 3 and code.isdigit()):
+        return int(code) == 429 or int(code) >= 500
+    if not isinstance(code, str):
+        return False
+    return (
+        code in _RETRYABLE_SQLSTATES
+        or code in _RETRYABLE_POSTGREST_CODES
+        or code.startswith(_RETRYABLE_SQLSTATE_CLASSES)
+    )
+
+
+def is_retryable_ingest_error(exc: BaseException) -> bool:
+    """Retry transport failures as well as throttling and server errors."""
+    if isinstance(exc, APIError):
+        return _is_retryable_api_error(exc)
+    return isinstance(exc, httpx.TransportError) or is_retryable_error(exc)
+
+
+def dedupe_summaries(summaries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the last row for each (topic_id, source_url).
+
+    Postgres rejects an upsert that touches the same row twice, so duplicates
+    must be collapsed before rows are chunked. Rows without a source URL are kept.
+    """
+    rows: Dict[Hashable, Dict[str, Any]] = {}
+    for position, row in enumerate(summaries):
+        source_url = row.get("source_url")
+        key = (str(row.get("topic_id")), source_url) if source_url else position
+        rows.pop(key, None)
+        rows[key] = row
+    return list(rows.values())
+
+
+@dataclass
+class ChunkResult:
+    """Outcome of upserting one chunk."""
+
+    index: int
+    rows: List[Dict[str, Any]]
+    seconds: float = 0.0
+    attempts: int = 1
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class IngestReport:
+    """Per-chunk timings and failures of an ingest run."""
+
+    chunks: List[ChunkResult] = field(default_factory=list)
+    duplicates: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_written(self) -> int:
+        return sum(len(chunk.rows) for chunk in self.chunks if chunk.ok)
+
+    @property
+    def failed_chunks(self) -> List[ChunkResult]:
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_written / self.seconds if self.seconds else 0.0
+
+    def failed_rows(self) -> List[Dict[str, Any]]:
+        """Rows of the failed chunks, ready to pass back to ``ingest``."""
+        return [row for chunk in self.failed_chunks for row in chunk.rows]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chunks": len(self.chunks),
+            "failed_chunks": len(self.failed_chunks),
+            "rows_written": self.rows_written,
+            "rows_failed": len(self.failed_rows()),
+            "duplicates": self.duplicates,
+            "seconds": self.seconds,
+            "rows_per_second": self.rows_per_second,
+            "chunk_seconds": [chunk.seconds for chunk in self.chunks],
+        }
+
+
+class BulkIngester:
+    """Upserts summaries in concurrent, retried chunks.
+
+    Args:
+        store: Target of the upserts, usually a ``SupabaseService``.
+        chunk_size: Rows per upsert request.
+        concurrency: Chunks in flight at once.
+        max_retries: Retries for a chunk that fails with a transient error.
+        base_delay: Base of the jittered exponential backoff between retries.
+    """
+
+    def __init__(
+        self,
+        store: SummaryStore,
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.store = store
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+    async def _upsert_chunk(self, chunk: ChunkResult) -> ChunkResult:
+        def on_retry(attempt: int, exc: BaseException) -> None:
+            chunk.attempts = attempt + 2
+            logger.warning("Retrying summary chunk %d after error: %s", chunk.index, exc)
+
+        started = time.perf_counter()
+        try:
+            await retry_async(
+                lambda: self.store.upsert_summaries(chunk.rows),
+                max_retries=self.max_retries,
+                base_delay=self.base_delay,
+                is_retryable=is_retryable_ingest_error,
+                on_retry=on_retry,
+            )
+        except Exception as exc:
+            chunk.error = exc
+            logger.error("Summary chunk %d (%d rows) failed: %s", chunk.index, len(chunk.rows), exc)
+        chunk.seconds = time.perf_counter() - started
+        return chunk
+
+    async def ingest(self, summaries: Iterable[Dict[str, Any]]) -> IngestReport:
+        """Upsert every summary and report how each chunk went.
+
+        Failed chunks do not stop the run; retry them with
+        ``ingest(report.failed_rows())``.
+        """
+        started = time.perf_counter()
+        summaries = list(summaries)
+        rows = dedupe_summaries(summaries)
+        chunks = [
+            ChunkResult(index, rows[start : start + self.chunk_size])
+            for index, start in enumerate(range(0, len(rows), self.chunk_size))
+        ]
+        report = IngestReport(duplicates=len(summaries) - len(rows))
+        async for outcome in run_bounded(self._upsert_chunk, chunks, self.concurrency):
+            report.chunks.append(outcome.result)
+        report.chunks.sort(key=lambda chunk: chunk.index)
+        report.seconds = time.perf_counter() - started
+        return report
@@ -0,0 +1,183 @@
+"""
+Fan-out of database change events to connected dashboard clients.
+
+One database subscription feeds the hub; the hub pushes each change to every
+client subscribed to the affected topic. Each subscriber has a bounded buffer
+in which bursty updates to the same row are coalesced, and slow consumers either
+lose their oldest pending events or are disconnected.
+"""
+import asyncio
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+
+@dataclass
+class ChangeEvent:
+    """A change to a topic or summary row."""
+
+    table: str
+    type: str
+    topic_id: str
+    record_id: Optional[str]
+    record: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> Tuple[str, Optional[str]]:
+        """Events with the same key supersede each other when coalescing."""
+        return (self.table, self.record_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Subscription:
+    """A client's filtered, bounded view of the change stream."""
+
+    def __init__(self, topic_ids: Optional[Set[str]], max_pending: int, policy: str):
+        self.topic_ids = topic_ids
+        self.max_pending = max_pending
+        self.policy = policy
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self.dropped = 0
+        self.coalesced = 0
+        self._pending: "OrderedDict[Tuple[str, Optional[str]], ChangeEvent]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def offer(self, event: ChangeEvent) -> None:
+        """Queue an event without blocking the publisher."""
+        if self.closed:
+            return
+        if event.key in self._pending:
+            # Keep the original position so a hot row cannot starve others.
+            self._pending[event.key] = event
+            self.coalesced += 1
+            return
+        if len(self._pending) >= self.max_pending:
+            if self.policy == DISCONNECT:
+                self.close("slow consumer")
+                return
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[event.key] = event
+        self._ready.set()
+
+    def close(self, reason: Optional[str] = None) -> None:
+        if not self.closed:
+            self.closed = True
+            self.close_reason = reason
+        self._pending.clear()
+        self._ready.set()
+
+    async def get(self) -> Optional[ChangeEvent]:
+        """Wait for the next event; returns None once the subscription is closed."""
+        while not self._pending:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        if self.closed:
+            return None
+        _, event = self._pending.popitem(last=False)
+        return event
+
+    async def __aiter__(self) -> AsyncIterator[ChangeEvent]:
+        while True:
+            event = await self.get()
+            if event is None:
+                return
+            yield event
+
+
+class RealtimeHub:
+    """Routes change events to subscriptions filtered by topic.
+
+    Args:
+        max_pending: Buffered events per subscriber before the policy applies.
+        policy: ``drop_oldest`` to discard the oldest pending event, or
+            ``disconnect`` to close subscribers that fall behind.
+    """
+
+    def __init__(self, max_pending: int = 100, policy: str = DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown slow-consumer policy: {policy}")
+        self.max_pending = max_pending
+        self.policy = policy
+        self.published = 0
+        self._by_topic: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._all_topics: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        subscriptions = set(self._all_topics)
+        for subscribers in self._by_topic.values():
+            subscriptions |= subscribers
+        return len(subscriptions)
+
+    def subscribe(
+        self,
+        topic_ids: Optional[Iterable[str]] = None,
+        max_pending: Optional[int] = None,
+        policy: Optional[str] = None,
+    ) -> Subscription:
+        """Subscribe to changes for ``topic_ids``, or to every topic if None."""
+        topics = {str(t) for t in topic_ids} if topic_ids else None
+        subscription = Subscription(
+            topics, max_pending or self.max_pending, policy or self.policy
+        )
+        if topics is None:
+            self._all_topics.add(subscription)
+        else:
+            for topic_id in topics:
+                self._by_topic[topic_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        self._all_topics.discard(subscription)
+        for topic_id in subscription.topic_ids or ():
+            subscribers = self._by_topic.get(topic_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_topic[topic_id]
+
+    def publish(self, event: ChangeEvent) -> None:
+        """Deliver an event to every matching subscription."""
+        self.published += 1
+        targets = self._all_topics | self._by_topic.get(event.topic_id, set())
+        for subscription in targets:
+            subscription.offer(event)
+            if subscription.closed:
+                self.unsubscribe(subscription)
+
+    def on_change(self, table: str, event_type: str, record: Dict[str, Any]) -> None:
+        """Change listener for ``SupabaseService.add_change_listener``."""
+        topic_id = record.get("id") if table == "topics" else record.get("topic_id")
+        if topic_id is None:
+            return
+        record_id = record.get("id")
+        self.publish(
+            ChangeEvent(
+                table=table,
+                type=event_type,
+                topic_id=str(topic_id),
+                record_id=str(record_id) if record_id is not None else None,
+                record=record,
+            )
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": self.subscriber_count,
+            "topics": len(self._by_topic),
+            "published": self.published,
+        }
@@ -0,0 +1,3 @@
+"""
+Scheduling of the daily per-topic pipeline.
+"""
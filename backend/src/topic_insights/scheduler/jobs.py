@@ -0,0 +1,160 @@
+"""
+Client for the durable Postgres job queue (see ``scripts/setup_supabase.py``).
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+
+@dataclass
+class Job:
+    """A job leased from the queue."""
+
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int = 1
+    max_attempts: int = 5
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Job":
+        return cls(
+            id=str(row["id"]),
+            kind=row["kind"],
+            payload=row.get("payload") or {},
+            attempts=row.get("attempts", 1),
+            max_attempts=row.get("max_attempts", 5),
+        )
+
+
+class JobQueue:
+    """Enqueues, leases and settles jobs through the queue's RPC functions.
+
+    Dequeuing uses ``FOR UPDATE SKIP LOCKED``, so any number of workers on any
+    number of nodes can share one queue.
+
+    Args:
+        client: Async Supabase client, e.g. ``SupabaseService.client``.
+        enqueue_chunk_size: Jobs inserted per ``enqueue_jobs`` call.
+    """
+
+    def __init__(self, client: Any, enqueue_chunk_size: int = 500):
+        self.client = client
+        self.enqueue_chunk_size = enqueue_chunk_size
+
+    async def _call(self, function: str, params: Dict[str, Any]) -> Any:
+        response = await self.client.rpc(function, params).execute()
+        return response.data if response else None
+
+    async def enqueue(
+        self,
+        kind: str,
+        payloads: Iterable[Dict[str, Any]],
+        dedupe_keys: Optional[Sequence[Optional[str]]] = None,
+        priority: int = 0,
+        run_after: Optional[datetime] = None,
+        max_attempts: int = 5,
+    ) -> List[str]:
+        """Add jobs and return the ids of those created.
+
+        Jobs whose ``dedupe_key`` is already in the queue are skipped, which
+        makes enqueuing the same day's work twice harmless.
+        """
+        jobs = []
+        for position, payload in enumerate(payloads):
+            job = {
+                "kind": kind,
+                "payload": payload,
+                "priority": priority,
+                "max_attempts": max_attempts,
+            }
+            if dedupe_keys is not None and dedupe_keys[position] is not None:
+                job["dedupe_key"] = dedupe_keys[position]
+            if run_after is not None:
+                job["run_after"] = run_after.isoformat()
+            jobs.append(job)
+
+        ids: List[str] = []
+        for start in range(0, len(jobs), self.enqueue_chunk_size):
+            created = await self._call(
+                "enqueue_jobs", {"p_jobs": jobs[start : start + self.enqueue_chunk_size]}
+            )
+            ids.extend(str(job_id) for job_id in created or [])
+        return ids
+
+    async def dequeue(
+        self,
+        worker_id: str,
+        limit: int = 10,
+        lease_seconds: int = 60,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> List[Job]:
+        """Lease up to ``limit`` ready jobs, lowest ``priority`` value first."""
+        rows = await self._call(
+            "dequeue_jobs",
+            {
+                "p_worker": worker_id,
+                "p_limit": limit,
+                "p_lease_seconds": lease_seconds,
+                "p_kinds": list(kinds) if kinds else None,
+            },
+        )
+        return [Job.from_row(row) for row in rows or []]
+
+    async def heartbeat(
+        self, worker_id: str, job_ids: Sequence[str], lease_seconds: int = 60
+    ) -> Set[str]:
+        """Extend leases and return the ids this worker still holds."""
+        if not job_ids:
+            return set()
+        held = await self._call(
+            "heartbeat_jobs",
+            {"p_worker": worker_id, "p_ids": list(job_ids), "p_lease_seconds": lease_seconds},
+        )
+        return {str(job_id) for job_id in held or []}
+
+    async def complete(self, worker_id: str, job_ids: Sequence[str]) -> int:
+        """Mark jobs done; returns how many this worker still held."""
+        if not job_ids:
+            return 0
+        params = {"p_worker": worker_id, "p_ids": list(job_ids)}
+        return await self._call("complete_jobs", params) or 0
+
+    async def fail(
+        self,
+        worker_id: str,
+        job_id: str,
+        error: str,
+        base_delay: float = 5.0,
+        max_delay: float = 3600.0,
+        retry: bool = True,
+    ) -> Optional[str]:
+        """Requeue a failed job with backoff, or dead-letter it; returns its new status."""
+        return await self._call(
+            "fail_job",
+            {
+                "p_worker": worker_id,
+                "p_id": job_id,
+                "p_error": error,
+                "p_base_delay_seconds": base_delay,
+                "p_max_delay_seconds": max_delay,
+                "p_retry": retry,
+            },
+        )
+
+    async def requeue_dead(self, kind: Optional[str] = None) -> int:
+        """Give dead-lettered jobs a fresh set of attempts."""
+        return await self._call("requeue_dead_jobs", {"p_kind": kind}) or 0
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        """Job counts by kind and status."""
+        rows = await self._call("job_queue_stats", {})
+        stats: Dict[str, Dict[str, int]] = {}
+        for row in rows or []:
+            stats.setdefault(row["kind"], {})[row["status"]] = row["count"]
+        return stats
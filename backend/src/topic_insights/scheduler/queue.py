@@ -0,0 +1,69 @@
+"""
+Priority queue with round-robin fairness between tenants.
+"""
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+
+@dataclass
+class TopicJob:
+    """One topic's pipeline run.
+
+    Lower ``priority`` values run first. ``tenant`` is the topic's owner; within
+    a priority level tenants take turns, so one tenant with many topics cannot
+    delay everyone else.
+    """
+
+    topic: Dict[str, Any]
+    priority: int = 0
+    tenant: str = ""
+    attempts: int = 0
+
+    @property
+    def topic_id(self) -> str:
+        return str(self.topic["id"])
+
+    @classmethod
+    def from_topic(cls, topic: Dict[str, Any]) -> "TopicJob":
+        """Build a job from a ``topics`` row, reading ``metadata.priority``."""
+        metadata = topic.get("metadata") or {}
+        return cls(
+            topic=topic,
+            priority=int(metadata.get("priority", 0)),
+            tenant=str(topic.get("user_id") or ""),
+        )
+
+
+class FairQueue:
+    """Jobs ordered by priority, then round-robin across tenants, then FIFO."""
+
+    def __init__(self):
+        self._levels: Dict[int, "OrderedDict[str, Deque[TopicJob]]"] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, job: TopicJob) -> None:
+        tenants = self._levels.setdefault(job.priority, OrderedDict())
+        tenants.setdefault(job.tenant, deque()).append(job)
+        self._size += 1
+
+    def pop(self) -> Optional[TopicJob]:
+        """Remove and return the next job, or None if the queue is empty."""
+        if not self._levels:
+            return None
+        priority = min(self._levels)
+        tenants = self._levels[priority]
+        tenant, jobs = next(iter(tenants.items()))
+        job = jobs.popleft()
+        if jobs:
+            # The tenant goes to the back of the rotation for this level.
+            tenants.move_to_end(tenant)
+        else:
+            del tenants[tenant]
+            if not tenants:
+                del self._levels[priority]
+        self._size -= 1
+        return job
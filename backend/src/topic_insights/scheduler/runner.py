@@ -0,0 +1,239 @@
+"""
+Worker-pool runner for per-topic pipeline jobs.
+
+Each job runs its stages in order. Jobs are pulled from a ``FairQueue`` by a
+fixed number of asyncio workers, finished jobs are checkpointed so a crashed
+run can resume, and every stage is timed so runs can be held to their budget.
+"""
+import asyncio
+import functools
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .checkpoint import DONE, FAILED, Checkpoint
+from .queue import FairQueue, TopicJob
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobContext:
+    """State passed from stage to stage within one job."""
+
+    job: TopicJob
+    run_id: str
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    summaries: List[Dict[str, Any]] = field(default_factory=list)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+Stage = Callable[[JobContext], Awaitable[None]]
+
+
+@dataclass
+class JobResult:
+    """Outcome and per-stage timings of one job."""
+
+    topic_id: str
+    tenant: str
+    ok: bool
+    stages: Dict[str, float] = field(default_factory=dict)
+    failed_stage: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.stages.values())
+
+
+@dataclass
+class RunReport:
+    """Summary of a scheduler run."""
+
+    run_id: str
+    budget_seconds: Optional[float] = None
+    results: List[JobResult] = field(default_factory=list)
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> List[JobResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget_seconds is not None and self.seconds > self.budget_seconds
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean, p95 and max seconds for each stage."""
+        durations: Dict[str, List[float]] = {}
+        for result in self.results:
+            for stage, seconds in result.stages.items():
+                durations.setdefault(stage, []).append(seconds)
+        stats = {}
+        for stage, values in durations.items():
+            values.sort()
+            stats[stage] = {
+                "count": len(values),
+                "total": sum(values),
+                "mean": statistics.fmean(values),
+                "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+                "max": values[-1],
+            }
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "jobs": len(self.results),
+            "failed": len(self.failed),
+            "skipped": self.skipped,
+            "seconds": self.seconds,
+            "budget_seconds": self.budget_seconds,
+            "over_budget": self.over_budget,
+            "stages": self.stage_stats(),
+            "failures": [
+                {"topic_id": r.topic_id, "stage": r.failed_stage, "error": r.error}
+                for r in self.failed
+            ],
+        }
+
+
+class Scheduler:
+    """Runs per-topic jobs through a sequence of stages on a worker pool.
+
+    Args:
+        stages: ``(name, stage)`` pairs run in order for every job.
+        concurrency: Jobs in flight at once.
+        checkpoint: Optional checkpoint log used to resume interrupted runs.
+        budget_seconds: Wall-clock budget; a warning is logged as soon as the
+            projected run time exceeds it.
+        job_timeout: Optional limit in seconds for one job.
+        max_attempts: Attempts per job; failed jobs are re-queued until reached.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Tuple[str, Stage]],
+        concurrency: int = 8,
+        checkpoint: Optional[Checkpoint] = None,
+        budget_seconds: Optional[float] = 3600.0,
+        job_timeout: Optional[float] = None,
+        max_attempts: int = 1,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.stages = list(stages)
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.budget_seconds = budget_seconds
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+
+    async def _run_stages(self, ctx: JobContext, result: JobResult) -> None:
+        for name, stage in self.stages:
+            result.failed_stage = name
+            started = time.perf_counter()
+            try:
+                await stage(ctx)
+            finally:
+                result.stages[name] = time.perf_counter() - started
+        result.failed_stage = None
+
+    async def run_job(self, job: TopicJob, run_id: str) -> JobResult:
+        """Run every stage for one job, stopping at the first failure."""
+        job.attempts += 1
+        result = JobResult(job.topic_id, job.tenant, ok=False)
+        try:
+            await asyncio.wait_for(
+                self._run_stages(JobContext(job, run_id), result), self.job_timeout
+            )
+            result.ok = True
+        except asyncio.TimeoutError:
+            result.error = f"timed out after {self.job_timeout}s"
+        except Exception as exc:
+            result.error = f"{type(exc).__name__}: {exc}"
+        if not result.ok:
+            logger.warning(
+                "Topic %s failed in stage %s: %s", job.topic_id, result.failed_stage, result.error
+            )
+        return result
+
+    async def run(self, jobs: Iterable[TopicJob], run_id: Optional[str] = None) -> RunReport:
+        """Run ``jobs`` and return the report.
+
+        ``run_id`` defaults to today's UTC date, so rerunning after a crash on
+        the same day resumes from the checkpoint.
+        """
+        run_id = run_id or datetime.now(timezone.utc).date().isoformat()
+        report = RunReport(run_id, budget_seconds=self.budget_seconds)
+        done = self.checkpoint.completed(run_id) if self.checkpoint else set()
+
+        queue = FairQueue()
+        for job in jobs:
+            if job.topic_id in done:
+                report.skipped += 1
+            else:
+                queue.push(job)
+        total = len(queue)
+        if report.skipped:
+            logger.info("Resuming run %s: %d topics already done", run_id, report.skipped)
+
+        started = time.perf_counter()
+        warned = False
+
+        async def worker() -> None:
+            nonlocal warned
+            while True:
+                job = queue.pop()
+                if job is None:
+                    return
+                result = await self.run_job(job, run_id)
+                if not result.ok and job.attempts < self.max_attempts:
+                    queue.push(job)
+                    continue
+                report.results.append(result)
+                if self.checkpoint is not None:
+                    # record() fsyncs, so keep it off the event loop.
+                    await asyncio.get_running_loop().run_in_executor(
+                        None,
+                        functools.partial(
+                            self.checkpoint.record,
+                            run_id,
+                            result.topic_id,
+                            DONE if result.ok else FAILED,
+                            result.stages,
+                            result.error,
+                        ),
+                    )
+                elapsed = time.perf_counter() - started
+                projected = elapsed / len(report.results) * total
+                over = self.budget_seconds is not None and projected > self.budget_seconds
+                if over and not warned:
+                    warned = True
+                    logger.warning(
+                        "Run %s projected to take %.0fs, over its %.0fs budget",
+                        run_id,
+                        projected,
+                        self.budget_seconds,
+                    )
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, total) or 1)))
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            "Run %s finished %d topics (%d failed) in %.1fs",
+            run_id,
+            len(report.results),
+            len(report.failed),
+            report.seconds,
+        )
+        return report
+
+
+async def active_topic_jobs(service: Any) -> List[TopicJob]:
+    """Build one job per active topic of a ``SupabaseService``."""
+    return [TopicJob.from_topic(topic) async for topic in service.iter_active_topics()]
@@ -0,0 +1,232 @@
+"""
+The default fetch -> dedup -> summarize -> store stages of the daily pipeline.
+"""
+import asyncio
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..agents.base import BaseAgent
+from ..pipeline.dedup import DedupResult, NearDuplicateIndex
+from ..pipeline.ingest import BulkIngester
+from .jobs import JobQueue
+from .queue import TopicJob
+from .runner import JobContext, Stage
+
+SUMMARIZE_JOB = "summarize"
+
+# Returns the articles to consider for a topic. Each article is a dict with at
+# least ``content``, and usually ``url``, ``title`` and ``published_at``.
+Fetcher = Callable[[Dict[str, Any]], Awaitable[Iterable[Dict[str, Any]]]]
+
+
+def _dedup_batch(
+    index: NearDuplicateIndex, pairs: List[Tuple[str, str]]
+) -> Tuple[List[DedupResult], NearDuplicateIndex]:
+    """Check articles against ``index`` and each other without changing ``index``.
+
+    Articles already in ``index`` were processed by an earlier run and count
+    as duplicates of themselves. New articles are collected in the returned
+    pending index, to be merged once they are stored.
+    """
+    pending = NearDuplicateIndex(
+        index.threshold, index.num_perm, index.shingle_size, index.window_days, index.seed
+    )
+    results = []
+    for doc_id, text in pairs:
+        if doc_id in index or doc_id in pending:
+            results.append(DedupResult(doc_id, True, duplicate_of=doc_id, similarity=1.0))
+            continue
+        signature = index.signature(text)
+        if signature is None:
+            results.append(DedupResult(doc_id, is_duplicate=False))
+            continue
+        matches = sorted(
+            index.query(signature) + pending.query(signature),
+            key=lambda match: match[1],
+            reverse=True,
+        )
+        if matches:
+            original, similarity = matches[0]
+            results.append(DedupResult(doc_id, True, duplicate_of=original, similarity=similarity))
+        else:
+            pending.add(doc_id, signature)
+            results.append(DedupResult(doc_id, is_duplicate=False))
+    return results, pending
+
+
+class TopicPipeline:
+    """Builds the stages that turn a topic's new articles into stored summaries.
+
+    Args:
+        fetch: Returns the candidate articles for a topic.
+        agent: Agent used to summarize articles.
+        ingester: Stores summary rows, usually a ``BulkIngester`` over ``SupabaseService``.
+        max_length: Optional summary length passed to the agent.
+        dedup_threshold: Similarity at which articles of a topic are near-duplicates.
+        executor: Executor for CPU-bound work such as MinHash signatures; the
+            event loop's default thread pool if None.
+        index_dir: Optional directory where each topic's dedup index is saved
+            as ``<topic_id>.npz``, so articles seen on earlier days are skipped
+            after a restart. Indexes are kept in memory only if None.
+
+    An article is added to its topic's dedup index only once its summary is
+    stored, so a job that fails and is retried processes it again. Indexes
+    are pruned to their window (7 days) before each run of a topic.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetcher,
+        agent: BaseAgent,
+        ingester: BulkIngester,
+        max_length: Optional[int] = None,
+        dedup_threshold: float = 0.8,
+        executor: Optional[Executor] = None,
+        index_dir: Optional[Union[str, Path]] = None,
+    ):
+        self._fetch = fetch
+        self.agent = agent
+        self.ingester = ingester
+        self.max_length = max_length
+        self.dedup_threshold = dedup_threshold
+        self.executor = executor
+        self.index_dir = Path(index_dir) if index_dir is not None else None
+        self._dedup_indexes: Dict[str, NearDuplicateIndex] = {}
+
+    @property
+    def stages(self) -> List[Tuple[str, Stage]]:
+        return [
+            ("fetch", self.fetch),
+            ("dedup", self.dedup),
+            ("summarize", self.summarize),
+            ("store", self.store),
+        ]
+
+    def dedup_index(self, topic_id: str) -> NearDuplicateIndex:
+        """The topic's index; articles are only duplicates within one topic."""
+        index = self._dedup_indexes.get(topic_id)
+        if index is None:
+            path = self._index_path(topic_id)
+            if path is not None and path.exists():
+                index = NearDuplicateIndex.load(path)
+            else:
+                index = NearDuplicateIndex(self.dedup_threshold)
+            self._dedup_indexes[topic_id] = index
+        return index
+
+    def _index_path(self, topic_id: str) -> Optional[Path]:
+        return self.index_dir / f"{topic_id}.npz" if self.index_dir is not None else None
+
+    def _save_index(self, topic_id: str) -> None:
+        path = self._index_path(topic_id)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._dedup_indexes[topic_id].save(path)
+
+    async def fetch(self, ctx: JobContext) -> None:
+        ctx.articles = [
+            article for article in await self._fetch(ctx.job.topic) if article.get("content")
+        ]
+
+    async def dedup(self, ctx: JobContext) -> None:
+        loop = asyncio.get_running_loop()
+        index = await loop.run_in_executor(self.executor, self.dedup_index, ctx.job.topic_id)
+        index.prune()
+        pairs = [
+            (article.get("url") or f"{ctx.run_id}:{position}", article["content"])
+            for position, article in enumerate(ctx.articles)
+        ]
+        results, pending = await loop.run_in_executor(self.executor, _dedup_batch, index, pairs)
+        ctx.state["duplicates"] = sum(result.is_duplicate for result in results)
+        ctx.state["dedup_pending"] = pending
+        kept = [
+            (article, result.doc_id)
+            for article, result in zip(ctx.articles, results)
+            if not result.is_duplicate
+        ]
+        ctx.articles = [article for article, _ in kept]
+        ctx.state["doc_ids"] = [doc_id for _, doc_id in kept]
+
+    async def summarize(self, ctx: JobContext) -> None:
+        summaries: List[Optional[Dict[str, Any]]] = [None] * len(ctx.articles)
+        failures = 0
+        async for outcome in self.agent.summarize_many(
+            [article["content"] for article in ctx.articles], self.max_length
+        ):
+            if not outcome.ok:
+                failures += 1
+                # Leave the article out of the dedup index so the next run retries it.
+                if "dedup_pending" in ctx.state:
+                    ctx.state["dedup_pending"].remove(ctx.state["doc_ids"][outcome.index])
+                continue
+            article = ctx.articles[outcome.index]
+            row = {
+                "topic_id": ctx.job.topic_id,
+                "content": outcome.result,
+                "source_url": article.get("url"),
+                "source_type": article.get("source_type"),
+                "metadata": {"title": article.get("title"), "run_id": ctx.run_id},
+            }
+            if article.get("published_at"):
+                row["created_at"] = article["published_at"]
+            summaries[outcome.index] = row
+        if ctx.articles and failures == len(ctx.articles):
+            raise RuntimeError(f"all {failures} summaries failed")
+        ctx.state["summary_failures"] = failures
+        ctx.summaries = [row for row in summaries if row is not None]
+
+    async def store(self, ctx: JobContext) -> None:
+        if ctx.summaries:
+            report = await self.ingester.ingest(ctx.summaries)
+            if report.failed_chunks:
+                raise RuntimeError(
+                    f"{len(report.failed_rows())} of {len(ctx.summaries)} summaries failed to store"
+                )
+        pending = ctx.state.get("dedup_pending")
+        if pending is not None:
+            self.dedup_index(ctx.job.topic_id).merge(pending)
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._save_index, ctx.job.topic_id
+            )
+
+
+def summarize_job_handler(pipeline: TopicPipeline) -> Callable[[Dict[str, Any]], Awaitable[int]]:
+    """Queue handler that summarizes and stores one batch of a topic's articles.
+
+    Payload: ``{"topic_id", "run_id", "articles": [...]}``. Articles should be
+    de-duplicated before they are enqueued, since workers on other nodes do not
+    share dedup indexes.
+    """
+    async def handle(payload: Dict[str, Any]) -> int:
+        ctx = JobContext(
+            TopicJob({"id": payload["topic_id"]}),
+            payload.get("run_id", ""),
+            articles=payload["articles"],
+        )
+        await pipeline.summarize(ctx)
+        await pipeline.store(ctx)
+        return len(ctx.summaries)
+
+    return handle
+
+
+async def enqueue_summarize_jobs(
+    queue: JobQueue,
+    topic_id: str,
+    articles: List[Dict[str, Any]],
+    run_id: str,
+    batch_size: int = 20,
+    priority: int = 0,
+) -> List[str]:
+    """Split a topic's articles into ``summarize`` jobs.
+
+    Jobs are keyed by topic, run and batch, so enqueuing the same run twice
+    adds nothing.
+    """
+    payloads = [
+        {"topic_id": topic_id, "run_id": run_id, "articles": articles[start : start + batch_size]}
+        for start in range(0, len(articles), batch_size)
+    ]
+    keys = [f"{SUMMARIZE_JOB}:{topic_id}:{run_id}:{index}" for index in range(len(payloads))]
+    return await queue.enqueue(SUMMARIZE_JOB, payloads, dedupe_keys=keys, priority=priority)
@@ -0,0 +1,185 @@
+"""
+Worker runtime for the durable job queue.
+
+A worker leases a batch of jobs, runs their handlers concurrently while
+heartbeating the leases, then settles the batch: successes are completed in
+one call and failures are requeued with backoff or dead-lettered. Workers share
+nothing but the queue, so throughput grows with the number of worker nodes.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .jobs import DEAD, Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures that retrying cannot fix; the job is dead-lettered."""
+
+
+@dataclass
+class WorkerStats:
+    batches: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    dead: int = 0
+    lost_leases: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class Worker:
+    """Consumes the job queue in batches.
+
+    Args:
+        queue: The shared job queue.
+        handlers: Handler per job kind; only these kinds are dequeued.
+        worker_id: Lease owner name; unique per process by default.
+        batch_size: Jobs leased per dequeue.
+        concurrency: Handlers running at once; defaults to ``batch_size``.
+        lease_seconds: Lease length. A job whose worker stops heartbeating is
+            handed to another worker once its lease expires.
+        heartbeat_interval: Seconds between lease renewals; a third of the lease by default.
+        poll_interval: Initial wait when the queue is empty; doubles up to ``max_poll_interval``.
+        retry_base_delay: Base of the backoff before a failed job is retried.
+        retry_max_delay: Cap of that backoff.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Handler],
+        worker_id: Optional[str] = None,
+        batch_size: int = 10,
+        concurrency: Optional[int] = None,
+        lease_seconds: int = 60,
+        heartbeat_interval: Optional[float] = None,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+        retry_base_delay: float = 5.0,
+        retry_max_delay: float = 3600.0,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = batch_size
+        self.concurrency = batch_size if concurrency is None else concurrency
+        if self.concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = (
+            lease_seconds / 3 if heartbeat_interval is None else heartbeat_interval
+        )
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.stats = WorkerStats()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Finish the current batch, then return from ``run``."""
+        self._stopping.set()
+
+    async def _heartbeat(self, tasks: Dict[str, "asyncio.Task[Any]"]) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            pending = [job_id for job_id, task in tasks.items() if not task.done()]
+            if not pending:
+                return
+            try:
+                held = await self.queue.heartbeat(self.worker_id, pending, self.lease_seconds)
+            except Exception as exc:
+                logger.warning("Heartbeat failed for %d jobs: %s", len(pending), exc)
+                continue
+            for job_id in set(pending) - held:
+                # Another worker owns the job now; stop duplicating its work.
+                logger.warning("Lost lease on job %s", job_id)
+                self.stats.lost_leases += 1
+                tasks[job_id].cancel()
+
+    async def run_batch(self) -> int:
+        """Lease and process one batch; returns the number of jobs leased."""
+        jobs = await self.queue.dequeue(
+            self.worker_id, self.batch_size, self.lease_seconds, kinds=list(self.handlers)
+        )
+        if not jobs:
+            return 0
+        self.stats.batches += 1
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def handle(job: Job) -> Any:
+            async with semaphore:
+                return await self.handlers[job.kind](job.payload)
+
+        tasks = {job.id: asyncio.create_task(handle(job)) for job in jobs}
+        heartbeat = asyncio.create_task(self._heartbeat(tasks))
+        try:
+            outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        succeeded: List[str] = []
+        for job, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                continue
+            if not isinstance(outcome, BaseException):
+                succeeded.append(job.id)
+                continue
+            retry = not isinstance(outcome, PermanentJobError)
+            status = await self.queue.fail(
+                self.worker_id,
+                job.id,
+                f"{type(outcome).__name__}: {outcome}",
+                base_delay=self.retry_base_delay,
+                max_delay=self.retry_max_delay,
+                retry=retry,
+            )
+            if status == DEAD:
+                self.stats.dead += 1
+                logger.error("Job %s (%s) dead-lettered: %s", job.id, job.kind, outcome)
+            else:
+                self.stats.retried += 1
+        completed = await self.queue.complete(self.worker_id, succeeded)
+        if completed < len(succeeded):
+            # The heartbeat missed these: another worker leased them first.
+            logger.warning(
+                "Lost lease on %d finished job(s) before completing them",
+                len(succeeded) - completed,
+            )
+            self.stats.lost_leases += len(succeeded) - completed
+        self.stats.succeeded += completed
+        return len(jobs)
+
+    async def run(self, stop_when_empty: bool = False) -> WorkerStats:
+        """Process batches until ``stop`` is called (or the queue is empty)."""
+        delay = self.poll_interval
+        while not self._stopping.is_set():
+            if await self.run_batch():
+                delay = self.poll_interval
+                continue
+            if stop_when_empty:
+                break
+            try:
+                await asyncio.wait_for(
+                    self._stopping.wait(), delay * random.uniform(0.5, 1.0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_poll_interval)
+        return self.stats
@@ -0,0 +1,3 @@
+"""
+Local search indexes for Topic Insights.
+"""
@@ -0,0 +1,67 @@
+"""
+Hybrid ranking: reciprocal rank fusion of keyword and vector results.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from .text_index import TextIndex
+from .vector_index import VectorIndex
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """Fuse ranked id lists; each id scores ``weight / (k + rank)`` per list it appears in.
+
+    Rank fusion needs no score calibration, so BM25 scores and cosine
+    similarities can be combined directly.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, 1):
+            scores[item] += weight / (k + rank)
+    return [
+        {"id": item, "score": score}
+        for item, score in sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+    ]
+
+
+def hybrid_topic_search(
+    text_index: TextIndex,
+    vector_index: Optional[VectorIndex],
+    query: str,
+    embedding: Optional[Sequence[float]] = None,
+    limit: int = 10,
+    candidates: int = 50,
+    k: int = 60,
+    text_weight: float = 1.0,
+    vector_weight: float = 1.0,
+) -> List[Dict[str, Any]]:
+    """Rank topics by keyword match and, when an embedding is given, vector similarity.
+
+    Returns ``topic_id``/``score`` dicts with the component ``text_score`` and
+    ``similarity`` (None where a topic was not found by that ranking).
+    """
+    text_scores = {
+        hit["topic_id"]: hit["score"] for hit in text_index.search_topics(query, candidates)
+    }
+    similarities: Dict[str, float] = {}
+    if vector_index is not None and embedding is not None and len(vector_index):
+        # Several embeddings can belong to one topic; hits are best-first, so keep the first.
+        for hit in vector_index.search(embedding, candidates):
+            similarities.setdefault(hit["topic_id"], hit["similarity"])
+    fused = reciprocal_rank_fusion(
+        [list(text_scores), list(similarities)], k, [text_weight, vector_weight]
+    )
+    return [
+        {
+            "topic_id": item["id"],
+            "score": item["score"],
+            "text_score": text_scores.get(item["id"]),
+            "similarity": similarities.get(item["id"]),
+        }
+        for item in fused[:limit]
+    ]
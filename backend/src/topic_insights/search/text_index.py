@@ -0,0 +1,368 @@
+"""
+Local BM25 full-text index over topics and summaries.
+
+Documents are kept in an in-memory inverted index with term positions, so
+keyword, prefix (``clim*``) and phrase (``"sea level"``) queries are answered
+from posting lists without touching the database. Topic names and key
+concepts are weighted above summary text (a simplified BM25F). The index is
+updated incrementally from inserts and realtime change events and persisted as
+a compressed ``.npz`` token stream.
+"""
+import bisect
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from heapq import nlargest
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+FIELDS = ("name", "key_concepts", "content")
+DEFAULT_WEIGHTS = {"name": 3.0, "key_concepts": 2.0, "content": 1.0}
+
+SUMMARY = "summary"
+TOPIC = "topic"
+
+_WORD = re.compile(r"\w+")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens of ``text``."""
+    return _WORD.findall(text.lower()) if text else []
+
+
+@dataclass
+class _Doc:
+    doc_id: str
+    kind: str
+    topic_id: Optional[str]
+    length: float
+    field_lengths: Tuple[int, ...]
+    terms: Tuple[str, ...]
+
+
+class TextIndex:
+    """Incremental inverted index with BM25 ranking.
+
+    Args:
+        k1: BM25 term-frequency saturation.
+        b: BM25 length normalization.
+        weights: Per-field weights for ``name``, ``key_concepts`` and ``content``.
+        max_prefix_expansions: Most vocabulary terms a prefix query expands to.
+        path: Optional ``.npz`` file that ``save`` writes to.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        weights: Optional[Dict[str, float]] = None,
+        max_prefix_expansions: int = 50,
+        path: Optional[Union[str, Path]] = None,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.max_prefix_expansions = max_prefix_expansions
+        self.path = Path(path) if path is not None else None
+        self._docs: Dict[int, _Doc] = {}
+        self._positions: Dict[str, int] = {}
+        self._next = 0
+        # term -> doc -> (weighted term frequency, positions)
+        self._postings: Dict[str, Dict[int, Tuple[float, List[int]]]] = {}
+        self._vocabulary: List[str] = []
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._positions
+
+    # Indexing
+
+    def add(
+        self,
+        doc_id: str,
+        kind: str,
+        topic_id: Optional[str] = None,
+        name: Optional[str] = None,
+        key_concepts: Optional[Sequence[str]] = None,
+        content: Optional[str] = None,
+    ) -> None:
+        """Index a document, replacing any previous version of ``doc_id``."""
+        self._index(
+            doc_id,
+            kind,
+            topic_id,
+            [tokenize(name), tokenize(" ".join(key_concepts or [])), tokenize(content)],
+        )
+
+    def _index(
+        self, doc_id: str, kind: str, topic_id: Optional[str], fields: List[List[str]]
+    ) -> None:
+        self.remove(doc_id)
+        doc = self._next
+        self._next += 1
+
+        counts: Dict[str, float] = defaultdict(float)
+        positions: Dict[str, List[int]] = defaultdict(list)
+        offset = 0
+        for field, tokens in zip(FIELDS, fields):
+            weight = self.weights[field]
+            for position, term in enumerate(tokens, offset):
+                counts[term] += weight
+                positions[term].append(position)
+            # Leave a gap so phrases cannot match across fields.
+            offset += len(tokens) + 1
+
+        for term, count in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[doc] = (count, positions[term])
+
+        length = sum(self.weights[f] * len(tokens) for f, tokens in zip(FIELDS, fields))
+        self._docs[doc] = _Doc(
+            doc_id,
+            kind,
+            str(topic_id) if topic_id is not None else None,
+            length,
+            tuple(len(tokens) for tokens in fields),
+            tuple(counts),
+        )
+        self._positions[doc_id] = doc
+        self._total_length += length
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document from the index."""
+        doc = self._positions.pop(doc_id, None)
+        if doc is None:
+            return
+        entry = self._docs.pop(doc)
+        self._total_length -= entry.length
+        for term in entry.terms:
+            postings = self._postings[term]
+            del postings[doc]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    def add_summary(self, row: Dict[str, Any]) -> None:
+        """Index a ``summaries`` row."""
+        self.add(
+            f"{SUMMARY}:{row['id']}",
+            SUMMARY,
+            row.get("topic_id"),
+            key_concepts=row.get("key_concepts"),
+            content=row.get("content"),
+        )
+
+    def add_topic(self, row: Dict[str, Any]) -> None:
+        """Index a ``topics`` row."""
+        self.add(
+            f"{TOPIC}:{row['id']}",
+            TOPIC,
+            row["id"],
+            name=row.get("name"),
+            key_concepts=row.get("keywords"),
+            content=row.get("description"),
+        )
+
+    def on_change(self, table: str, event_type: str, record: Dict[str, Any]) -> None:
+        """Change listener for ``SupabaseService.add_change_listener``."""
+        if record.get("id") is None or table not in ("topics", "summaries"):
+            return
+        kind = TOPIC if table == "topics" else SUMMARY
+        if event_type == "DELETE" or (kind == TOPIC and record.get("is_active") is False):
+            self.remove(f"{kind}:{record['id']}")
+        elif kind == TOPIC:
+            self.add_topic(record)
+        else:
+            self.add_summary(record)
+
+    async def sync(self, source: Any, page_size: int = 1000) -> int:
+        """Index every active topic and its summaries from a ``SupabaseService``."""
+        added = 0
+        async for topic in source.iter_active_topics(
+            page_size, columns="id, name, description, keywords, created_at"
+        ):
+            self.add_topic(topic)
+            added += 1
+            async for summary in source.iter_topic_summaries(
+                topic["id"],
+                page_size=page_size,
+                columns="id, topic_id, content, key_concepts, created_at",
+            ):
+                self.add_summary(summary)
+                added += 1
+        if self.path is not None and added:
+            self.save()
+        return added
+
+    # Querying
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start : start + self.max_prefix_expansions]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _phrase_docs(self, terms: List[str]) -> Set[int]:
+        postings = [self._postings.get(term) for term in terms]
+        if not terms or any(p is None for p in postings):
+            return set()
+        docs = set.intersection(*(set(p) for p in postings))
+        matches = set()
+        for doc in docs:
+            starts = set(postings[0][doc][1])
+            for offset, p in enumerate(postings[1:], 1):
+                starts &= {position - offset for position in p[doc][1]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc)
+        return matches
+
+    def _bm25(self, term: str) -> Dict[int, float]:
+        postings = self._postings.get(term)
+        if not postings:
+            return {}
+        count = len(self._docs)
+        average = self._total_length / count if count else 1.0
+        idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+        k1, b = self.k1, self.b
+        return {
+            doc: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * self._docs[doc].length / average))
+            for doc, (tf, _) in postings.items()
+        }
+
+    def _score(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        required: Optional[Set[int]] = None
+        for phrase, word in _QUERY.findall(query):
+            if phrase:
+                terms = tokenize(phrase)
+                docs = self._phrase_docs(terms)
+                required = docs if required is None else required & docs
+                groups = [[term] for term in terms]
+            elif word.endswith("*") and tokenize(word[:-1]):
+                groups = [self._expand(tokenize(word[:-1])[-1])]
+            else:
+                groups = [[term] for term in tokenize(word)]
+            for terms in groups:
+                # A prefix counts once per document, with its best-matching expansion.
+                best: Dict[int, float] = {}
+                for term in terms:
+                    for doc, score in self._bm25(term).items():
+                        if score > best.get(doc, 0.0):
+                            best[doc] = score
+                for doc, score in best.items():
+                    scores[doc] += score
+        if required is not None:
+            return {doc: scores[doc] for doc in required}
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        kind: Optional[str] = None,
+        topic_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the best-matching documents as ``doc_id``/``kind``/``topic_id``/``score``."""
+        scores = self._score(query)
+        docs = self._docs
+        candidates = (
+            (score, doc)
+            for doc, score in scores.items()
+            if (kind is None or docs[doc].kind == kind)
+            and (topic_id is None or docs[doc].topic_id == str(topic_id))
+        )
+        return [
+            {
+                "doc_id": docs[doc].doc_id,
+                "kind": docs[doc].kind,
+                "topic_id": docs[doc].topic_id,
+                "score": score,
+            }
+            for score, doc in nlargest(limit, candidates)
+        ]
+
+    def search_topics(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank topics by their best match among their name, keywords and summaries."""
+        best: Dict[str, float] = {}
+        for doc, score in self._score(query).items():
+            topic_id = self._docs[doc].topic_id
+            if topic_id is not None and score > best.get(topic_id, 0.0):
+                best[topic_id] = score
+        return [
+            {"topic_id": topic_id, "score": score}
+            for topic_id, score in nlargest(limit, best.items(), key=lambda item: item[1])
+        ]
+
+    # Persistence
+
+    def save(self) -> None:
+        """Write the index to ``path`` as a compressed stream of term ids."""
+        if self.path is None:
+            raise ValueError("save() requires an index created with a path")
+        order = sorted(self._docs)
+        slot = {doc: i for i, doc in enumerate(order)}
+        vocabulary = {term: i for i, term in enumerate(self._vocabulary)}
+        field_lengths = np.array(
+            [self._docs[doc].field_lengths for doc in order], dtype=np.int64
+        ).reshape(-1, len(FIELDS))
+        # Each document's stream includes the one-token gaps between fields.
+        sizes = field_lengths.sum(axis=1) + len(FIELDS)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+        stream = np.full(int(sizes.sum()), -1, dtype=np.int64)
+        for term, postings in self._postings.items():
+            term_id = vocabulary[term]
+            for doc, (_, positions) in postings.items():
+                stream[starts[slot[doc]] + np.asarray(positions)] = term_id
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                ids=np.array([self._docs[doc].doc_id for doc in order], dtype=str),
+                kinds=np.array([self._docs[doc].kind for doc in order], dtype=str),
+                topic_ids=np.array([self._docs[doc].topic_id or "" for doc in order], dtype=str),
+                vocabulary=np.array(self._vocabulary, dtype=str),
+                field_lengths=field_lengths,
+                tokens=stream[stream >= 0].astype(np.uint32),
+                config=np.array(
+                    [self.k1, self.b] + [self.weights[f] for f in FIELDS], dtype=np.float64
+                ),
+            )
+        tmp.replace(self.path)
+
+    @classmethod
+    def open(cls, path: Union[str, Path], **kwargs: Any) -> "TextIndex":
+        """Load an index written by ``save``; later saves go back to ``path``."""
+        with np.load(path) as data:
+            k1, b, *weights = data["config"].tolist()
+            index = cls(k1=k1, b=b, weights=dict(zip(FIELDS, weights)), path=path, **kwargs)
+            vocabulary = data["vocabulary"].tolist()
+            tokens = data["tokens"]
+            offset = 0
+            for doc_id, kind, topic_id, lengths in zip(
+                data["ids"].tolist(),
+                data["kinds"].tolist(),
+                data["topic_ids"].tolist(),
+                data["field_lengths"].tolist(),
+            ):
+                fields = []
+                for length in lengths:
+                    field_tokens = tokens[offset : offset + length].tolist()
+                    fields.append([vocabulary[t] for t in field_tokens])
+                    offset += length
+                index._index(doc_id, kind, topic_id or None, fields)
+        return index
@@ -0,0 +1,385 @@
+"""
+In-process cosine similarity index over topic embeddings.
+
+Mirrors the ``topic_embeddings`` table locally so similarity lookups do not need a
+database round trip. Vectors are L2-normalized float32 rows, optionally stored in
+a memory-mapped ``.npy`` file. Small indexes are searched exactly with one matrix
+product; large ones can use an inverted-file (IVF) layout that only scores the
+vectors in the clusters nearest to the query.
+
+``sync`` only pulls rows created since the last sync. Deletes, deactivated
+topics and rows written by other processes reach the index through
+``on_change``; a change it cannot apply marks the index ``stale`` until
+``rebuild`` reloads it.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+STATE_FILE = "state.json"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+
+def _parse_embedding(value: Union[str, Sequence[float]]) -> List[float]:
+    """PostgREST returns pgvector columns as strings such as ``"[0.1,0.2]"``."""
+    return json.loads(value) if isinstance(value, str) else list(value)
+
+
+class VectorIndex:
+    """Cosine similarity index with exact and IVF search modes.
+
+    Args:
+        dim: Vector dimensionality (1536 for ``topic_embeddings``).
+        path: Optional directory for the memory-mapped vectors and index state.
+        ivf_threshold: Build IVF clusters automatically once the index holds at
+            least this many vectors; below it every search is exact.
+        nlist: Number of IVF clusters. Defaults to roughly sqrt(n).
+        nprobe: Number of clusters scanned per IVF query.
+    """
+
+    def __init__(
+        self,
+        dim: int = 1536,
+        path: Optional[Union[str, Path]] = None,
+        ivf_threshold: int = 50_000,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+    ):
+        self.dim = dim
+        self.path = Path(path) if path is not None else None
+        self.ivf_threshold = ivf_threshold
+        self.nlist = nlist
+        self.nprobe = nprobe
+
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every vector and reset the sync cursor."""
+        self._count = 0
+        self._vectors = self._allocate(1024)
+        self._valid = np.zeros(0, dtype=bool)
+        self.ids: List[str] = []
+        self.topic_ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self.cursor: Optional[Tuple[str, str]] = None
+        # Set when the index may disagree with the table; see ``on_change``.
+        self.stale = False
+
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._assignments = np.full(0, -1, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return int(self._valid[: self._count].sum())
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored (normalized) vectors, including removed rows."""
+        return self._vectors[: self._count]
+
+    @property
+    def uses_ivf(self) -> bool:
+        return self._centroids is not None
+
+    # Storage
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if self.path is None:
+            return np.zeros((capacity, self.dim), dtype=np.float32)
+        self.path.mkdir(parents=True, exist_ok=True)
+        return np.lib.format.open_memmap(
+            self.path / VECTORS_FILE, mode="w+", dtype=np.float32, shape=(capacity, self.dim)
+        )
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._count + extra
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        existing = np.array(self._vectors[: self._count])
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+            del self._vectors
+        self._vectors = self._allocate(capacity)
+        self._vectors[: self._count] = existing
+
+    def save(self) -> None:
+        """Flush vectors and write the index state next to them."""
+        if self.path is None:
+            raise ValueError("save() requires an index created with a path")
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        state = {
+            "dim": self.dim,
+            "count": self._count,
+            "ids": self.ids,
+            "topic_ids": self.topic_ids,
+            "metadata": self.metadata,
+            "valid": self._valid[: self._count].tolist(),
+            "cursor": list(self.cursor) if self.cursor else None,
+            "stale": self.stale,
+        }
+        tmp = self.path / (STATE_FILE + ".tmp")
+        tmp.write_text(json.dumps(state))
+        tmp.replace(self.path / STATE_FILE)
+
+    @classmethod
+    def open(cls, path: Union[str, Path], **kwargs: Any) -> "VectorIndex":
+        """Open a saved index, memory-mapping its vectors."""
+        path = Path(path)
+        state = json.loads((path / STATE_FILE).read_text())
+        index = cls(dim=state["dim"], **kwargs)
+        index.path = path
+        index._vectors = np.load(path / VECTORS_FILE, mmap_mode="r+")
+        index._count = state["count"]
+        index.ids = state["ids"]
+        index.topic_ids = state["topic_ids"]
+        index.metadata = state["metadata"]
+        index._valid = np.array(state["valid"], dtype=bool)
+        index._positions = {row_id: i for i, row_id in enumerate(index.ids)}
+        index.cursor = tuple(state["cursor"]) if state["cursor"] else None
+        index.stale = state.get("stale", False)
+        index._maybe_build_ivf()
+        return index
+
+    # Mutation
+
+    def add(
+        self,
+        ids: Sequence[str],
+        topic_ids: Sequence[str],
+        vectors: Union[np.ndarray, Sequence[Sequence[float]]],
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        """Add or replace vectors keyed by their ``topic_embeddings`` row id."""
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        metadata = metadata or [None] * len(ids)
+        fresh = [i for i, row_id in enumerate(ids) if row_id not in self._positions]
+        for i, row_id in enumerate(ids):
+            position = self._positions.get(row_id)
+            if position is not None:
+                self._vectors[position] = matrix[i]
+                self.topic_ids[position] = topic_ids[i]
+                self.metadata[position] = metadata[i] or {}
+                self._valid[position] = True
+                if self.uses_ivf:
+                    self._assign(np.array([position]))
+
+        if fresh:
+            self._reserve(len(fresh))
+            start = self._count
+            self._vectors[start : start + len(fresh)] = matrix[fresh]
+            for offset, i in enumerate(fresh):
+                self._positions[ids[i]] = start + offset
+                self.ids.append(ids[i])
+                self.topic_ids.append(topic_ids[i])
+                self.metadata.append(metadata[i] or {})
+            self._count += len(fresh)
+            self._valid = np.concatenate([self._valid, np.ones(len(fresh), dtype=bool)])
+            if self.uses_ivf:
+                self._assign(np.arange(start, self._count))
+            else:
+                self._maybe_build_ivf()
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Mark rows as removed; they are skipped by every search."""
+        for row_id in ids:
+            position = self._positions.get(row_id)
+            if position is not None:
+                self._valid[position] = False
+
+    def remove_topic(self, topic_id: str) -> None:
+        """Remove every vector belonging to a topic."""
+        self.remove([row_id for row_id, tid in zip(self.ids, self.topic_ids) if tid == topic_id])
+
+    def on_change(self, table: str, event_type: str, record: Dict[str, Any]) -> None:
+        """Change listener for ``SupabaseService.add_change_listener``.
+
+        Applies inserted, updated and deleted ``topic_embeddings`` rows, and
+        removes the vectors of deleted or deactivated topics. Removed rows are
+        not kept, so reactivating a topic marks the index stale.
+        """
+        if table == "topic_embeddings" and record.get("id") is not None:
+            if event_type == "DELETE":
+                self.remove([str(record["id"])])
+            elif record.get("embedding") is not None and record.get("topic_id") is not None:
+                self.add(
+                    [str(record["id"])],
+                    [str(record["topic_id"])],
+                    [_parse_embedding(record["embedding"])],
+                    [record.get("metadata")],
+                )
+        elif table == "topics" and record.get("id") is not None:
+            topic_id = str(record["id"])
+            if event_type == "DELETE" or record.get("is_active") is False:
+                self.remove_topic(topic_id)
+            elif any(
+                tid == topic_id and not self._valid[i] for i, tid in enumerate(self.topic_ids)
+            ):
+                self.stale = True
+
+    # IVF
+
+    def _maybe_build_ivf(self) -> None:
+        if self._centroids is None and len(self) >= self.ivf_threshold:
+            self.build_ivf()
+
+    def build_ivf(self, iterations: int = 10, sample_size: int = 100_000, seed: int = 0) -> None:
+        """Cluster the vectors with spherical k-means and build the inverted lists."""
+        live = np.flatnonzero(self._valid[: self._count])
+        if live.size == 0:
+            return
+        nlist = self.nlist or max(1, int(np.sqrt(live.size)))
+        nlist = min(nlist, live.size)
+        rng = np.random.default_rng(seed)
+        sample = self._vectors[rng.choice(live, size=min(sample_size, live.size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        self._centroids = centroids
+        self._assignments = np.full(self._count, -1, dtype=np.int32)
+        self._lists = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._assign(np.arange(self._count))
+
+    def _assign(self, positions: np.ndarray) -> None:
+        """Place rows in the inverted list of their nearest centroid."""
+        if len(self._assignments) < self._count:
+            self._assignments = np.concatenate(
+                [self._assignments, np.full(self._count - len(self._assignments), -1, np.int32)]
+            )
+        # Replaced rows must leave the list they were previously in.
+        for position in positions[self._assignments[positions] >= 0]:
+            old = self._assignments[position]
+            self._lists[old] = self._lists[old][self._lists[old] != position]
+        labels = np.argmax(self._vectors[positions] @ self._centroids.T, axis=1)
+        for c in np.unique(labels):
+            moved = positions[labels == c]
+            self._lists[c] = np.concatenate([self._lists[c], moved])
+            self._assignments[moved] = c
+
+    # Search
+
+    def search_batch(
+        self,
+        queries: Union[np.ndarray, Sequence[Sequence[float]]],
+        limit: int = 10,
+        threshold: Optional[float] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Return the top ``limit`` matches for each query vector.
+
+        Results have the same shape as the ``search_similar_content`` RPC:
+        ``topic_id``, ``similarity`` and ``metadata``, most similar first, keeping
+        only similarities above ``threshold``.
+        """
+        matrix = _normalize(np.asarray(queries, dtype=np.float32).reshape(-1, self.dim))
+        if self._count == 0:
+            return [[] for _ in range(len(matrix))]
+        if self.uses_ivf:
+            return [self._search_ivf(query, limit, threshold) for query in matrix]
+
+        scores = matrix @ self.vectors.T
+        scores[:, ~self._valid[: self._count]] = -np.inf
+        return [self._top_k(np.arange(self._count), row, limit, threshold) for row in scores]
+
+    def search(
+        self,
+        query: Union[np.ndarray, Sequence[float]],
+        limit: int = 10,
+        threshold: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the top ``limit`` matches for one query vector."""
+        return self.search_batch([query], limit, threshold)[0]
+
+    def _search_ivf(
+        self, query: np.ndarray, limit: int, threshold: Optional[float]
+    ) -> List[Dict[str, Any]]:
+        nearest = np.argsort(-(self._centroids @ query))[: self.nprobe]
+        candidates = np.concatenate([self._lists[c] for c in nearest])
+        candidates = candidates[self._valid[candidates]]
+        if candidates.size == 0:
+            return []
+        return self._top_k(candidates, self._vectors[candidates] @ query, limit, threshold)
+
+    def _top_k(
+        self,
+        positions: np.ndarray,
+        scores: np.ndarray,
+        limit: int,
+        threshold: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for i in top:
+            score = float(scores[i])
+            if score == -np.inf or (threshold is not None and score <= threshold):
+                break
+            position = int(positions[i])
+            results.append(
+                {
+                    "topic_id": self.topic_ids[position],
+                    "similarity": score,
+                    "metadata": self.metadata[position],
+                }
+            )
+        return results
+
+    # Sync
+
+    def apply_rows(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Add ``topic_embeddings`` rows and advance the sync cursor."""
+        if not rows:
+            return
+        self.add(
+            [str(row["id"]) for row in rows],
+            [str(row["topic_id"]) for row in rows],
+            [_parse_embedding(row["embedding"]) for row in rows],
+            [row.get("metadata") for row in rows],
+        )
+        last = rows[-1]
+        self.cursor = (str(last["created_at"]), str(last["id"]))
+
+    async def sync(self, source: Any, batch_size: int = 1000) -> int:
+        """Pull rows created since the last sync from ``source``.
+
+        ``source`` must provide ``get_embeddings_page(after, limit)`` returning rows
+        ordered by ``(created_at, id)``, such as ``SupabaseService``. Returns the
+        number of rows applied.
+        """
+        applied = 0
+        while True:
+            rows = await source.get_embeddings_page(after=self.cursor, limit=batch_size)
+            self.apply_rows(rows)
+            applied += len(rows)
+            if len(rows) < batch_size:
+                break
+        if self.path is not None and applied:
+            self.save()
+        return applied
+
+    async def rebuild(self, source: Any, batch_size: int = 1000) -> int:
+        """Reload every row from ``source`` and clear the ``stale`` flag."""
+        self.clear()
+        applied = await self.sync(source, batch_size)
+        if self.path is not None and not applied:
+            self.save()
+        return applied
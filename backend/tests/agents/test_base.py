@@ -0,0 +1,69 @@
+import pytest
+
+from topic_insights.agents.base import BaseAgent
+from topic_insights.models.agents import ContentAnalysisResult, Entity, parse_entities
+
+
+class StubAgent(BaseAgent):
+    """Minimal agent that records which operations were called."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def initialize(self):
+        pass
+
+    async def analyze_topic(self, topic, context=None):
+        self.calls.append("analyze_topic")
+        return {"analysis": f"analysis of {topic}"}
+
+    async def summarize_content(self, content, max_length=None):
+        self.calls.append("summarize_content")
+        return f"summary of {content}"
+
+    async def extract_entities(self, content):
+        self.calls.append("extract_entities")
+        return '{"entities": [{"entity": "OpenAI", "category": "Organizations", "relevance": 0.9}]}'
+
+    async def generate_questions(self, content, num_questions=3):
+        self.calls.append("generate_questions")
+        return [f"Question {i}?" for i in range(num_questions)]
+
+    async def cleanup(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_default_process_content_combines_operations():
+    """Test that the default process_content runs all three operations."""
+    agent = StubAgent()
+
+    result = await agent.process_content("article", num_questions=2)
+
+    assert isinstance(result, ContentAnalysisResult)
+    assert result.summary == "summary of article"
+    assert result.entities == [Entity(entity="OpenAI", category="Organizations", relevance=0.9)]
+    assert result.questions == ["Question 0?", "Question 1?"]
+    assert sorted(agent.calls) == ["extract_entities", "generate_questions", "summarize_content"]
+
+
+@pytest.mark.asyncio
+async def test_process_many():
+    """Test that process_many yields one analysis per input."""
+    agent = StubAgent()
+
+    results = [r async for r in agent.process_many(["a", "b"])]
+
+    assert sorted(r.result.summary for r in results) == ["summary of a", "summary of b"]
+
+
+def test_parse_entities_accepts_common_shapes():
+    """Test parsing entity arrays, wrapped objects and dict lists."""
+    item = {"entity": "Paris", "category": "Locations", "relevance": 0.5}
+
+    assert parse_entities('[{"entity": "Paris", "category": "Locations", "relevance": 0.5}]') == [
+        Entity(**item)
+    ]
+    assert parse_entities({"entities": [item]}) == [Entity(**item)]
+    assert parse_entities([item]) == [Entity(**item)]
+    assert parse_entities(None) == []
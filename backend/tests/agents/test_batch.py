@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from topic_insights.agents.batch import run_bounded
+from topic_insights.agents.local_agent import LocalAgent
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_limits_concurrency():
+    """Test that no more than `concurrency` calls run at once."""
+    in_flight = 0
+    peak = 0
+
+    async def work(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return item * 2
+
+    results = [r async for r in run_bounded(work, range(20), concurrency=4)]
+
+    assert peak == 4
+    assert sorted(r.result for r in results) == [i * 2 for i in range(20)]
+    assert all(r.result == r.item * 2 for r in results)
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_yields_in_completion_order():
+    """Test that fast items are yielded before slow ones."""
+
+    async def work(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    results = [r async for r in run_bounded(work, [0.05, 0.0], concurrency=2)]
+
+    assert [r.index for r in results] == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_reports_errors_per_item():
+    """Test that one failing item does not abort the batch."""
+
+    async def work(item):
+        if item == 2:
+            raise RuntimeError("boom")
+        return item
+
+    results = {r.index: r async for r in run_bounded(work, range(4), concurrency=2)}
+
+    assert not results[2].ok
+    assert isinstance(results[2].error, RuntimeError)
+    assert all(results[i].ok for i in (0, 1, 3))
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_cancels_on_close():
+    """Test that closing the stream early cancels in-flight work."""
+    started = []
+
+    async def work(item):
+        started.append(item)
+        await asyncio.sleep(0 if item == 0 else 10)
+        return item
+
+    stream = run_bounded(work, range(100), concurrency=3)
+    first = await stream.__anext__()
+    await stream.aclose()
+
+    assert first.result == 0
+    assert len(started) < 10
+
+
+@pytest.mark.asyncio
+async def test_zero_concurrency_is_rejected():
+    """Test that concurrency=0 is an error rather than the agent default."""
+    agent = LocalAgent()
+
+    with pytest.raises(ValueError):
+        [r async for r in agent.summarize_many(["a"], concurrency=0)]
+    assert [r.ok async for r in agent.summarize_many(["a"], concurrency=None)] == [True]
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from topic_insights.agents.cache import (
+    MemoryCache,
+    ResponseCache,
+    SQLiteCache,
+    make_cache_key,
+)
+
+
+def test_cache_key_depends_on_all_parts():
+    """Test that the key changes with model, method, prompt and params."""
+    base = make_cache_key("gpt-4o", "summarize_content", "prompt", {"a": 1})
+    assert base == make_cache_key("gpt-4o", "summarize_content", "prompt", {"a": 1})
+    assert base != make_cache_key("gpt-4o-mini", "summarize_content", "prompt", {"a": 1})
+    assert base != make_cache_key("gpt-4o", "extract_entities", "prompt", {"a": 1})
+    assert base != make_cache_key("gpt-4o", "summarize_content", "other", {"a": 1})
+    assert base != make_cache_key("gpt-4o", "summarize_content", "prompt", {"a": 2})
+
+
+def test_memory_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    assert cache.set("c", 3) == 1
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_memory_cache_ttl(monkeypatch):
+    """Test that expired entries are not returned."""
+    cache = MemoryCache(ttl=10)
+    cache.set("a", 1)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_persists(tmp_path):
+    """Test that the disk tier survives reopening."""
+    path = tmp_path / "cache.db"
+    cache = SQLiteCache(path)
+    cache.set("a", {"content": "hello"})
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get("a") == {"content": "hello"}
+    reopened.close()
+
+
+def test_sqlite_cache_size_eviction(tmp_path):
+    """Test that the disk tier stays within max_entries."""
+    cache = SQLiteCache(tmp_path / "cache.db", max_entries=3)
+    for i in range(5):
+        cache.set(str(i), i)
+    assert len(cache) == 3
+    assert cache.get("0") is None
+    assert cache.get("4") == 4
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_response_cache_promotes_disk_hits(tmp_path):
+    """Test that disk hits are counted and promoted to memory."""
+    cache = ResponseCache.with_disk(tmp_path / "cache.db")
+    await cache.set("key", {"content": "cached"})
+    cache.memory.clear()
+
+    assert await cache.get("key") == {"content": "cached"}
+    assert await cache.get("key") == {"content": "cached"}
+    assert await cache.get("missing") is None
+
+    assert cache.stats.disk_hits == 1
+    assert cache.stats.memory_hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hit_ratio == pytest.approx(2 / 3)
+    cache.close()
@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+from topic_insights.agents.base import BaseAgent
+from topic_insights.agents.cascade import CascadeAgent, CascadePolicy, Route
+from topic_insights.agents.local_agent import LocalAgent
+from topic_insights.agents.openai_agent import OpenAIAgent
+from topic_insights.metrics import CASCADE_LATENCY, CASCADE_STEPS
+
+
+class ScriptedAgent(BaseAgent):
+    """Agent returning fixed outputs and recording calls."""
+
+    def __init__(self, summary="summary", entities="[]", questions=None, fail=False):
+        self.summary = summary
+        self.entities = entities
+        self.questions = questions if questions is not None else ["Why?", "How?", "When?"]
+        self.fail = fail
+        self.calls = []
+
+    async def initialize(self):
+        pass
+
+    async def analyze_topic(self, topic, context=None):
+        self.calls.append("analyze_topic")
+        return {"analysis": self.summary}
+
+    async def summarize_content(self, content, max_length=None):
+        self.calls.append("summarize_content")
+        if self.fail:
+            raise RuntimeError("upstream error")
+        return self.summary
+
+    async def extract_entities(self, content):
+        self.calls.append("extract_entities")
+        return self.entities
+
+    async def generate_questions(self, content, num_questions=3):
+        self.calls.append("generate_questions")
+        return self.questions[:num_questions]
+
+    async def cleanup(self):
+        pass
+
+
+ENTITIES = json.dumps(
+    {"entities": [{"entity": "EU", "category": "Organizations", "relevance": 0.8}]}
+)
+
+
+def make_cascade(small, large):
+    return CascadeAgent(
+        CascadePolicy.tiered("small", "large"), agents={"small": small, "large": large}
+    )
+
+
+def test_policy_routes_by_method_and_size():
+    """Test size thresholds, defaults and loading from a dict."""
+    policy = CascadePolicy.tiered("small", "large")
+
+    assert policy.models_for("summarize_content", 100) == ("small", "large")
+    assert policy.models_for("summarize_content", 5000) == ("large",)
+    assert policy.models_for("analyze_topic", 10) == ("large",)
+    assert policy.models == ["large", "small"]
+
+    loaded = CascadePolicy.from_dict(
+        {
+            "default": ["b"],
+            "routes": {"summarize_content": [{"models": ["a", "b"], "max_tokens": 10}]},
+        }
+    )
+    assert loaded.models_for("summarize_content", 5) == ("a", "b")
+    assert loaded.models_for("summarize_content", 50) == ("b",)
+    assert loaded.routes["summarize_content"] == [Route(("a", "b"), 10)]
+
+
+@pytest.mark.asyncio
+async def test_small_model_result_is_accepted_when_valid():
+    """Test that valid small-model output is returned without calling the large model."""
+    small, large = ScriptedAgent(entities=ENTITIES), ScriptedAgent(entities=ENTITIES)
+    agent = make_cascade(small, large)
+    labels = {"method": "extract_entities", "model": "small", "outcome": "accepted"}
+    accepted = CASCADE_STEPS.value(**labels)
+
+    assert await agent.extract_entities("The EU met.") == ENTITIES
+    assert await agent.summarize_content("Short article.") == "summary"
+    assert large.calls == []
+    assert CASCADE_STEPS.value(**labels) == accepted + 1
+    assert CASCADE_LATENCY.count(method="summarize_content", route="small") >= 1
+
+
+@pytest.mark.asyncio
+async def test_escalates_on_invalid_output_or_error():
+    """Test escalation on unparseable JSON, missing questions, empty output and errors."""
+    small = ScriptedAgent(summary="  ", entities="not json", questions=["Why?"])
+    large = ScriptedAgent(summary="good", entities=ENTITIES)
+    agent = make_cascade(small, large)
+    labels = {"method": "extract_entities", "model": "small", "outcome": "escalated"}
+    escalated = CASCADE_STEPS.value(**labels)
+
+    assert await agent.extract_entities("The EU met.") == ENTITIES
+    assert await agent.generate_questions("text", 3) == ["Why?", "How?", "When?"]
+    assert await agent.summarize_content("text") == "good"
+    assert CASCADE_STEPS.value(**labels) == escalated + 1
+    assert CASCADE_LATENCY.count(method="summarize_content", route="small>large") >= 1
+
+    failing = make_cascade(ScriptedAgent(fail=True), ScriptedAgent(summary="fallback"))
+    assert await failing.summarize_content("text") == "fallback"
+
+
+@pytest.mark.asyncio
+async def test_last_model_errors_propagate():
+    """Test that the final model's errors are raised."""
+    agent = make_cascade(ScriptedAgent(fail=True), ScriptedAgent(fail=True))
+
+    with pytest.raises(RuntimeError):
+        await agent.summarize_content("text")
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_when_first_model_yields_nothing():
+    """Test that streaming moves on from a model that produces no output."""
+    agent = make_cascade(ScriptedAgent(summary=""), ScriptedAgent(summary="streamed"))
+
+    assert [d async for d in agent.stream_summarize_content("text")] == ["streamed"]
+
+
+class EmbeddingAgent(ScriptedAgent):
+    supports_embeddings = True
+
+    async def embed_many(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_embeddings_use_first_capable_model():
+    """Test that embeddings skip models without embedding support."""
+    cascade = CascadeAgent(
+        CascadePolicy(default=("local", "large")),
+        agents={"local": ScriptedAgent(), "large": EmbeddingAgent()},
+    )
+
+    assert cascade.supports_embeddings
+    assert await cascade.embed_many(["abc"]) == [[3.0]]
+
+    without = make_cascade(ScriptedAgent(), ScriptedAgent())
+    assert not without.supports_embeddings
+    with pytest.raises(NotImplementedError):
+        await without.embed_many(["abc"])
+
+
+def test_local_model_name_builds_local_agent():
+    """Test that "local" in a policy gets a LocalAgent rather than an OpenAIAgent."""
+    cascade = CascadeAgent(CascadePolicy(default=("gpt-4o", "local")), api_key="test-key")
+
+    assert isinstance(cascade.agents["local"], LocalAgent)
+    assert isinstance(cascade.agents["gpt-4o"], OpenAIAgent)
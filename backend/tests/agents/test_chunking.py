@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from topic_insights.agents.chunking import MapReduceSummarizer, split_by_tokens
+from topic_insights.agents.tokens import count_tokens
+
+
+def _document(sentences: int) -> str:
+    return " ".join(f"Sentence number {i} talks about topic {i % 7}." for i in range(sentences))
+
+
+def test_split_by_tokens_respects_budget():
+    """Test that every chunk fits the token budget."""
+    chunks = split_by_tokens(_document(200), chunk_tokens=100, overlap_tokens=20)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+
+
+def test_split_by_tokens_overlaps_chunks():
+    """Test that consecutive chunks share trailing sentences."""
+    chunks = split_by_tokens(_document(50), chunk_tokens=60, overlap_tokens=20)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.rsplit(". ", 1)[-1]
+        assert last_sentence in current
+        assert not current.startswith(previous)
+
+
+def test_split_by_tokens_breaks_long_sentences():
+    """Test that a sentence longer than the budget is split on words."""
+    chunks = split_by_tokens("word " * 500, chunk_tokens=50, overlap_tokens=0)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+    assert sum(len(chunk.split()) for chunk in chunks) == 500
+
+
+def test_split_by_tokens_short_text():
+    """Test that short text is returned as one chunk."""
+    assert split_by_tokens("Just one sentence.", chunk_tokens=100) == ["Just one sentence."]
+
+
+class RecordingAgent:
+    """Agent stub whose summaries are short and traceable."""
+
+    max_concurrency = 4
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def summarize_content(self, content, max_length=None):
+        self.calls.append(content)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        return f"summary {len(self.calls)}."
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_short_content_single_call():
+    """Test that content within one chunk is summarized directly."""
+    agent = RecordingAgent()
+
+    result = await MapReduceSummarizer(agent, chunk_tokens=1000).summarize("Short text.")
+
+    assert result == "summary 1."
+    assert agent.calls == ["Short text."]
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_reduces_hierarchically():
+    """Test that partial summaries are merged in bounded groups."""
+    agent = RecordingAgent()
+    summarizer = MapReduceSummarizer(agent, chunk_tokens=60, overlap_tokens=0, fan_in=3)
+
+    result = await summarizer.summarize(_document(100), max_length=50)
+
+    chunk_count = len(split_by_tokens(_document(100), 60, 0))
+    assert chunk_count > 9
+    # Map calls, then at least two reduce rounds for fan_in=3.
+    assert len(agent.calls) > chunk_count + 3
+    assert result.startswith("summary")
+    assert 1 < agent.peak <= 4
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_single_chunk_uses_requested_length(monkeypatch):
+    """Test that a split yielding one chunk is summarized once at max_length."""
+    lengths = []
+
+    class LengthAgent(RecordingAgent):
+        async def summarize_content(self, content, max_length=None):
+            lengths.append(max_length)
+            return await super().summarize_content(content, max_length)
+
+    monkeypatch.setattr(
+        "topic_insights.agents.chunking.split_by_tokens", lambda *args: ["Only chunk."]
+    )
+    summarizer = MapReduceSummarizer(LengthAgent(), chunk_tokens=5, partial_length=20)
+
+    assert await summarizer.summarize(_document(10), max_length=50) == "summary 1."
+    assert lengths == [50]
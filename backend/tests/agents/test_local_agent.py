@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from topic_insights.agents.cascade import CascadeAgent, CascadePolicy, Route
+from topic_insights.agents.local_agent import (
+    LocalAgent,
+    extract_entities,
+    extract_keywords,
+    relevance,
+    split_sentences,
+    summarize,
+    textrank,
+)
+from topic_insights.models.agents import ContentAnalysisResult, parse_entities
+
+ARTICLE = """The European Commission on Tuesday proposed new rules for artificial intelligence.
+Commissioner Margrethe Vestager said the rules would apply from January 2025.
+Researchers at Stanford University warned that large language models still make errors.
+The weather in the region was mild. Vestager added that the rules would be enforced from 2026.
+Critics in Washington argued that the AI rules could slow innovation."""
+
+
+def test_textrank_favours_central_sentences():
+    """Test that sentences sharing terms with many others rank above isolated ones."""
+    sentences = split_sentences(ARTICLE)
+    scores = textrank(sentences)
+
+    assert scores.shape == (len(sentences),)
+    assert scores.sum() == pytest.approx(1.0)
+    assert scores[sentences.index("The weather in the region was mild.")] == scores.min()
+
+
+def test_textrank_power_iteration_matches_direct_solve(monkeypatch):
+    """Test that large documents converge to the same scores by iteration."""
+    sentences = split_sentences(ARTICLE)
+    direct = textrank(sentences)
+    monkeypatch.setattr("topic_insights.agents.local_agent._DIRECT_SOLVE_MAX", 0)
+
+    np.testing.assert_allclose(textrank(sentences), direct, atol=1e-5)
+
+
+def test_summarize_respects_length_and_order():
+    """Test that summaries keep document order and fit the word budget."""
+    summary = summarize(ARTICLE, max_length=25)
+
+    assert 0 < len(summary.split()) <= 25
+    assert "weather" not in summary
+    positions = [ARTICLE.index(sentence) for sentence in split_sentences(summary)]
+    assert positions == sorted(positions)
+    assert summarize("") == ""
+
+
+def test_summarize_ranks_only_leading_sentences(monkeypatch):
+    """Test that sentences past the ranking cap are never selected."""
+    monkeypatch.setattr("topic_insights.agents.local_agent._MAX_RANKED_SENTENCES", 2)
+
+    summary = summarize(ARTICLE, sentences=3)
+
+    assert split_sentences(summary) == split_sentences(ARTICLE)[:2]
+
+
+def test_extract_entities_categories():
+    """Test rule-based categories, surname merging and sentence-initial filtering."""
+    entities = {e.entity: e for e in extract_entities(ARTICLE)}
+
+    assert entities["European Commission"].category == "Organizations"
+    assert entities["Stanford University"].category == "Organizations"
+    assert entities["Margrethe Vestager"].category == "People"
+    assert "Vestager" not in entities
+    assert entities["Washington"].category == "Locations"
+    assert entities["artificial intelligence"].category == "Technologies"
+    assert entities["January 2025"].category == "Dates"
+    assert entities["Tuesday"].category == "Dates"
+    assert "Researchers" not in entities and "Critics" not in entities
+    assert all(0 <= e.relevance <= 1 for e in entities.values())
+
+
+@pytest.mark.parametrize(
+    "text, technology",
+    [
+        ("Uses the python_requires field.", "python"),
+        ("Set cloud_provider in config.", "cloud"),
+        ("The new aiPhone launched.", "ai"),
+    ],
+)
+async def test_extract_entities_technology_inside_identifier(text, technology):
+    """Test that technology words followed by "_" or a capital do not crash extraction."""
+    entities = {e.entity: e for e in extract_entities(text)}
+
+    assert entities[technology].category == "Technologies"
+    assert (await LocalAgent().process_content(text)).summary == text
+
+
+def test_extract_keywords_prefers_recurring_phrases():
+    """Test that repeated multi-word terms outrank their parts."""
+    text = "Solid state batteries are coming. Solid state batteries charge fast. Batteries matter."
+
+    keywords = extract_keywords(text, limit=3)
+
+    assert keywords[0] == ("solid state batteries", 1.0)
+    assert "solid" not in [k for k, _ in keywords]
+
+
+def test_relevance_ranks_matching_content():
+    """Test the pre-filter score ordering and range."""
+    scores = relevance("AI rules", [ARTICLE, "Cats and dogs.", "New rules for banks."])
+
+    assert scores[0] > scores[2] > scores[1] == 0
+    assert (scores <= 1).all()
+    assert relevance("the", [ARTICLE]).tolist() == [0.0]
+
+
+@pytest.mark.asyncio
+async def test_local_agent_implements_base_agent():
+    """Test every agent method without network access."""
+    agent = LocalAgent()
+    await agent.initialize()
+
+    result = await agent.process_content(ARTICLE, max_length=40, num_questions=3)
+    assert isinstance(result, ContentAnalysisResult)
+    assert result.summary and len(result.questions) == 3
+    assert all(q.endswith("?") for q in result.questions)
+    assert parse_entities(await agent.extract_entities(ARTICLE))
+    analysis = await agent.analyze_topic("AI regulation", {"articles": [ARTICLE]})
+    assert "Margrethe Vestager" in analysis["analysis"]
+    assert analysis["tokens_used"] == 0
+    await agent.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_local_agent_runs_in_executor():
+    """Test that the CPU-bound work is submitted to the given executor."""
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        submitted = 0
+
+        def submit(self, *args, **kwargs):
+            RecordingExecutor.submitted += 1
+            return super().submit(*args, **kwargs)
+
+    with RecordingExecutor(max_workers=2) as executor:
+        agent = LocalAgent(executor=executor)
+        results = [r async for r in agent.process_many([ARTICLE, ARTICLE])]
+
+    assert [r.ok for r in results] == [True, True]
+    assert RecordingExecutor.submitted == 2
+
+
+@pytest.mark.asyncio
+async def test_local_agent_process_pool():
+    """Test that a process pool gives the same results and is shut down on cleanup."""
+    agent = LocalAgent(processes=2)
+    await agent.initialize()
+
+    result = await agent.process_content(ARTICLE)
+    assert result == await LocalAgent().process_content(ARTICLE)
+    assert await agent.summarize_content(ARTICLE) == summarize(ARTICLE)
+    await agent.cleanup()
+    assert agent.executor is None
+    with pytest.raises(ValueError):
+        LocalAgent(processes=0)
+
+
+@pytest.mark.asyncio
+async def test_local_agent_as_cascade_overflow():
+    """Test that a cascade falls back to the local agent when the API agent fails."""
+
+    class FailingAgent(LocalAgent):
+        async def summarize_content(self, content, max_length=None):
+            raise RuntimeError("429 Too Many Requests")
+
+    policy = CascadePolicy(
+        default=("api", "local"), routes={"summarize_content": [Route(("api", "local"))]}
+    )
+    agent = CascadeAgent(policy, agents={"api": FailingAgent(), "local": LocalAgent()})
+
+    assert await agent.summarize_content(ARTICLE) == summarize(ARTICLE)
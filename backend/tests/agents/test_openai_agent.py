@@ -1,6 +1,16 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
 import pytest
-from unittest.mock import AsyncMock, patch
+from openai import InternalServerError
+
+from topic_insights.agents.cache import ResponseCache
 from topic_insights.agents.openai_agent import OpenAIAgent
+from topic_insights.agents.structured import StructuredOutputError
+from topic_insights.metrics import STRUCTURED_OUTPUTS
+from topic_insights.models.agents import Entity
+
 
 @pytest.fixture
 async def agent():
@@ -50,15 +60,18 @@ async def test_extract_entities(agent):
         
         result = await agent.extract_entities("OpenAI is a company")
         
-        assert result == mock_entities
+        assert result == [Entity(entity="OpenAI", category="Organization", relevance=0.9)]
         mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["response_format"]["json_schema"]["strict"] is True
 
 @pytest.mark.asyncio
 async def test_generate_questions(agent):
     """Test question generation."""
     with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
         mock_create.return_value.choices = [
-            AsyncMock(message=AsyncMock(content="1. First question?\n2. Second question?"))
+            AsyncMock(
+                message=AsyncMock(content='{"questions": ["First question?", "Second question?"]}')
+            )
         ]
         
         result = await agent.generate_questions("Test content", num_questions=2)
@@ -67,6 +80,246 @@ async def test_generate_questions(agent):
         assert all(q.endswith("?") for q in result)
         mock_create.assert_called_once()
 
+@pytest.mark.asyncio
+async def test_cached_calls_skip_api():
+    """Test that repeated calls are served from the response cache."""
+    agent = OpenAIAgent(api_key="test-key", model="gpt-4o", cache=ResponseCache())
+    await agent.initialize()
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value.choices = [
+            AsyncMock(message=AsyncMock(content="Test summary"))
+        ]
+        mock_create.return_value.usage = AsyncMock(total_tokens=42)
+        
+        first = await agent.summarize_content("Long content here", max_length=50)
+        second = await agent.summarize_content("Long content here", max_length=50)
+        await agent.summarize_content("Different content", max_length=50)
+        
+        assert first == second == "Test summary"
+        assert mock_create.call_count == 2
+        assert agent.cache.stats.hits == 1
+        assert agent.cache.stats.misses == 2
+    await agent.cleanup()
+
+@pytest.mark.asyncio
+async def test_process_content_single_call(agent):
+    """Test that fused processing makes one structured-output call."""
+    payload = json.dumps({
+        "summary": "Test summary",
+        "entities": [{"entity": "OpenAI", "category": "Organizations", "relevance": 0.9}],
+        "questions": ["First question?", "Second question?", "Third question?"],
+    })
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value.choices = [
+            AsyncMock(message=AsyncMock(content=payload))
+        ]
+        
+        result = await agent.process_content("OpenAI is a company", num_questions=2)
+        
+        assert result.summary == "Test summary"
+        assert result.entities[0].entity == "OpenAI"
+        assert result.questions == ["First question?", "Second question?"]
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["response_format"]["type"] == "json_schema"
+
+@pytest.mark.asyncio
+async def test_invalid_structured_output_is_retried(agent):
+    """Test that unrepairable output is re-asked with the error, then raises."""
+    valid = '{"questions": ["Why?", "How?"]}'
+    retried = STRUCTURED_OUTPUTS.value(
+        agent="openai", method="generate_questions", outcome="retried"
+    )
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        invalid, success = MagicMock(), MagicMock()
+        invalid.choices = [MagicMock(message=MagicMock(content='{"questions": "Why?"}'))]
+        success.choices = [MagicMock(message=MagicMock(content=valid))]
+        mock_create.side_effect = [invalid, success]
+        
+        assert await agent.generate_questions("text", num_questions=2) == ["Why?", "How?"]
+        
+        retry_messages = mock_create.call_args.kwargs["messages"]
+        assert retry_messages[-2] == {"role": "assistant", "content": '{"questions": "Why?"}'}
+        assert "invalid" in retry_messages[-1]["content"]
+        assert STRUCTURED_OUTPUTS.value(
+            agent="openai", method="generate_questions", outcome="retried"
+        ) == retried + 1
+        
+        mock_create.side_effect = [invalid, invalid]
+        with pytest.raises(StructuredOutputError):
+            await agent.generate_questions("text")
+
+@pytest.mark.asyncio
+async def test_invalid_structured_output_is_not_cached(agent):
+    """Test that only validated replies are cached, under the original request."""
+    agent.cache = ResponseCache()
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        invalid, success = MagicMock(), MagicMock()
+        invalid.choices = [MagicMock(message=MagicMock(content='{"questions": "Why?"}'))]
+        success.choices = [MagicMock(message=MagicMock(content='{"questions": ["Why?"]}'))]
+        mock_create.side_effect = [invalid, invalid]
+        with pytest.raises(StructuredOutputError):
+            await agent.generate_questions("text", num_questions=1)
+
+        mock_create.side_effect = [success]
+        assert await agent.generate_questions("text", num_questions=1) == ["Why?"]
+        assert await agent.generate_questions("text", num_questions=1) == ["Why?"]
+        assert mock_create.call_count == 3
+
+@pytest.mark.asyncio
+async def test_truncated_structured_output_is_repaired(agent):
+    """Test that fenced, truncated output is repaired without another call."""
+    content = (
+        '```json\n{"entities": [{"entity": "EU", "category": "Organizations", "relevance": 0.8}, '
+        '{"ent'
+    )
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value.choices = [MagicMock(message=MagicMock(content=content))]
+        
+        result = await agent.extract_entities("The EU met.")
+        
+        assert [e.entity for e in result] == ["EU"]
+        mock_create.assert_called_once()
+
+class FakeStream:
+    """Async iterator standing in for an OpenAI completion stream."""
+    
+    def __init__(self, deltas):
+        self.chunks = [
+            MagicMock(choices=[MagicMock(delta=MagicMock(content=d))], usage=None) for d in deltas
+        ] + [MagicMock(choices=[], usage=MagicMock(total_tokens=7))]
+        self.closed = False
+        
+    def __aiter__(self):
+        return self._iterate()
+        
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield chunk
+            
+    async def close(self):
+        self.closed = True
+
+@pytest.mark.asyncio
+async def test_stream_summarize_content(agent):
+    """Test that summary deltas are yielded as they arrive and cached afterwards."""
+    agent.cache = ResponseCache()
+    stream = FakeStream(["Test ", "summary"])
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value = stream
+        
+        deltas = [d async for d in agent.stream_summarize_content("Long content here")]
+        
+        assert deltas == ["Test ", "summary"]
+        assert stream.closed
+        assert mock_create.call_args.kwargs["stream"] is True
+        
+        # The completed stream is cached and serves the non-streaming call.
+        assert await agent.summarize_content("Long content here") == "Test summary"
+        mock_create.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_stream_extract_entities_yields_items_as_completed(agent):
+    """Test that entities are yielded from a JSON stream as each item closes."""
+    payload = json.dumps({"entities": [
+        {"entity": "EU", "category": "Organizations", "relevance": 0.8},
+        {"entity": "Paris", "category": "Locations"},
+        {"entity": "2025", "category": "Dates", "relevance": 0.5},
+    ]})
+    deltas = [payload[i:i + 7] for i in range(0, len(payload), 7)]
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value = FakeStream(deltas)
+        
+        entities = [e async for e in agent.stream_extract_entities("The EU met in Paris.")]
+        
+    assert [e.entity for e in entities] == ["EU", "2025"]
+    assert mock_create.call_args.kwargs["response_format"]["type"] == "json_schema"
+
+def _embedding_response(inputs):
+    """Build an embeddings response with one vector per input, in shuffled order."""
+    data = [
+        MagicMock(index=i, embedding=[float(len(text)), float(i)])
+        for i, text in enumerate(inputs)
+    ]
+    return MagicMock(data=list(reversed(data)))
+
+@pytest.mark.asyncio
+async def test_embed_many_packs_requests(agent):
+    """Test that inputs are packed into few requests and returned in order."""
+    texts = ["a" * 40, "b" * 80, "c" * 40, "d" * 4]
+    with patch.object(agent.client.embeddings, 'create', new_callable=AsyncMock) as mock_create:
+        mock_create.side_effect = lambda model, input: _embedding_response(input)
+        
+        vectors = await agent.embed_many(texts, max_request_tokens=25)
+        
+        assert [v[0] for v in vectors] == [40.0, 80.0, 40.0, 4.0]
+        assert mock_create.call_count == 3
+        models = {call.kwargs["model"] for call in mock_create.call_args_list}
+        assert models == {"text-embedding-3-small"}
+
+@pytest.mark.asyncio
+async def test_embed_many_skips_cached_inputs(agent):
+    """Test that cached embeddings are not requested again."""
+    agent.cache = ResponseCache()
+    with patch.object(agent.client.embeddings, 'create', new_callable=AsyncMock) as mock_create:
+        mock_create.side_effect = lambda model, input: _embedding_response(input)
+        
+        await agent.embed_many(["first", "second"])
+        vectors = await agent.embed_many(["second", "third"])
+        
+        assert [v[0] for v in vectors] == [6.0, 5.0]
+        assert mock_create.call_count == 2
+        assert mock_create.call_args.kwargs["input"] == ["third"]
+
+@pytest.mark.asyncio
+async def test_summarize_many(agent):
+    """Test batch summarization streams one result per input."""
+    with patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value.choices = [
+            AsyncMock(message=AsyncMock(content="Test summary"))
+        ]
+        
+        results = [r async for r in agent.summarize_many(["a", "b", "c"], concurrency=2)]
+        
+        assert sorted(r.index for r in results) == [0, 1, 2]
+        assert all(r.result == "Test summary" for r in results)
+        assert mock_create.call_count == 3
+
+@pytest.mark.asyncio
+async def test_retries_server_errors(agent):
+    """Test that 5xx responses are retried before succeeding."""
+    error = InternalServerError(
+        "server error",
+        response=httpx.Response(500, request=httpx.Request("POST", "https://api.openai.com")),
+        body=None,
+    )
+    success = AsyncMock()
+    success.choices = [AsyncMock(message=AsyncMock(content="Test summary"))]
+    with patch("topic_insights.agents.ratelimit.backoff_delay", return_value=0), patch.object(
+        agent.client.chat.completions, 'create', new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.side_effect = [error, success]
+        
+        result = await agent.summarize_content("Long content here")
+        
+        assert result == "Test summary"
+        assert mock_create.call_count == 2
+
 @pytest.mark.asyncio
 async def test_initialization_without_api_key():
     """Test that initialization fails without API key."""
@@ -0,0 +1,114 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from topic_insights.agents.openai_agent import OpenAIAgent
+from topic_insights.agents.prompts import (
+    SUMMARIZE_CONTENT,
+    PromptBuilder,
+    clean_source,
+    compact_context,
+)
+from topic_insights.agents.tokens import count_tokens
+from topic_insights.metrics import (
+    AGENT_COST,
+    AGENT_TOKENS,
+    PROMPT_CACHE_HIT_RATIO,
+    PROMPT_TOKENS,
+    estimate_cost,
+    record_usage,
+)
+
+
+def test_clean_source_strips_markup_and_boilerplate():
+    """Test that tags, scripts, boilerplate and repeated lines are removed."""
+    html = """<html><script>track()</script><p>Solar output  rose&nbsp;12% in May.</p>
+    <div>Accept all cookies</div>
+    <p>Grid operators expect more growth.</p>
+    <p>Subscribe to our newsletter</p>
+    <p>Solar output  rose&nbsp;12% in May.</p>
+    <footer>© 2024 Example News. All rights reserved.</footer></html>"""
+
+    assert clean_source(html) == "Solar output rose 12% in May.\nGrid operators expect more growth."
+
+
+def test_compact_context_is_sorted_and_fits_budget():
+    """Test compact serialization, dropped empty values and shrinking to the budget."""
+    assert compact_context({"b": 1, "a": "x", "empty": None, "list": []}) == '{"a":"x","b":1}'
+
+    context = {"notes": ["word " * 200 for _ in range(20)], "region": "EU"}
+    serialized = compact_context(context, max_tokens=60)
+
+    assert count_tokens(serialized) <= 60
+    assert '"region":"EU"' in serialized
+
+
+def test_prompt_builder_trims_content_to_budget():
+    """Test that content is cut to fit the input budget and the savings are reported."""
+    builder = PromptBuilder("gpt-4o", max_input_tokens=200)
+    content = "This sentence is about energy markets. " * 200
+
+    prompt = builder.build(SUMMARIZE_CONTENT, content, [("Target length in words", 50)])
+
+    assert prompt.trimmed
+    assert prompt.tokens <= 200
+    assert prompt.saved_tokens > 0
+    assert prompt.messages[1]["content"].startswith("Target length in words: 50\n\nContent:\n")
+    assert prompt.messages[1]["content"].endswith(".")
+
+
+def test_prompt_prefix_is_stable_across_calls():
+    """Test that per-call values only change the final user message."""
+    builder = PromptBuilder("gpt-4o")
+
+    first = builder.build(SUMMARIZE_CONTENT, "First article.", [("Target length in words", 50)])
+    second = builder.build(SUMMARIZE_CONTENT, "Second article.", [("Target length in words", 80)])
+
+    assert first.messages[0] == second.messages[0]
+    assert first.prefix_tokens == second.prefix_tokens
+    assert "50" not in first.messages[0]["content"]
+
+
+@pytest.mark.asyncio
+async def test_agent_builds_prompts_within_budget():
+    """Test that agent calls use the compact layout and record prompt token metrics."""
+    agent = OpenAIAgent(api_key="test-key", model="gpt-4o", max_input_tokens=150)
+    await agent.initialize()
+    saved = PROMPT_TOKENS.value(agent="openai", method="analyze_topic", part="saved")
+    with patch.object(
+        agent.client.chat.completions, "create", new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value.choices = [MagicMock(message=MagicMock(content="Insights"))]
+        mock_create.return_value.usage = None
+
+        await agent.analyze_topic("solar", {"region": "EU", "history": None, "notes": "x " * 400})
+
+    messages = mock_create.call_args.kwargs["messages"]
+    user = messages[1]["content"]
+    assert user.startswith("Topic: solar\nContext: {")
+    assert json.loads(user.split("Context: ", 1)[1])["region"] == "EU"
+    assert "history" not in user
+    assert PROMPT_TOKENS.value(agent="openai", method="analyze_topic", part="saved") > saved
+    await agent.cleanup()
+
+
+def test_record_usage_counts_cached_prompt_tokens():
+    """Test cached input token counts, the prefix-cache hit ratio and discounted cost."""
+    model = "gpt-4o-mini-2099-01-01"
+    usage = SimpleNamespace(
+        prompt_tokens=1000,
+        completion_tokens=100,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=800),
+    )
+
+    record_usage(model, usage)
+    record_usage(model, SimpleNamespace(prompt_tokens=1000, completion_tokens=0))
+
+    assert AGENT_TOKENS.value(model=model, direction="cached_input") == 800
+    assert PROMPT_CACHE_HIT_RATIO.value(model=model) == pytest.approx(0.4)
+    assert estimate_cost(model, 1000, 100, 800) < estimate_cost(model, 1000, 100)
+    assert AGENT_COST.value(model=model) == pytest.approx(
+        estimate_cost(model, 1000, 100, 800) + estimate_cost(model, 1000)
+    )
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from topic_insights.agents.ratelimit import RateLimiter, TokenBucket, retry_async
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    """Test that acquiring beyond the level waits for the refill."""
+    bucket = TokenBucket(capacity=2, refill_per_second=50)
+    await bucket.acquire(2)
+
+    start = time.monotonic()
+    await bucket.acquire(1)
+
+    assert time.monotonic() - start >= 0.015
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_charges_actual_usage():
+    """Test that usage above the estimate is charged to the token bucket."""
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    await limiter.acquire(tokens=100)
+    limiter.record_usage(estimated=100, actual=400)
+
+    assert limiter.tokens.level == pytest.approx(5600, abs=5)
+    assert limiter.requests.level == pytest.approx(59, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_retry_async_retries_throttling():
+    """Test that 429 and 5xx errors are retried."""
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise StatusError(429)
+        if len(attempts) == 2:
+            raise StatusError(503)
+        return "ok"
+
+    assert await retry_async(flaky, max_retries=3, base_delay=0.001) == "ok"
+    assert len(attempts) == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_async_does_not_retry_client_errors():
+    """Test that 4xx errors other than 429 are raised immediately."""
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        await retry_async(bad_request, max_retries=3, base_delay=0.001)
+    assert len(attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_async_gives_up():
+    """Test that the last error is raised once retries are exhausted."""
+
+    async def always_throttled():
+        raise StatusError(429)
+
+    with pytest.raises(StatusError):
+        await retry_async(always_throttled, max_retries=2, base_delay=0.001)
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from topic_insights.agents.structured import (
+    JSONArrayStream,
+    StructuredOutputError,
+    parse_model,
+    repair_json,
+)
+from topic_insights.models.agents import EntityList, QuestionList
+
+ENTITY = {"entity": "EU", "category": "Organizations", "relevance": 0.8}
+
+
+def test_repair_json_fixes_common_failures():
+    """Test fences, surrounding prose, trailing commas and truncation."""
+    assert repair_json('```json\n{"a": [1, 2,],}\n```') == '{"a": [1, 2]}'
+    assert repair_json('Sure: {"s": "a}b\\"c"} hope this helps') == '{"s": "a}b\\"c"}'
+    assert repair_json('{"summary": "cut off') == '{"summary": "cut off"}'
+    assert repair_json('{"a": 1, "b":') == '{"a": 1, "b":null}'
+    truncated = '{"entities": [{"entity": "EU"}, {"entity": "Par'
+    assert repair_json(truncated, drop_partial=True) == '{"entities": [{"entity": "EU"}]}'
+    with pytest.raises(StructuredOutputError):
+        repair_json("no json here")
+
+
+def test_parse_model_reports_repairs():
+    """Test valid, repaired, wrapped and unrepairable outputs."""
+    valid = json.dumps({"entities": [ENTITY]})
+
+    assert parse_model(valid, EntityList) == (EntityList(entities=[ENTITY]), False)
+    result, repaired = parse_model(valid[:-2] + ', {"entity": "Pa', EntityList)
+    assert repaired and result.entities[0].entity == "EU" and len(result.entities) == 1
+    assert parse_model('["Why?"]', QuestionList, "questions")[0].questions == ["Why?"]
+    with pytest.raises(StructuredOutputError):
+        parse_model('{"questions": "Why?"}', QuestionList)
+    with pytest.raises(StructuredOutputError):
+        parse_model("", QuestionList)
+
+
+def test_json_array_stream_decodes_items_incrementally():
+    """Test that items are returned as soon as they close, whatever the chunking."""
+    document = json.dumps(
+        {"note": "[not this]", "entities": [ENTITY, "a,]", {"x": {"y": "}"}}], "z": [9]}
+    )
+    stream = JSONArrayStream("entities")
+    seen = []
+    for i in range(0, len(document), 5):
+        seen.append(stream.feed(document[i:i + 5]))
+
+    assert [item for items in seen for item in items] == [ENTITY, "a,]", {"x": {"y": "}"}}]
+    assert seen.index([ENTITY]) < len(seen) - 1
+    assert stream.done and stream.skipped == 0
+
+    bare = JSONArrayStream()
+    assert bare.feed('[1, bad, {"a"') == [1]
+    assert bare.feed(": 2}]") == [{"a": 2}] and bare.skipped == 1
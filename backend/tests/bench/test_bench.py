@@ -0,0 +1,79 @@
+import json
+
+import httpx
+import pytest
+
+from services.supabase.client import SupabaseConfig, SupabaseService
+from topic_insights.bench.fakes import FakeLatency, FakeServer, create_fake_app
+from topic_insights.bench.suite import BenchConfig, compare, run_suite
+
+
+def _tiny_config():
+    return BenchConfig(
+        summaries=8,
+        embeddings=20,
+        local_articles=20,
+        ingest_rows=300,
+        search_documents=200,
+        search_queries=20,
+        search_vocabulary=500,
+        vector_dim=16,
+        topics=2,
+        keywords_per_topic=1,
+        articles_per_feed=3,
+        concurrency=4,
+        latency=FakeLatency.none(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_suite_produces_json_results():
+    """Test that every benchmark runs against the fakes and reports measurements."""
+    results = await run_suite(_tiny_config())
+
+    assert set(results["results"]) == {"agent", "local", "ingest", "search", "pipeline"}
+    assert results["results"]["local"]["articles_per_second"] > 0
+    assert results["results"]["agent"]["summarize"]["errors"] == 0
+    assert results["results"]["ingest"]["rows_written"] == 300
+    assert results["results"]["search"]["text_query"]["p50_ms"] > 0
+    pipeline = results["results"]["pipeline"]
+    assert pipeline["failed"] == 0
+    assert set(pipeline["stages"]) == {"fetch", "dedup", "summarize", "store"}
+    assert results["meta"]["config"]["topics"] == 2
+    json.dumps(results)
+
+
+@pytest.mark.asyncio
+async def test_fake_postgrest_pages_and_upserts():
+    """Test that the fake PostgREST honours upsert keys and keyset cursors."""
+    with FakeServer(create_fake_app(FakeLatency.none())) as server:
+        async with httpx.AsyncClient() as http_client:
+            service = SupabaseService(
+                SupabaseConfig(url=server.base_url, key="test"), http_client=http_client
+            )
+            rows = [
+                {"topic_id": "t1", "content": f"c{i}", "source_url": f"u{i}"} for i in range(5)
+            ]
+            await service.upsert_summaries(rows)
+            await service.upsert_summaries([{**rows[0], "content": "updated"}])
+
+            pages = [
+                row
+                async for row in service.iter_topic_summaries(
+                    "t1", page_size=2, columns="id, content, created_at"
+                )
+            ]
+
+    assert len(pages) == 5
+    assert {row["content"] for row in pages} == {"updated", "c1", "c2", "c3", "c4"}
+
+
+def test_compare_flags_regressions():
+    """Test that only changes past the threshold in the worse direction are reported."""
+    baseline = {"results": {"agent": {"calls_per_second": 100.0, "p95_ms": 10.0, "calls": 8}}}
+    current = {"results": {"agent": {"calls_per_second": 70.0, "p95_ms": 9.0, "calls": 1}}}
+
+    regressions = compare(current, baseline, threshold=0.2)
+
+    assert [r["metric"] for r in regressions] == ["agent.calls_per_second"]
+    assert regressions[0]["change"] == pytest.approx(-0.3)
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from topic_insights.fetchers.article import clean_text, to_iso
+from topic_insights.fetchers.client import FetchClient, FetchError, HostLimits
+from topic_insights.fetchers.sources import ArxivSource, FeedSource, NewsAPISource
+from topic_insights.fetchers.topic import TopicFetcher
+
+NEWS = {
+    "articles": [
+        {
+            "url": "https://news.example/a",
+            "title": "Solar <b>record</b>",
+            "description": "Panels   produced &amp; stored more power.",
+            "source": {"name": "Example News"},
+            "publishedAt": "2024-05-01T08:00:00Z",
+        }
+    ]
+}
+ARXIV = """<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/2405.00001v1</id>
+    <title>Perovskite cells</title>
+    <summary>We report a stable cell.</summary>
+    <published>2024-05-01T00:00:00Z</published>
+    <author><name>A. Author</name></author>
+    <author><name>B. Author</name></author>
+  </entry>
+</feed>"""
+RSS = """<rss><channel>
+  <item><link>https://news.example/a</link><title>Duplicate of the API story</title></item>
+  <item><link>https://feed.example/b</link><title>Wind</title>
+    <description>Offshore wind grows.</description>
+    <pubDate>Wed, 01 May 2024 09:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class StubServer:
+    """Local HTTP server with ETag support that records request concurrency."""
+
+    def __init__(self, delay: float = 0.0, fail_first: int = 0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append((self.path, dict(self.headers)))
+                    server.active += 1
+                    server.peak = max(server.peak, server.active)
+                    failing = server.fail_first > 0
+                    server.fail_first -= 1
+                try:
+                    time.sleep(server.delay)
+                    if failing:
+                        return self._send(503, b"")
+                    path = self.path.split("?")[0]
+                    body, kind = {
+                        "/news": (json.dumps(NEWS).encode(), "application/json"),
+                        "/arxiv": (ARXIV.encode(), "application/atom+xml"),
+                        "/rss": (RSS.encode(), "application/rss+xml"),
+                    }.get(path, (b"", "text/plain"))
+                    etag = f'"{path}-v1"'
+                    if self.headers.get("If-None-Match") == etag:
+                        return self._send(304, b"", etag=etag)
+                    self._send(200 if body else 404, body, kind, etag)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def _send(self, status, body, kind="text/plain", etag=None):
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+@contextmanager
+def serve(stub: StubServer):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_normalization_helpers():
+    """Test markup stripping, truncation and timestamp normalization."""
+    assert clean_text("<p>Hello&nbsp;<b>world</b></p>\n") == "Hello world"
+    assert clean_text("one two three", max_chars=9) == "one two"
+    assert to_iso("Wed, 01 May 2024 09:00:00 GMT") == "2024-05-01T09:00:00+00:00"
+    assert to_iso("2024-05-01T08:00:00Z") == "2024-05-01T08:00:00+00:00"
+    assert to_iso("not a date") is None
+
+
+@pytest.mark.asyncio
+async def test_topic_fetcher_normalizes_and_revalidates():
+    """Test concurrent fetching, de-duplication and 304s replaying the cached body."""
+    stub = StubServer()
+    with serve(stub) as base:
+        client = FetchClient(default_limits=HostLimits(max_connections=4))
+        fetcher = TopicFetcher(
+            client,
+            [
+                NewsAPISource("secret", base_url=f"{base}/news"),
+                ArxivSource(base_url=f"{base}/arxiv"),
+                FeedSource("feed", f"{base}/rss?q={{query}}&lang=en"),
+            ],
+        )
+        topic = {"id": "t1", "keywords": ["solar", "wind"]}
+        first = await fetcher(topic)
+        second = await fetcher(topic)
+        await client.close()
+
+    by_url = {article["url"]: article for article in first}
+    assert set(by_url) == {
+        "https://news.example/a",
+        "http://arxiv.org/abs/2405.00001v1",
+        "https://feed.example/b",
+    }
+    news = by_url["https://news.example/a"]
+    assert news["title"] == "Solar record"
+    assert news["content"] == "Panels produced & stored more power."
+    assert news["source"] == "Example News"
+    assert news["published_at"] == "2024-05-01T08:00:00+00:00"
+    assert by_url["http://arxiv.org/abs/2405.00001v1"]["author"] == "A. Author, B. Author"
+    assert by_url["https://feed.example/b"]["source_type"] == "news"
+
+    assert sorted(second, key=lambda a: a["url"]) == sorted(first, key=lambda a: a["url"])
+    assert client.stats["not_modified"] == 6
+    news_requests = [headers for path, headers in stub.requests if path.startswith("/news")]
+    assert news_requests and all(h["X-Api-Key"] == "secret" for h in news_requests)
+    assert all("secret" not in path for path, _ in stub.requests)
+    assert any(path == "/rss?q=solar&lang=en" for path, _ in stub.requests)
+
+
+@pytest.mark.asyncio
+async def test_per_host_connection_and_rate_limits():
+    """Test that requests to one host respect its connection and rate limits."""
+    stub = StubServer(delay=0.05)
+    with serve(stub) as base:
+        client = FetchClient(default_limits=HostLimits(max_connections=2))
+        await asyncio.gather(*(client.get(f"{base}/news", params={"q": i}) for i in range(6)))
+        assert stub.peak == 2
+
+        client.host_limits["127.0.0.1"] = HostLimits(max_connections=8, requests_per_second=20)
+        client._hosts.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(client.get(f"{base}/news", params={"r": i}) for i in range(5)))
+        assert time.perf_counter() - started >= 0.18
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_retries_server_errors():
+    """Test that 5xx responses are retried and 404s are not."""
+    stub = StubServer(fail_first=1)
+    with serve(stub) as base:
+        client = FetchClient(base_delay=0)
+        response = await client.get(f"{base}/news")
+        with pytest.raises(FetchError) as missing:
+            await client.get(f"{base}/missing")
+        await client.close()
+
+    assert response.status_code == 200
+    assert client.stats["retries"] == 1
+    assert missing.value.status_code == 404
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from topic_insights.pipeline.dedup import NearDuplicateIndex, shingle_hashes
+
+ARTICLE = (
+    "The European Space Agency confirmed on Tuesday that its new climate satellite "
+    "reached orbit and began transmitting data about polar ice thickness, sea levels "
+    "and atmospheric carbon. Scientists expect the first calibrated measurements to be "
+    "published next spring after a commissioning phase of several months."
+)
+REWRITE = ARTICLE.replace("Scientists", "Researchers")
+UNRELATED = (
+    "A new open source database engine promises faster analytical queries by storing "
+    "columns in compressed blocks and vectorizing execution across CPU cores."
+)
+
+
+def test_shingle_hashes_are_deterministic():
+    """Test that shingle hashes do not depend on the process hash seed."""
+    assert set(shingle_hashes("a b c d e f")) == set(shingle_hashes("A b, c d e f!"))
+    assert len(shingle_hashes("a b c d e f", size=5)) == 2
+    assert len(shingle_hashes("")) == 0
+
+
+def test_detects_near_duplicates():
+    """Test that a lightly edited article is flagged and an unrelated one is not."""
+    index = NearDuplicateIndex(threshold=0.7)
+
+    assert not index.check("original", ARTICLE).is_duplicate
+    rewrite = index.check("rewrite", REWRITE)
+    unrelated = index.check("unrelated", UNRELATED)
+
+    assert rewrite.is_duplicate
+    assert rewrite.duplicate_of == "original"
+    assert rewrite.similarity >= 0.7
+    assert not unrelated.is_duplicate
+    assert "rewrite" not in index
+    assert len(index) == 2
+
+
+def test_deduplicate_batch_checks_within_batch():
+    """Test that duplicates inside one batch are detected."""
+    index = NearDuplicateIndex(threshold=0.7)
+
+    results = index.deduplicate([("a", ARTICLE), ("b", UNRELATED), ("c", ARTICLE)])
+
+    assert [r.is_duplicate for r in results] == [False, False, True]
+    assert results[2].duplicate_of == "a"
+
+
+def test_prune_drops_old_articles():
+    """Test that articles outside the window are no longer matched."""
+    index = NearDuplicateIndex(window_days=1)
+    index.check("old", ARTICLE, timestamp=time.time() - 2 * 86400)
+
+    assert index.prune() == 1
+    assert not index.check("new", ARTICLE).is_duplicate
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """Test that a persisted index keeps matching after reload."""
+    index = NearDuplicateIndex(threshold=0.7, window_days=None)
+    index.check("original", ARTICLE)
+    path = tmp_path / "dedup.npz"
+    index.save(path)
+
+    loaded = NearDuplicateIndex.load(path)
+
+    assert len(loaded) == 1
+    assert loaded.window_days is None
+    assert loaded.check("rewrite", REWRITE).duplicate_of == "original"
+
+
+def test_merge_adds_articles_of_another_index():
+    """Test that merging makes the other index's articles findable."""
+    index, pending = NearDuplicateIndex(), NearDuplicateIndex()
+    pending.check("a", ARTICLE)
+
+    index.merge(pending)
+
+    assert "a" in index
+    assert index.check("b", ARTICLE).duplicate_of == "a"
+    with pytest.raises(ValueError):
+        index.merge(NearDuplicateIndex(seed=2))
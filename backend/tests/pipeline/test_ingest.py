@@ -0,0 +1,138 @@
+import asyncio
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError, generate_default_error_message
+
+from topic_insights.pipeline.ingest import (
+    BulkIngester,
+    dedupe_summaries,
+    is_retryable_ingest_error,
+)
+
+
+class FakeStore:
+    """Summary store that records upserts keyed like the unique index."""
+
+    def __init__(self, fail_times: int = 0, error: Exception = None):
+        self.rows = {}
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_times = fail_times
+        self.error = error or httpx.ConnectError("connection reset")
+
+    async def upsert_summaries(self, summaries):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.fail_times:
+                self.fail_times -= 1
+                raise self.error
+            for row in summaries:
+                self.rows[(row["topic_id"], row["source_url"])] = row
+        finally:
+            self.in_flight -= 1
+
+
+def _summaries(count: int, topic_id: str = "t1"):
+    return [
+        {"topic_id": topic_id, "source_url": f"https://example.com/{i}", "content": f"Summary {i}"}
+        for i in range(count)
+    ]
+
+
+def test_dedupe_keeps_last_row_per_source_url():
+    """Test that repeated source URLs collapse to their latest row."""
+    latest = {"topic_id": "t1", "source_url": "https://example.com/0", "content": "new"}
+    rows = _summaries(2) + [latest]
+    rows += [{"topic_id": "t1", "content": "no url"}, {"topic_id": "t1", "content": "no url"}]
+
+    deduped = dedupe_summaries(rows)
+
+    assert [row["content"] for row in deduped] == ["Summary 1", "new", "no url", "no url"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_chunks_concurrently_and_is_idempotent():
+    """Test that rows are chunked, pipelined and safe to re-ingest."""
+    store = FakeStore()
+    ingester = BulkIngester(store, chunk_size=10, concurrency=3)
+
+    report = await ingester.ingest(_summaries(45))
+    again = await ingester.ingest(_summaries(45))
+
+    assert len(report.chunks) == 5
+    assert [len(chunk.rows) for chunk in report.chunks] == [10, 10, 10, 10, 5]
+    assert report.rows_written == 45 and again.rows_written == 45
+    assert len(store.rows) == 45
+    assert store.max_in_flight == 3
+    assert all(chunk.seconds > 0 for chunk in report.chunks)
+    assert report.to_dict()["failed_chunks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ingest_retries_transient_errors():
+    """Test that transport errors are retried within the chunk."""
+    store = FakeStore(fail_times=1)
+    report = await BulkIngester(store, chunk_size=10, concurrency=1, base_delay=0).ingest(
+        _summaries(5)
+    )
+
+    assert report.rows_written == 5
+    assert report.chunks[0].attempts == 2
+
+
+def _gateway_error(status: int) -> APIError:
+    # postgrest raises this for error bodies that are not PostgREST JSON.
+    return APIError(generate_default_error_message(httpx.Response(status, content=b"<html>")))
+
+
+@pytest.mark.parametrize(
+    "error, retryable",
+    [
+        (_gateway_error(429), True),
+        (_gateway_error(502), True),
+        (_gateway_error(400), False),
+        (APIError({"code": "PGRST003", "message": "Timed out acquiring connection"}), True),
+        (APIError({"code": "40001", "message": "could not serialize access"}), True),
+        (APIError({"code": "53300", "message": "too many connections"}), True),
+        (APIError({"code": "23505", "message": "duplicate key value"}), False),
+        (APIError({"code": "PGRST204", "message": "column not found"}), False),
+        (APIError({"message": "no code"}), False),
+    ],
+)
+def test_api_errors_are_classified_by_code(error, retryable):
+    """Test that PostgREST errors are retried from their code, not a status_code."""
+    assert is_retryable_ingest_error(error) is retryable
+
+
+@pytest.mark.asyncio
+async def test_ingest_retries_postgrest_gateway_errors():
+    """Test that a gateway 503 from PostgREST is retried within the chunk."""
+    store = FakeStore(fail_times=1, error=_gateway_error(503))
+    report = await BulkIngester(store, chunk_size=10, concurrency=1, base_delay=0).ingest(
+        _summaries(5)
+    )
+
+    assert report.rows_written == 5
+    assert report.chunks[0].attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_ingest_reports_failed_chunks_for_rerun():
+    """Test that permanent failures are reported with their rows."""
+    store = FakeStore(fail_times=1, error=ValueError("bad row"))
+    ingester = BulkIngester(store, chunk_size=10, concurrency=1)
+
+    report = await ingester.ingest(_summaries(15))
+
+    assert len(report.failed_chunks) == 1
+    assert isinstance(report.failed_chunks[0].error, ValueError)
+    assert report.rows_written == 5
+
+    rerun = await ingester.ingest(report.failed_rows())
+    assert rerun.rows_written == 10
+    assert len(store.rows) == 15
@@ -0,0 +1,27 @@
+from topic_insights.scheduler.queue import FairQueue, TopicJob
+
+
+def _job(topic_id: str, tenant: str, priority: int = 0) -> TopicJob:
+    return TopicJob({"id": topic_id}, priority=priority, tenant=tenant)
+
+
+def test_fair_queue_round_robins_tenants_within_priority():
+    """Test that a tenant with many topics cannot starve the others."""
+    queue = FairQueue()
+    for i in range(3):
+        queue.push(_job(f"a{i}", "alice"))
+    queue.push(_job("b0", "bob"))
+    queue.push(_job("c0", "carol"))
+    queue.push(_job("urgent", "carol", priority=-1))
+
+    order = [queue.pop().topic_id for _ in range(len(queue))]
+
+    assert order == ["urgent", "a0", "b0", "c0", "a1", "a2"]
+    assert queue.pop() is None
+
+
+def test_job_from_topic_reads_priority_and_tenant():
+    """Test that jobs take their tenant and priority from the topic row."""
+    job = TopicJob.from_topic({"id": 7, "user_id": "u1", "metadata": {"priority": 2}})
+
+    assert (job.topic_id, job.tenant, job.priority) == ("7", "u1", 2)
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from topic_insights.scheduler.checkpoint import Checkpoint
+from topic_insights.scheduler.queue import TopicJob
+from topic_insights.scheduler.runner import Scheduler
+
+
+def _jobs(count: int):
+    return [TopicJob({"id": f"t{i}"}, tenant=f"tenant{i % 2}") for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_stages_in_order_with_bounded_concurrency():
+    """Test that each job runs every stage and timings are reported per stage."""
+    seen = []
+    in_flight = 0
+    peak = 0
+
+    async def fetch(ctx):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        ctx.articles = [{"content": ctx.job.topic_id}]
+
+    async def store(ctx):
+        seen.append(ctx.articles[0]["content"])
+
+    report = await Scheduler([("fetch", fetch), ("store", store)], concurrency=3).run(
+        _jobs(7), run_id="r1"
+    )
+
+    assert sorted(seen) == [f"t{i}" for i in range(7)]
+    assert peak == 3
+    stats = report.stage_stats()
+    assert stats["fetch"]["count"] == 7
+    assert stats["fetch"]["mean"] >= 0.01
+    assert report.to_dict()["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_resumes_from_checkpoint(tmp_path):
+    """Test that a rerun skips completed topics and retries failed ones."""
+    checkpoint = Checkpoint(tmp_path / "checkpoint.jsonl")
+    attempts = {}
+    crash = True
+
+    async def summarize(ctx):
+        attempts[ctx.job.topic_id] = attempts.get(ctx.job.topic_id, 0) + 1
+        if crash and ctx.job.topic_id == "t2":
+            raise RuntimeError("upstream unavailable")
+
+    first = await Scheduler([("summarize", summarize)], checkpoint=checkpoint).run(
+        _jobs(4), run_id="2024-01-01"
+    )
+    assert [r.topic_id for r in first.failed] == ["t2"]
+    assert first.failed[0].failed_stage == "summarize"
+
+    crash = False
+    second = await Scheduler([("summarize", summarize)], checkpoint=checkpoint).run(
+        _jobs(4), run_id="2024-01-01"
+    )
+
+    assert second.skipped == 3
+    assert [r.topic_id for r in second.results] == ["t2"]
+    assert attempts == {"t0": 1, "t1": 1, "t2": 2, "t3": 1}
+    assert checkpoint.completed("2024-01-01") == {"t0", "t1", "t2", "t3"}
+    assert checkpoint.completed("2024-01-02") == set()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_and_times_out_jobs():
+    """Test that failed jobs are re-queued and slow jobs time out."""
+    calls = []
+
+    async def flaky(ctx):
+        calls.append(ctx.job.topic_id)
+        if ctx.job.topic_id == "t0" and calls.count("t0") == 1:
+            raise RuntimeError("transient")
+        if ctx.job.topic_id == "t1":
+            await asyncio.sleep(1)
+
+    report = await Scheduler(
+        [("work", flaky)], concurrency=2, job_timeout=0.05, max_attempts=2
+    ).run(_jobs(2), run_id="r1")
+
+    assert calls.count("t0") == 2
+    assert [r.topic_id for r in report.failed] == ["t1"]
+    assert "timed out" in report.failed[0].error
@@ -0,0 +1,106 @@
+import pytest
+
+from topic_insights.agents.batch import run_bounded
+from topic_insights.pipeline.ingest import BulkIngester
+from topic_insights.scheduler.queue import TopicJob
+from topic_insights.scheduler.runner import Scheduler
+from topic_insights.scheduler.stages import TopicPipeline
+
+ARTICLE = (
+    "The city council approved a new budget on Tuesday that increases funding for "
+    "public transit, road repairs and bike lanes across every district of the city."
+)
+
+
+class SummaryAgent:
+    """Agent stub that summarizes by truncation."""
+
+    def summarize_many(self, contents, max_length=None, concurrency=None):
+        async def summarize(content):
+            return content[:20]
+
+        return run_bounded(summarize, contents, 4)
+
+
+class MemoryStore:
+    def __init__(self):
+        self.rows = []
+
+    async def upsert_summaries(self, summaries):
+        self.rows.extend(summaries)
+
+
+@pytest.mark.asyncio
+async def test_topic_pipeline_drops_duplicates_and_stores_summaries():
+    """Test the fetch, dedup, summarize and store stages end to end."""
+    async def fetch(topic):
+        return [
+            {"url": "https://a", "content": ARTICLE, "published_at": "2024-01-01T00:00:00Z"},
+            {"url": "https://b", "content": ARTICLE.upper()},
+            {"url": "https://c", "content": "An unrelated story about a football match."},
+            {"url": "https://d", "content": ""},
+        ]
+
+    store = MemoryStore()
+    pipeline = TopicPipeline(fetch, SummaryAgent(), BulkIngester(store))
+
+    report = await Scheduler(pipeline.stages).run([TopicJob({"id": "t1"})], run_id="r1")
+
+    assert not report.failed
+    assert set(report.stage_stats()) == {"fetch", "dedup", "summarize", "store"}
+    assert sorted(row["source_url"] for row in store.rows) == ["https://a", "https://c"]
+    first = next(row for row in store.rows if row["source_url"] == "https://a")
+    assert first["topic_id"] == "t1"
+    assert first["created_at"] == "2024-01-01T00:00:00Z"
+    assert first["metadata"]["run_id"] == "r1"
+
+
+
+class FlakyStore(MemoryStore):
+    """Store whose first ``failures`` upserts raise."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    async def upsert_summaries(self, summaries):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        await super().upsert_summaries(summaries)
+
+
+async def _fetch_two(topic):
+    return [
+        {"url": "https://a", "content": ARTICLE},
+        {"url": "https://c", "content": "An unrelated story about a football match."},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_seen_articles_are_skipped_on_later_runs(tmp_path):
+    """Test that stored articles are remembered across runs and restarts."""
+    store = MemoryStore()
+    pipeline = TopicPipeline(_fetch_two, SummaryAgent(), BulkIngester(store), index_dir=tmp_path)
+    await Scheduler(pipeline.stages).run([TopicJob({"id": "t1"})], run_id="day1")
+    assert len(store.rows) == 2
+
+    restarted = TopicPipeline(_fetch_two, SummaryAgent(), BulkIngester(store), index_dir=tmp_path)
+    await Scheduler(restarted.stages).run([TopicJob({"id": "t1"})], run_id="day2")
+
+    assert len(store.rows) == 2
+    assert (tmp_path / "t1.npz").exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_store_leaves_articles_for_retry():
+    """Test that a retried job summarizes the articles whose store failed."""
+    store = FlakyStore(failures=1)
+    pipeline = TopicPipeline(
+        _fetch_two, SummaryAgent(), BulkIngester(store, max_retries=0, base_delay=0)
+    )
+
+    report = await Scheduler(pipeline.stages, max_attempts=2).run([TopicJob({"id": "t1"})])
+
+    assert not report.failed
+    assert sorted(row["source_url"] for row in store.rows) == ["https://a", "https://c"]
@@ -0,0 +1,251 @@
+import asyncio
+import os
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from topic_insights.agents.batch import run_bounded
+from topic_insights.pipeline.ingest import BulkIngester
+from topic_insights.scheduler.jobs import DEAD, DONE, QUEUED, RUNNING, Job, JobQueue
+from topic_insights.scheduler.stages import (
+    TopicPipeline,
+    enqueue_summarize_jobs,
+    summarize_job_handler,
+)
+from topic_insights.scheduler.worker import PermanentJobError, Worker
+
+
+class MemoryJobQueue:
+    """In-process stand-in for the jobs table with the same lease semantics."""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def enqueue(self, kind, payloads, dedupe_keys=None, priority=0, max_attempts=3, **kwargs):
+        ids = []
+        for payload in payloads:
+            job_id = str(uuid.uuid4())
+            self.rows[job_id] = {
+                "id": job_id, "kind": kind, "payload": payload, "status": QUEUED,
+                "attempts": 0, "max_attempts": max_attempts, "run_after": 0.0,
+                "locked_by": None, "lease": 0.0, "error": None,
+            }
+            ids.append(job_id)
+        return ids
+
+    async def dequeue(self, worker_id, limit=10, lease_seconds=60, kinds=None):
+        now = time.monotonic()
+        leased = []
+        for row in self.rows.values():
+            ready = row["status"] == QUEUED and row["run_after"] <= now
+            expired = row["status"] == RUNNING and row["lease"] < now
+            if (ready or expired) and (not kinds or row["kind"] in kinds) and len(leased) < limit:
+                row.update(status=RUNNING, locked_by=worker_id, lease=now + lease_seconds)
+                row["attempts"] += 1
+                leased.append(Job.from_row(row))
+        return leased
+
+    async def heartbeat(self, worker_id, job_ids, lease_seconds=60):
+        held = {i for i in job_ids if self.rows[i]["locked_by"] == worker_id}
+        for job_id in held:
+            self.rows[job_id]["lease"] = time.monotonic() + lease_seconds
+        return held
+
+    async def complete(self, worker_id, job_ids):
+        completed = 0
+        for job_id in job_ids:
+            if self.rows[job_id]["locked_by"] == worker_id:
+                self.rows[job_id].update(status=DONE, locked_by=None)
+                completed += 1
+        return completed
+
+    async def fail(self, worker_id, job_id, error, base_delay=5.0, max_delay=3600.0, retry=True):
+        row = self.rows[job_id]
+        row["status"] = QUEUED if retry and row["attempts"] < row["max_attempts"] else DEAD
+        row.update(error=error, locked_by=None, run_after=time.monotonic() + base_delay)
+        return row["status"]
+
+    def statuses(self):
+        return sorted(row["status"] for row in self.rows.values())
+
+
+@pytest.mark.asyncio
+async def test_workers_share_queue_without_duplicate_processing():
+    """Test that several workers drain one queue, each job handled once."""
+    queue = MemoryJobQueue()
+    await queue.enqueue("summarize", [{"n": i} for i in range(50)])
+    handled = []
+
+    async def handler(payload):
+        await asyncio.sleep(0.001)
+        handled.append(payload["n"])
+
+    workers = [Worker(queue, {"summarize": handler}, batch_size=8) for _ in range(3)]
+    stats = await asyncio.gather(*(w.run(stop_when_empty=True) for w in workers))
+
+    assert sorted(handled) == list(range(50))
+    assert sum(s.succeeded for s in stats) == 50
+    assert queue.statuses() == [DONE] * 50
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_retried_then_dead_lettered():
+    """Test backoff retries, permanent failures and dead-lettering."""
+    queue = MemoryJobQueue()
+    await queue.enqueue("flaky", [{}], max_attempts=2)
+    await queue.enqueue("broken", [{}], max_attempts=5)
+
+    async def flaky(payload):
+        raise RuntimeError("upstream 503")
+
+    async def broken(payload):
+        raise PermanentJobError("invalid payload")
+
+    worker = Worker(queue, {"flaky": flaky, "broken": broken}, retry_base_delay=0)
+    stats = await worker.run(stop_when_empty=True)
+
+    assert stats.retried == 1
+    assert stats.dead == 2
+    assert queue.statuses() == [DEAD, DEAD]
+    assert all("Error" in row["error"] for row in queue.rows.values())
+
+
+def test_zero_concurrency_is_rejected():
+    """Test that concurrency=0 is an error rather than the batch-size default."""
+    assert Worker(MemoryJobQueue(), {}, batch_size=4).concurrency == 4
+    with pytest.raises(ValueError):
+        Worker(MemoryJobQueue(), {}, concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_cancels_handler():
+    """Test that a job re-leased by another worker is abandoned, not completed."""
+    queue = MemoryJobQueue()
+    [job_id] = await queue.enqueue("slow", [{}])
+    cancelled = asyncio.Event()
+
+    async def slow(payload):
+        queue.rows[job_id]["locked_by"] = "another-worker"
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    worker = Worker(queue, {"slow": slow}, heartbeat_interval=0.01)
+    await worker.run_batch()
+
+    assert cancelled.is_set()
+    assert worker.stats.lost_leases == 1
+    assert queue.rows[job_id]["status"] == RUNNING
+
+
+@pytest.mark.asyncio
+async def test_job_finished_after_lost_lease_is_not_counted():
+    """Test that a job completed by its new owner is not counted as succeeded here."""
+    queue = MemoryJobQueue()
+    [job_id] = await queue.enqueue("fast", [{}])
+
+    async def fast(payload):
+        # Re-leased between heartbeats; this worker still finishes the handler.
+        queue.rows[job_id]["locked_by"] = "another-worker"
+
+    worker = Worker(queue, {"fast": fast})
+    await worker.run_batch()
+
+    assert worker.stats.succeeded == 0
+    assert worker.stats.lost_leases == 1
+    assert queue.rows[job_id]["status"] == RUNNING
+
+
+@pytest.mark.asyncio
+async def test_job_queue_rpc_parameters():
+    """Test that the queue client maps calls onto the SQL functions."""
+    client = MagicMock()
+    client.rpc.return_value.execute = AsyncMock(
+        return_value=MagicMock(
+            data=[
+                {
+                    "id": "j1",
+                    "kind": "summarize",
+                    "payload": {"a": 1},
+                    "attempts": 1,
+                    "max_attempts": 5,
+                }
+            ]
+        )
+    )
+    queue = JobQueue(client)
+
+    [job] = await queue.dequeue("w1", limit=4, lease_seconds=30, kinds=["summarize"])
+
+    assert job == Job("j1", "summarize", {"a": 1}, 1, 5)
+    client.rpc.assert_called_with(
+        "dequeue_jobs",
+        {"p_worker": "w1", "p_limit": 4, "p_lease_seconds": 30, "p_kinds": ["summarize"]},
+    )
+
+    await queue.enqueue("summarize", [{"a": 1}, {"a": 2}], dedupe_keys=["k1", None])
+    jobs = client.rpc.call_args.args[1]["p_jobs"]
+    assert [job.get("dedupe_key") for job in jobs] == ["k1", None]
+
+
+@pytest.mark.asyncio
+async def test_summarize_jobs_round_trip_through_queue():
+    """Test that enqueued article batches are summarized and stored by the handler."""
+    class EchoAgent:
+        def summarize_many(self, contents, max_length=None, concurrency=None):
+            async def summarize(content):
+                return content.upper()
+
+            return run_bounded(summarize, contents, 4)
+
+    class MemoryStore:
+        rows = []
+
+        async def upsert_summaries(self, summaries):
+            self.rows.extend(summaries)
+
+    queue = MemoryJobQueue()
+    articles = [{"url": f"https://example.com/{i}", "content": f"Story {i}"} for i in range(5)]
+    await enqueue_summarize_jobs(queue, "t1", articles, run_id="r1", batch_size=2)
+
+    store = MemoryStore()
+    pipeline = TopicPipeline(None, EchoAgent(), BulkIngester(store))
+    stats = await Worker(queue, {"summarize": summarize_job_handler(pipeline)}).run(
+        stop_when_empty=True
+    )
+
+    assert stats.succeeded == 3
+    assert sorted(row["source_url"] for row in store.rows) == [a["url"] for a in articles]
+    assert {row["content"] for row in store.rows} == {f"STORY {i}" for i in range(5)}
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_SUPABASE_URL"),
+    reason="set TEST_SUPABASE_URL and TEST_SUPABASE_KEY to run against a local Supabase",
+)
+@pytest.mark.asyncio
+async def test_job_queue_against_postgres():
+    """Test enqueue, concurrent dequeue and settlement on a real jobs table."""
+    from supabase import AsyncClient
+
+    client = AsyncClient(os.environ["TEST_SUPABASE_URL"], os.environ["TEST_SUPABASE_KEY"])
+    queue = JobQueue(client)
+    kind = f"test-{uuid.uuid4().hex[:8]}"
+    keys = [f"{kind}:{i}" for i in range(20)]
+    await queue.enqueue(kind, [{"n": i} for i in range(20)], dedupe_keys=keys)
+    assert await queue.enqueue(kind, [{"n": 0}], dedupe_keys=[f"{kind}:0"]) == []
+
+    handled = []
+
+    async def handler(payload):
+        handled.append(payload["n"])
+
+    workers = [Worker(queue, {kind: handler}, batch_size=5) for _ in range(3)]
+    await asyncio.gather(*(w.run(stop_when_empty=True) for w in workers))
+
+    assert sorted(handled) == list(range(20))
+    assert (await queue.stats())[kind] == {DONE: 20}
@@ -0,0 +1,160 @@
+import numpy as np
+
+from topic_insights.search.hybrid import hybrid_topic_search, reciprocal_rank_fusion
+from topic_insights.search.text_index import TextIndex, tokenize
+from topic_insights.search.vector_index import VectorIndex
+
+
+def _index(**kwargs):
+    index = TextIndex(**kwargs)
+    index.add_topic({"id": "t1", "name": "Climate change", "keywords": ["warming"]})
+    index.add_topic({"id": "t2", "name": "Quantum computing", "keywords": ["qubits"]})
+    index.add_summary(
+        {
+            "id": "s1",
+            "topic_id": "t1",
+            "content": "Sea level rise is accelerating as ice sheets melt.",
+            "key_concepts": ["sea level", "ice sheets"],
+        }
+    )
+    index.add_summary(
+        {
+            "id": "s2",
+            "topic_id": "t2",
+            "content": "A new error correction scheme keeps qubits stable at sea.",
+            "key_concepts": ["error correction"],
+        }
+    )
+    return index
+
+
+def test_tokenize():
+    """Test that text is split into lowercased word tokens."""
+    assert tokenize("Sea-level RISE, 2024!") == ["sea", "level", "rise", "2024"]
+    assert tokenize(None) == []
+
+
+def test_search_ranks_matching_documents():
+    """Test that keyword queries return scored documents best-first."""
+    index = _index()
+
+    results = index.search("qubits error")
+
+    assert results[0]["doc_id"] == "summary:s2"
+    assert {r["doc_id"] for r in results} == {"summary:s2", "topic:t2"}
+    assert results[0]["score"] >= results[-1]["score"] > 0
+
+
+def test_name_field_outweighs_content():
+    """Test that a match in a topic name beats the same match in summary text."""
+    index = TextIndex()
+    index.add_topic({"id": "t1", "name": "Fusion energy"})
+    index.add_summary({"id": "s1", "topic_id": "t2", "content": "Fusion energy news today"})
+
+    assert index.search("fusion")[0]["doc_id"] == "topic:t1"
+
+
+def test_prefix_query():
+    """Test that ``term*`` matches every term with that prefix."""
+    index = _index()
+
+    assert [r["doc_id"] for r in index.search("acceler*")] == ["summary:s1"]
+    assert {r["doc_id"] for r in index.search("qu*")} == {"topic:t2", "summary:s2"}
+
+
+def test_phrase_query_requires_adjacent_terms():
+    """Test that quoted phrases only match terms in order and within one field."""
+    index = _index()
+
+    assert [r["doc_id"] for r in index.search('"sea level"')] == ["summary:s1"]
+    assert index.search('"level sea"') == []
+    # "stable at sea" ends the content of s2, and "error" starts its key concepts.
+    assert index.search('"sea error"') == []
+
+
+def test_filters():
+    """Test that results can be limited to one kind or topic."""
+    index = _index()
+
+    assert [r["doc_id"] for r in index.search("qubits", kind="topic")] == ["topic:t2"]
+    assert [r["doc_id"] for r in index.search("sea", topic_id="t2")] == ["summary:s2"]
+
+
+def test_search_topics_aggregates_summaries():
+    """Test that topics are ranked by their best document, including summaries."""
+    index = _index()
+
+    results = index.search_topics("ice melt")
+
+    assert [r["topic_id"] for r in results] == ["t1"]
+
+
+def test_update_and_remove():
+    """Test that re-adding a document replaces it and removal drops its terms."""
+    index = _index()
+    index.add_summary({"id": "s1", "topic_id": "t1", "content": "Glaciers retreat"})
+
+    assert index.search("accelerating") == []
+    assert [r["doc_id"] for r in index.search("glaciers")] == ["summary:s1"]
+
+    index.remove("summary:s1")
+
+    assert index.search("glaciers") == []
+    assert index.search("glac*") == []
+    assert "summary:s1" not in index
+    assert len(index) == 3
+
+
+def test_on_change_applies_realtime_events():
+    """Test that change events insert, update and delete documents."""
+    index = _index()
+
+    index.on_change("summaries", "INSERT", {"id": "s3", "topic_id": "t1", "content": "Drought"})
+    index.on_change("topics", "UPDATE", {"id": "t2", "name": "Qubit hardware", "is_active": True})
+    assert [r["doc_id"] for r in index.search("drought")] == ["summary:s3"]
+    assert [r["doc_id"] for r in index.search("hardware")] == ["topic:t2"]
+
+    index.on_change("summaries", "DELETE", {"id": "s3"})
+    index.on_change("topics", "UPDATE", {"id": "t2", "name": "Qubit hardware", "is_active": False})
+    index.on_change("jobs", "INSERT", {"id": "j1", "content": "ignored"})
+
+    assert index.search("drought") == []
+    assert index.search("hardware") == []
+    assert "jobs:j1" not in index
+
+
+def test_save_and_open_round_trip(tmp_path):
+    """Test that a reopened index answers queries identically."""
+    index = _index(path=tmp_path / "text.npz", weights={"name": 5.0})
+    index.remove("topic:t1")
+    index.save()
+
+    reopened = TextIndex.open(tmp_path / "text.npz")
+
+    assert len(reopened) == len(index)
+    assert reopened.weights == index.weights
+    for query in ["sea", '"sea level"', "qu*", "error correction"]:
+        assert reopened.search(query) == index.search(query)
+
+
+def test_reciprocal_rank_fusion():
+    """Test that items ranked well by several lists win."""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a"], ["b"]], k=1)
+
+    assert [item["id"] for item in fused] == ["b", "a", "c"]
+
+
+def test_hybrid_topic_search():
+    """Test that text and vector rankings are fused per topic."""
+    index = _index()
+    vectors = VectorIndex(dim=2)
+    vectors.add(["e1", "e2", "e3"], ["t2", "t2", "t3"], np.array([[1, 0], [0.9, 0.1], [0, 1]]))
+
+    results = hybrid_topic_search(index, vectors, "sea", embedding=[1, 0])
+
+    assert [r["topic_id"] for r in results][:1] == ["t2"]
+    by_topic = {r["topic_id"]: r for r in results}
+    assert set(by_topic) == {"t1", "t2", "t3"}
+    assert by_topic["t3"]["text_score"] is None
+    assert by_topic["t1"]["similarity"] is None
+    assert by_topic["t2"]["similarity"] == max(r["similarity"] for r in vectors.search([1, 0]))
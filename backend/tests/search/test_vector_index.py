@@ -0,0 +1,184 @@
+import numpy as np
+import pytest
+
+from topic_insights.search.vector_index import VectorIndex
+
+DIM = 16
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def _brute_force(vectors, query, k):
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    return list(np.argsort(-scores)[:k])
+
+
+def _filled_index(n, **kwargs):
+    vectors = _vectors(n)
+    index = VectorIndex(dim=DIM, **kwargs)
+    index.add(
+        [f"e{i}" for i in range(n)],
+        [f"t{i}" for i in range(n)],
+        vectors,
+        [{"i": i} for i in range(n)],
+    )
+    return index, vectors
+
+
+def test_exact_search_matches_brute_force():
+    """Test that exact search returns the true top-k in order."""
+    index, vectors = _filled_index(500)
+    query = _vectors(1, seed=1)[0]
+
+    results = index.search(query, limit=5)
+
+    assert [r["metadata"]["i"] for r in results] == _brute_force(vectors, query, 5)
+    assert results[0]["similarity"] >= results[-1]["similarity"]
+    assert set(results[0]) == {"topic_id", "similarity", "metadata"}
+
+
+def test_search_applies_threshold():
+    """Test that only similarities above the threshold are returned."""
+    index, vectors = _filled_index(50)
+
+    results = index.search(vectors[3], limit=10, threshold=0.99)
+
+    assert [r["topic_id"] for r in results] == ["t3"]
+
+
+def test_search_batch():
+    """Test that batch queries return one result list per query."""
+    index, vectors = _filled_index(100)
+
+    results = index.search_batch(vectors[:3], limit=1)
+
+    assert [r[0]["topic_id"] for r in results] == ["t0", "t1", "t2"]
+
+
+def test_remove_topic_hides_vectors():
+    """Test that removed vectors are not returned."""
+    index, vectors = _filled_index(20)
+    index.remove_topic("t4")
+
+    assert len(index) == 19
+    assert index.search(vectors[4], limit=1)[0]["topic_id"] != "t4"
+
+
+def test_ivf_search_has_high_recall():
+    """Test that IVF search finds most of the exact top-k."""
+    index, vectors = _filled_index(3000, ivf_threshold=1000, nlist=20, nprobe=6)
+    assert index.uses_ivf
+
+    recall = []
+    for query in _vectors(20, seed=2):
+        truth = set(_brute_force(vectors, query, 10))
+        found = {r["metadata"]["i"] for r in index.search(query, limit=10)}
+        recall.append(len(truth & found) / 10)
+
+    assert np.mean(recall) >= 0.6
+
+
+def test_ivf_keeps_incremental_inserts_searchable():
+    """Test that vectors added after clustering are assigned to a list."""
+    index, _ = _filled_index(1000, ivf_threshold=1000, nlist=10, nprobe=10)
+    extra = _vectors(1, seed=3)
+    index.add(["new"], ["t-new"], extra)
+
+    assert index.search(extra[0], limit=1)[0]["topic_id"] == "t-new"
+
+
+def test_save_and_open_memory_mapped(tmp_path):
+    """Test that a saved index reopens with its vectors and cursor."""
+    index, vectors = _filled_index(1500, path=tmp_path / "index")
+    index.cursor = ("2024-01-01T00:00:00+00:00", "e1499")
+    index.save()
+
+    reopened = VectorIndex.open(tmp_path / "index")
+
+    assert isinstance(reopened._vectors, np.memmap)
+    assert len(reopened) == 1500
+    assert reopened.cursor == ("2024-01-01T00:00:00+00:00", "e1499")
+    assert reopened.search(vectors[1200], limit=1)[0]["topic_id"] == "t1200"
+
+
+class FakeSource:
+    """Serves topic_embeddings rows in keyset pages."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def get_embeddings_page(self, after=None, limit=1000):
+        self.calls.append(after)
+        keys = [(r["created_at"], r["id"]) for r in self.rows]
+        start = 0 if after is None else keys.index(tuple(after)) + 1
+        return self.rows[start : start + limit]
+
+
+@pytest.mark.asyncio
+async def test_sync_is_incremental():
+    """Test that sync pulls pages and resumes from the cursor."""
+    vectors = _vectors(25)
+    rows = [
+        {
+            "id": f"e{i:02d}",
+            "topic_id": f"t{i}",
+            "embedding": "[" + ",".join(map(str, v.tolist())) + "]",
+            "metadata": {},
+            "created_at": f"2024-01-01T00:00:{i:02d}+00:00",
+        }
+        for i, v in enumerate(vectors)
+    ]
+    source = FakeSource(rows[:20])
+    index = VectorIndex(dim=DIM)
+
+    assert await index.sync(source, batch_size=8) == 20
+    source.rows = rows
+    assert await index.sync(source, batch_size=8) == 5
+
+    assert len(index) == 25
+    assert index.cursor == (rows[-1]["created_at"], "e24")
+
+
+def test_on_change_applies_embedding_and_topic_changes():
+    """Test that realtime changes update, remove and flag stale rows."""
+    index, vectors = _filled_index(3)
+
+    moved = {"id": "e0", "topic_id": "t0", "embedding": vectors[1].tolist()}
+    index.on_change("topic_embeddings", "UPDATE", moved)
+    assert [hit["topic_id"] for hit in index.search(vectors[1], limit=2)] == ["t0", "t1"]
+
+    index.on_change("topic_embeddings", "DELETE", {"id": "e1"})
+    index.on_change("topics", "UPDATE", {"id": "t2", "is_active": False})
+    assert len(index) == 1
+    assert not index.stale
+
+    index.on_change("topics", "UPDATE", {"id": "t2", "is_active": True})
+    assert index.stale
+
+
+@pytest.mark.asyncio
+async def test_rebuild_reloads_rows_and_clears_stale():
+    """Test that rebuild drops removed rows and resets the stale flag."""
+    rows = [
+        {
+            "id": f"e{i}",
+            "topic_id": f"t{i}",
+            "embedding": v.tolist(),
+            "metadata": {},
+            "created_at": f"2024-01-01T00:00:0{i}+00:00",
+        }
+        for i, v in enumerate(_vectors(3))
+    ]
+    index = VectorIndex(dim=DIM)
+    await index.sync(FakeSource(rows))
+    index.remove_topic("t0")
+    index.stale = True
+
+    assert await index.rebuild(FakeSource(rows[1:])) == 2
+    assert len(index) == 2
+    assert "e0" not in index.ids
+    assert not index.stale
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from services.supabase.cache import AsyncTTLCache
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_caches_values():
+    """Test that a second await returns the cached value without reloading."""
+    cache = AsyncTTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return {"id": 1}
+
+    assert await cache.get_or_load(1, loader) == {"id": 1}
+    assert await cache.get_or_load(1, loader) == {"id": 1}
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    """Test single-flight: concurrent misses for one key run one query."""
+    cache = AsyncTTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "topic"
+
+    results = await asyncio.gather(*(cache.get_or_load("t1", loader) for _ in range(10)))
+
+    assert results == ["topic"] * 10
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_shared_and_not_cached():
+    """Test that a loader error reaches every waiter and is not cached."""
+    cache = AsyncTTLCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(
+        cache.get_or_load("t1", failing), cache.get_or_load("t1", failing), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert "t1" not in cache
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_fail_waiters():
+    """Test that cancelling the caller that started a load leaves it running for others."""
+    cache = AsyncTTLCache()
+    started = asyncio.Event()
+
+    async def loader():
+        started.set()
+        await asyncio.sleep(0.01)
+        return "topic"
+
+    leader = asyncio.create_task(cache.get_or_load("t1", loader))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_load("t1", loader))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "topic"
+    assert leader.cancelled()
+    assert "t1" in cache
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry():
+    """Test that entries expire after the TTL."""
+    cache = AsyncTTLCache(ttl=0.01)
+
+    async def loader():
+        return "value"
+
+    await cache.get_or_load("k", loader)
+    await asyncio.sleep(0.02)
+
+    assert "k" not in cache
+
+
+@pytest.mark.asyncio
+async def test_lru_bound():
+    """Test that the least recently used entry is evicted at maxsize."""
+    cache = AsyncTTLCache(maxsize=2)
+
+    async def value(v):
+        return v
+
+    await cache.get_or_load("a", lambda: value(1))
+    await cache.get_or_load("b", lambda: value(2))
+    await cache.get_or_load("a", lambda: value(1))
+    await cache.get_or_load("c", lambda: value(3))
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_discards_result():
+    """Test that a load racing an invalidation does not repopulate stale data."""
+    cache = AsyncTTLCache()
+    started = asyncio.Event()
+
+    async def slow_loader():
+        started.set()
+        await asyncio.sleep(0.01)
+        return "stale"
+
+    task = asyncio.create_task(cache.get_or_load("t1", slow_loader))
+    await started.wait()
+    cache.invalidate("t1")
+
+    assert await task == "stale"
+    assert "t1" not in cache
+
+
+@pytest.mark.asyncio
+async def test_miss_after_invalidation_starts_fresh_load():
+    """Test that a caller arriving after a write does not join the pre-write load."""
+    cache = AsyncTTLCache()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def blocked_loader():
+        started.set()
+        await release.wait()
+        return "stale"
+
+    async def fresh_loader():
+        return "fresh"
+
+    old = asyncio.create_task(cache.get_or_load("t1", blocked_loader))
+    await started.wait()
+    cache.invalidate("t1")
+
+    assert await cache.get_or_load("t1", fresh_loader) == "fresh"
+    release.set()
+    assert await old == "stale"
+    assert await cache.get_or_load("t1", blocked_loader) == "fresh"
+
+
+def test_invalidate_where():
+    """Test predicate-based eviction."""
+    cache = AsyncTTLCache()
+    cache._store(("t1", None), [1])
+    cache._store(("t1", "2024"), [2])
+    cache._store(("t2", None), [3])
+
+    assert cache.invalidate_where(lambda key: key[0] == "t1") == 2
+    assert len(cache) == 1
@@ -0,0 +1,346 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import numpy as np
+import pytest
+
+from services.supabase.client import SupabaseConfig, SupabaseService
+from topic_insights.search.text_index import TextIndex
+from topic_insights.search.vector_index import VectorIndex
+
+
+def _service(**kwargs) -> SupabaseService:
+    return SupabaseService(
+        SupabaseConfig(url="http://localhost", key="test-key"), client=MagicMock(), **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_similar_falls_back_to_rpc():
+    """Test that the RPC is used when no local index is populated."""
+    service = _service(vector_index=VectorIndex(dim=4))
+    service.client.rpc.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=[{"topic_id": "t1", "similarity": 0.9, "metadata": {}}])
+    )
+
+    results = await service.search_similar([1.0, 0.0, 0.0, 0.0], limit=3)
+
+    assert results[0]["topic_id"] == "t1"
+    service.client.rpc.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_search_similar_uses_local_index():
+    """Test that a populated local index serves searches without the RPC."""
+    index = VectorIndex(dim=4)
+    index.add(["e1", "e2"], ["t1", "t2"], np.eye(4)[:2])
+    service = _service(vector_index=index)
+
+    results = await service.search_similar([0.0, 1.0, 0.0, 0.0], limit=1, threshold=0.5)
+
+    assert results == [{"topic_id": "t2", "similarity": pytest.approx(1.0), "metadata": {}}]
+    service.client.rpc.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_similar_skips_stale_index():
+    """Test that a stale local index defers to the RPC."""
+    index = VectorIndex(dim=4)
+    index.add(["e1"], ["t1"], np.eye(4)[:1])
+    index.stale = True
+    service = _service(vector_index=index)
+    service.client.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=[]))
+
+    assert await service.search_similar_batch([[1.0, 0.0, 0.0, 0.0]]) == [[]]
+    service.client.rpc.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_vector_index_follows_writes_and_deletes():
+    """Test that stored embeddings, deleted topics and realtime rows reach the index."""
+    index = VectorIndex(dim=4)
+    service = _service(vector_index=index)
+    service.client.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=["e1"]))
+    conn = MagicMock(execute=AsyncMock())
+    service.client.postgrest.connection.return_value.__aenter__ = AsyncMock(return_value=conn)
+    service.client.postgrest.connection.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    await service.store_embeddings_batch([{"topic_id": "t1", "embedding": [1.0, 0, 0, 0]}])
+    record = {"id": "e2", "topic_id": "t2", "embedding": "[0,1,0,0]"}
+    await service._handle_embedding_changes({"data": {"type": "INSERT", "record": record}})
+    assert len(index) == 2
+
+    await service.delete_topic("t1")
+    results = await service.search_similar([1.0, 0.0, 0.0, 0.0], threshold=-1)
+    assert [hit["topic_id"] for hit in results] == ["t2"]
+
+
+@pytest.mark.asyncio
+async def test_store_embeddings_batch_chunks_rows():
+    """Test that rows are sent in chunks through the set-returning RPC."""
+    service = _service()
+    service.client.rpc.return_value.execute = AsyncMock(
+        side_effect=[MagicMock(data=["id1", "id2"]), MagicMock(data=["id3"])]
+    )
+    rows = [{"topic_id": f"t{i}", "embedding": [0.5, 1.0]} for i in range(3)]
+
+    ids = await service.store_embeddings_batch(rows, chunk_size=2)
+
+    assert ids == ["id1", "id2", "id3"]
+    assert service.client.rpc.call_count == 2
+    name, params = service.client.rpc.call_args_list[0].args
+    assert name == "store_embeddings_batch"
+    assert params["p_rows"][0] == {"topic_id": "t0", "embedding": "[0.5,1.0]", "metadata": {}}
+
+
+@pytest.mark.asyncio
+async def test_get_topic_is_cached_and_invalidated_by_realtime():
+    """Test that topic reads hit the cache until a realtime change evicts them."""
+    service = _service()
+    execute = AsyncMock(return_value=MagicMock(data={"id": "t1", "name": "AI"}))
+    service.client.table.return_value.select.return_value.eq.return_value \
+        .single.return_value.execute = execute
+
+    assert await service.get_topic("t1") == {"id": "t1", "name": "AI"}
+    assert await service.get_cached_topic("t1") == {"id": "t1", "name": "AI"}
+    assert execute.call_count == 1
+
+    await service._handle_summary_changes(
+        {"data": {"type": "INSERT", "record": {"id": "s1", "topic_id": "t1"}}}
+    )
+    await service.get_topic("t1")
+    assert execute.call_count == 2
+
+    await service._handle_topic_changes({"new": {"id": "t1"}, "old": {}})
+    await service.get_topic("t1")
+    assert execute.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_read_during_update_is_not_left_cached():
+    """Test that a read racing a topic update does not keep the old row cached."""
+    service = _service()
+    service.client.table.return_value.select.return_value.eq.return_value \
+        .single.return_value.execute = AsyncMock(return_value=MagicMock(data={"name": "old"}))
+
+    async def write():
+        # A concurrent request reads the topic while the update is in flight.
+        await service.get_topic("t1")
+        return MagicMock(data=[{"name": "new"}])
+
+    service.client.table.return_value.update.return_value.eq.return_value.execute = write
+
+    await service.update_topic("t1", {"name": "new"})
+
+    assert "t1" not in service.topic_cache
+
+
+@pytest.mark.asyncio
+async def test_realtime_changes_reach_listeners():
+    """Test that realtime payloads are forwarded to change listeners."""
+    service = _service()
+    received = []
+    service.add_change_listener(lambda table, event_type, record: received.append(
+        (table, event_type, record["id"])
+    ))
+
+    await service._handle_summary_changes(
+        {"data": {"type": "DELETE", "record": None, "old_record": {"id": "s1", "topic_id": "t1"}}}
+    )
+
+    assert received == [("summaries", "DELETE", "s1")]
+
+
+def test_service_builds_async_client_with_shared_pool():
+    """Test that the service uses an async client on the given HTTP pool."""
+    http_client = httpx.AsyncClient()
+    service = SupabaseService(
+        SupabaseConfig(url="http://localhost:54321", key="test-key"), http_client=http_client
+    )
+
+    assert service.client.options.httpx_client is http_client
+    assert service.client.postgrest.session is http_client
+
+
+@pytest.mark.asyncio
+async def test_iter_topic_summaries_follows_keyset_cursor():
+    """Test that summaries are streamed page by page using the last row as cursor."""
+    rows = [{"id": f"s{i}", "created_at": f"2024-01-0{i + 1}T00:00:00+00:00"} for i in range(5)]
+    service = _service()
+
+    async def page(topic_id, after=None, limit=1000, **kwargs):
+        start = 0 if after is None else [r["id"] for r in rows].index(after[1]) + 1
+        return rows[start : start + limit]
+
+    service.get_summaries_page = AsyncMock(side_effect=page)
+
+    streamed = [row async for row in service.iter_topic_summaries("t1", page_size=2)]
+
+    assert streamed == rows
+    cursors = [call.kwargs["after"] for call in service.get_summaries_page.call_args_list]
+    assert cursors == [
+        None,
+        ("2024-01-02T00:00:00+00:00", "s1"),
+        ("2024-01-04T00:00:00+00:00", "s3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_page_applies_cursor_filter():
+    """Test that a cursor becomes a (created_at, id) row comparison."""
+    service = _service()
+    query = MagicMock()
+    for method in ("select", "eq", "order", "limit", "or_"):
+        getattr(query, method).return_value = query
+    query.execute = AsyncMock(return_value=MagicMock(data=[]))
+    service.client.table.return_value = query
+
+    await service.get_summaries_page("t1", after=("2024-01-01T00:00:00", "s9"), descending=True)
+
+    query.or_.assert_called_once_with(
+        'created_at.lt."2024-01-01T00:00:00",and(created_at.eq."2024-01-01T00:00:00",id.lt.s9)'
+    )
+
+
+@pytest.mark.asyncio
+async def test_upsert_summaries_conflicts_on_source_url():
+    """Test that summaries are upserted on (topic_id, source_url) and caches dropped."""
+    service = _service()
+    upsert = service.client.table.return_value.upsert
+    upsert.return_value.execute = AsyncMock()
+    service.summaries_cache._store(("t1", None, None, 10), [])
+
+    await service.upsert_summaries([{"topic_id": "t1", "source_url": "https://a", "content": "x"}])
+
+    assert upsert.call_args.kwargs["on_conflict"] == "topic_id,source_url"
+    assert upsert.call_args.kwargs["default_to_null"] is False
+    assert len(service.summaries_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cleanup_old_data_drops_partitions_then_deletes_in_batches():
+    """Test that retention drops old partitions and deletes leftovers in batches."""
+    service = _service()
+    responses = {
+        "drop_summary_partitions": [MagicMock(data=["summaries_p20240101"])],
+        "delete_summaries_before": [MagicMock(data=100), MagicMock(data=100), MagicMock(data=7)],
+    }
+    calls = []
+
+    def rpc(name, params):
+        calls.append((name, params))
+        builder = MagicMock()
+        builder.execute = AsyncMock(return_value=responses[name].pop(0))
+        return builder
+
+    service.client.rpc.side_effect = rpc
+
+    result = await service.cleanup_old_data(days=30, batch_size=100)
+
+    assert result == {
+        "partitions_dropped": ["summaries_p20240101"],
+        "rows_deleted": 207,
+        "batches": 3,
+    }
+    names = [name for name, _ in calls]
+    assert names == ["drop_summary_partitions"] + ["delete_summaries_before"] * 3
+    assert calls[1][1]["p_batch_size"] == 100
+
+
+@pytest.mark.asyncio
+async def test_topic_rollups_are_cached_until_topic_changes():
+    """Test that rollup reads are bounded by day and invalidated with the topic."""
+    service = _service()
+    rows = [{"topic_id": "t1", "day": "2024-05-02", "summary_count": 3}]
+    query = service.client.table.return_value.select.return_value.eq.return_value \
+        .gte.return_value.order.return_value.limit
+    query.return_value.execute = AsyncMock(return_value=MagicMock(data=rows))
+
+    assert await service.get_topic_rollups("t1", days=7) == rows
+    assert await service.get_topic_rollups("t1", days=7) == rows
+    assert query.call_args.args == (7,)
+    service.client.table.assert_called_with("topic_daily_rollups")
+
+    service.invalidate_topic("t1")
+    await service.get_topic_rollups("t1", days=7)
+    assert query.return_value.execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_topic_summary_calls_rollup_rpc():
+    """Test that the summary RPC receives the window and text limit."""
+    service = _service()
+    row = {"summary_text": "x", "key_concepts": ["ai"], "sentiment": "positive", "source_count": 2}
+    service.client.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=[row]))
+
+    assert await service.get_topic_summary("t1", days_back=30, max_summaries=5) == row
+    service.client.rpc.assert_called_with(
+        "get_topic_summary", {"p_topic_id": "t1", "p_days_back": 30, "p_max_summaries": 5}
+    )
+
+
+@pytest.mark.asyncio
+async def test_partitioned_upsert_includes_partition_key():
+    """Test that partitioned installs upsert on a key that includes created_at."""
+    service = SupabaseService(
+        SupabaseConfig(url="http://localhost", key="test-key", partitioned_summaries=True),
+        client=MagicMock(),
+    )
+    upsert = service.client.table.return_value.upsert
+    upsert.return_value.execute = AsyncMock()
+
+    await service.upsert_summaries([{"topic_id": "t1", "source_url": "https://a", "content": "x"}])
+
+    assert upsert.call_args.kwargs["on_conflict"] == "topic_id,source_url,created_at"
+
+
+@pytest.mark.asyncio
+async def test_search_topics_uses_text_index():
+    """Test that a populated text index ranks topics and only matches are fetched."""
+    index = TextIndex()
+    index.add_topic({"id": "1", "name": "Solar power"})
+    index.add_summary({"id": "s1", "topic_id": "2", "content": "Solar panels and solar farms"})
+    service = _service(text_index=index)
+    query = service.client.table.return_value.select.return_value.in_.return_value
+    query.execute = AsyncMock(return_value=MagicMock(data=[{"id": 2}, {"id": 1}]))
+
+    results = await service.search_topics("solar")
+
+    in_args = service.client.table.return_value.select.return_value.in_.call_args[0]
+    assert in_args[0] == "id" and set(in_args[1]) == {"1", "2"}
+    hits = index.search_topics("solar")
+    assert [row["id"] for row in results] == [int(hit["topic_id"]) for hit in hits]
+
+
+@pytest.mark.asyncio
+async def test_filtered_text_index_search_fetches_past_top_hits():
+    """Test that filters failing on the top-ranked topics do not empty the results."""
+    index = TextIndex()
+    for i in range(10):
+        index.add_topic({"id": str(i), "name": "Solar " * (10 - i) + "power"})
+    service = _service(text_index=index)
+    in_ = service.client.table.return_value.select.return_value.in_
+    in_.return_value.eq.return_value.execute = AsyncMock(
+        side_effect=[MagicMock(data=[]), MagicMock(data=[{"id": 6}, {"id": 5}])]
+    )
+
+    results = await service.search_topics("solar", {"is_active": True}, limit=1)
+
+    assert results == [{"id": 5}]
+    assert [call.args[1] for call in in_.call_args_list] == [
+        ["0", "1", "2", "3"],
+        ["4", "5", "6", "7"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_text_index_follows_realtime_changes():
+    """Test that the service keeps its text index current from change events."""
+    index = TextIndex()
+    service = _service(text_index=index)
+
+    await service._handle_summary_changes(
+        {"data": {"type": "INSERT", "record": {"id": "s1", "topic_id": "1", "content": "Drought"}}}
+    )
+
+    assert "summary:s1" in index
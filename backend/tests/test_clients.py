@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from topic_insights.agents.openai_agent import OpenAIAgent
+from topic_insights.clients import ClientManager, PoolSettings, create_http_client, pool_stats
+from topic_insights.main import app
+
+
+def test_pool_settings_from_env(monkeypatch):
+    """Test that pool limits are read from prefixed environment variables."""
+    monkeypatch.setenv("TEST_POOL_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("TEST_POOL_MAX_KEEPALIVE", "3")
+    monkeypatch.setenv("TEST_POOL_HTTP2", "false")
+
+    settings = PoolSettings.from_env("TEST_POOL")
+
+    assert settings.max_connections == 7
+    assert settings.max_keepalive_connections == 3
+    assert settings.http2 is False
+    assert settings.keepalive_expiry == PoolSettings().keepalive_expiry
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_reports_limits():
+    """Test that pool statistics reflect the configured limits."""
+    settings = PoolSettings(max_connections=4, http2=False)
+    client = create_http_client(settings)
+    try:
+        stats = pool_stats(client, settings)
+    finally:
+        await client.aclose()
+
+    assert stats == {
+        "connections": 0,
+        "active": 0,
+        "idle": 0,
+        "max_connections": 4,
+        "utilization": 0.0,
+        "http2": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_client_manager_shares_openai_client():
+    """Test that the manager opens one OpenAI client that agents borrow."""
+    manager = ClientManager(openai_api_key="test-key", openai_pool=PoolSettings(http2=False))
+    await manager.start()
+    try:
+        assert manager.supabase is None
+        assert manager.stats()["openai"]["connections"] == 0
+
+        agent = OpenAIAgent(client=manager.openai)
+        await agent.initialize()
+        assert agent.client is manager.openai
+        assert agent.api_key == "test-key"
+
+        await agent.cleanup()
+        assert not manager.openai.is_closed()
+    finally:
+        await manager.close()
+    assert manager.openai is None
+    assert manager.stats() == {}
+
+
+def test_lifespan_creates_and_resets_agent(monkeypatch):
+    """Test that the app's agent lives on app.state for the lifespan only."""
+    for name in ("AGENT_CASCADE_POLICY", "OPENAI_SMALL_MODEL", "SUPABASE_URL", "SUPABASE_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    with TestClient(app):
+        assert isinstance(app.state.agent, OpenAIAgent)
+    assert app.state.agent is None
+
+
+def test_missing_agent_returns_503(monkeypatch):
+    """Test that analysis endpoints report an unconfigured agent."""
+    for name in ("AGENT_CASCADE_POLICY", "OPENAI_SMALL_MODEL", "OPENAI_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+
+    with TestClient(app) as client:
+        response = client.post("/api/v1/summarize/stream", json={"content": "text"})
+
+    assert response.status_code == 503
+    assert "OPENAI_API_KEY" in response.json()["detail"]
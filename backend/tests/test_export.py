@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from topic_insights.api.dependencies import get_supabase
+from topic_insights.main import app
+
+ROWS = [
+    {
+        "id": f"s{i}",
+        "topic_id": "t1",
+        "created_at": f"2024-01-0{i + 1}T00:00:00+00:00",
+        "content": f"Summary {i}, with a comma",
+        "metadata": {"rank": i},
+        "key_concepts": ["a", "b"],
+    }
+    for i in range(3)
+]
+
+
+class StubSupabase:
+    """Supabase stub that streams fixed summaries."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def iter_topic_summaries(self, topic_id, **kwargs):
+        self.calls.append((topic_id, kwargs))
+        for row in ROWS:
+            yield row
+
+
+def _client(supabase) -> TestClient:
+    app.dependency_overrides[get_supabase] = lambda: supabase
+    return TestClient(app)
+
+
+def test_export_summaries_ndjson() -> None:
+    """Test that summaries are streamed as one JSON object per line."""
+    supabase = StubSupabase()
+    response = _client(supabase).get(
+        "/api/v1/topics/t1/summaries/export", params={"start_date": "2024-01-01T00:00:00"}
+    )
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in response.text.splitlines()] == ROWS
+    topic_id, kwargs = supabase.calls[0]
+    assert topic_id == "t1"
+    assert kwargs["start_date"].year == 2024
+
+
+def test_export_summaries_csv() -> None:
+    """Test that summaries are streamed as CSV with JSON-encoded nested fields."""
+    response = _client(StubSupabase()).get(
+        "/api/v1/topics/t1/summaries/export", params={"format": "csv"}
+    )
+    app.dependency_overrides.clear()
+
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.headers["content-type"].startswith("text/csv")
+    assert [record["content"] for record in records] == [row["content"] for row in ROWS]
+    assert json.loads(records[1]["metadata"]) == {"rank": 1}
+    assert records[0]["source_url"] == ""
+
+
+def test_export_requires_supabase() -> None:
+    """Test that the export is unavailable without a configured database."""
+    response = TestClient(app).get("/api/v1/topics/t1/summaries/export")
+
+    assert response.status_code == 503
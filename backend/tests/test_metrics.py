@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from openai import InternalServerError
+
+from services.supabase.client import SupabaseConfig, SupabaseService
+from topic_insights.agents.cache import ResponseCache
+from topic_insights.agents.openai_agent import OpenAIAgent
+from topic_insights.clients import ClientManager, PoolSettings
+from topic_insights.main import app
+from topic_insights.metrics import (
+    AGENT_COST,
+    AGENT_LATENCY,
+    AGENT_REQUESTS,
+    AGENT_TOKENS,
+    CACHE_HIT_RATIO,
+    DB_ERRORS,
+    DB_LATENCY,
+    RETRIES,
+    Registry,
+    estimate_cost,
+)
+
+
+def test_registry_renders_prometheus_text():
+    """Test the exposition format of counters, gauges and histograms."""
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs.", ["queue"]).inc(2, queue='a"b')
+    registry.gauge("depth", "Depth.").set(3)
+    histogram = registry.histogram("latency_seconds", "Latency.", ["op"], buckets=[0.1, 1])
+    histogram.observe(0.05, op="get")
+    histogram.observe(0.5, op="get")
+
+    text = registry.render()
+
+    assert '# TYPE jobs_total counter\njobs_total{queue="a\\"b"} 2.0' in text
+    assert "depth 3.0" in text
+    assert 'latency_seconds_bucket{op="get",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{op="get",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{op="get",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{op="get"} 2' in text
+    assert registry.counter("jobs_total", "Jobs.", ["queue"]).value(queue='a"b') == 2
+    with pytest.raises(ValueError):
+        registry.gauge("jobs_total", "Jobs.")
+    with pytest.raises(ValueError):
+        histogram.observe(1, wrong="label")
+
+
+def test_registry_runs_collectors():
+    """Test that collectors refresh gauges before every render."""
+    registry = Registry()
+    gauge = registry.gauge("size", "Size.")
+    sizes = iter([1, 2])
+    registry.set_collector("size", lambda: gauge.set(next(sizes)))
+
+    assert "size 1.0" in registry.render()
+    assert "size 2.0" in registry.render()
+    registry.set_collector("size", None)
+    assert "size 2.0" in registry.render()
+
+
+def test_estimate_cost():
+    """Test pricing by exact model name and dated snapshot prefix."""
+    assert estimate_cost("gpt-4o", 1_000_000, 1_000_000) == pytest.approx(12.5)
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000) == pytest.approx(0.15)
+    assert estimate_cost("unknown-model", 10, 10) is None
+
+
+def _completion(content, prompt_tokens=10, completion_tokens=5):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_agent_records_latency_tokens_cost_and_cache_hits():
+    """Test that chat calls publish latency, usage, cost and cache metrics."""
+    model = "gpt-4o-metrics-test"
+    agent = OpenAIAgent(api_key="test-key", model=model, cache=ResponseCache())
+    await agent.initialize()
+    labels = {"agent": "openai", "method": "summarize_content", "model": model}
+    with patch.object(
+        agent.client.chat.completions, "create", new_callable=AsyncMock
+    ) as mock_create:
+        mock_create.return_value = _completion("Summary")
+        await agent.summarize_content("text")
+        await agent.summarize_content("text")
+    await agent.cleanup()
+
+    assert AGENT_LATENCY.count(**labels) == 1
+    assert AGENT_REQUESTS.value(**labels, outcome="ok") == 1
+    assert AGENT_REQUESTS.value(**labels, outcome="cached") == 1
+    assert AGENT_TOKENS.value(model=model, direction="input") == 10
+    assert AGENT_TOKENS.value(model=model, direction="output") == 5
+    assert AGENT_COST.value(model=model) == pytest.approx(estimate_cost("gpt-4o", 10, 5))
+    assert CACHE_HIT_RATIO.value(cache="openai_responses") == 0.5
+
+
+@pytest.mark.asyncio
+async def test_agent_counts_retries_and_errors():
+    """Test that retried and failed calls are counted."""
+    model = "gpt-4o-retry-metrics-test"
+    agent = OpenAIAgent(api_key="test-key", model=model, max_retries=1)
+    await agent.initialize()
+    error = InternalServerError(
+        "boom", response=MagicMock(status_code=500, headers={}), body=None
+    )
+    retries_before = RETRIES.value(component="openai", operation="generate_questions")
+    with patch.object(
+        agent.client.chat.completions, "create", new_callable=AsyncMock, side_effect=error
+    ), patch("topic_insights.agents.ratelimit.asyncio.sleep", new_callable=AsyncMock):
+        with pytest.raises(InternalServerError):
+            await agent.generate_questions("text")
+    await agent.cleanup()
+
+    labels = {"agent": "openai", "method": "generate_questions", "model": model}
+    assert AGENT_REQUESTS.value(**labels, outcome="error") == 1
+    assert RETRIES.value(component="openai", operation="generate_questions") == retries_before + 1
+
+
+@pytest.mark.asyncio
+async def test_supabase_queries_are_timed():
+    """Test that service queries record latency and failures."""
+    service = SupabaseService(
+        SupabaseConfig(url="http://localhost", key="test-key"), client=MagicMock()
+    )
+    service.client.table.return_value.select.return_value.limit.return_value.execute = AsyncMock(
+        side_effect=RuntimeError("down")
+    )
+    count_before = DB_LATENCY.count(operation="health_check")
+    errors_before = DB_ERRORS.value(operation="health_check")
+
+    assert await service.health_check() is False
+
+    assert DB_LATENCY.count(operation="health_check") == count_before + 1
+    # health_check handles the failure itself, so it is not a failed query.
+    assert DB_ERRORS.value(operation="health_check") == errors_before
+
+
+@pytest.mark.asyncio
+async def test_client_manager_probes_upstreams():
+    """Test that probes report unconfigured, healthy and unhealthy upstreams."""
+    manager = ClientManager(openai_api_key="test-key", openai_pool=PoolSettings(http2=False))
+    await manager.start()
+    try:
+        with patch.object(manager.openai.models, "list", new_callable=AsyncMock):
+            probes = await manager.probe()
+        assert probes["database"] == {"status": "not_configured", "latency_ms": None}
+        assert probes["llm"]["status"] == "healthy"
+
+        with patch.object(
+            manager.openai.models, "list", new_callable=AsyncMock, side_effect=RuntimeError
+        ):
+            probes = await manager.probe()
+        assert probes["llm"]["status"] == "unhealthy"
+    finally:
+        await manager.close()
+
+
+def test_metrics_endpoint():
+    """Test that /metrics serves the registry, including request timings."""
+    with TestClient(app) as client:
+        client.get("/")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_seconds_count{method="GET",route="/",status="200"}' in response.text
+    assert "# TYPE agent_request_seconds histogram" in response.text
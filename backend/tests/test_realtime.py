@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from topic_insights.main import app
+from topic_insights.realtime import DISCONNECT, ChangeEvent, RealtimeHub
+
+
+def _event(topic_id="t1", record_id="s1", table="summaries", content="v1"):
+    return ChangeEvent(table, "UPDATE", topic_id, record_id, {"content": content})
+
+
+@pytest.mark.asyncio
+async def test_publish_filters_by_topic():
+    """Test that subscribers only receive their topics' events."""
+    hub = RealtimeHub()
+    t1 = hub.subscribe(["t1"])
+    everything = hub.subscribe()
+
+    hub.publish(_event("t1"))
+    hub.publish(_event("t2", record_id="s2"))
+
+    assert (await t1.get()).topic_id == "t1"
+    assert t1.pending == 0
+    assert everything.pending == 2
+
+
+@pytest.mark.asyncio
+async def test_bursty_updates_are_coalesced():
+    """Test that repeated updates to one row collapse to the latest."""
+    hub = RealtimeHub()
+    subscription = hub.subscribe(["t1"])
+
+    for i in range(5):
+        hub.publish(_event(content=f"v{i}"))
+    hub.publish(_event(record_id="s2"))
+
+    first = await subscription.get()
+    assert first.record == {"content": "v4"}
+    assert (await subscription.get()).record_id == "s2"
+    assert subscription.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy():
+    """Test that a full buffer drops its oldest event."""
+    hub = RealtimeHub(max_pending=2)
+    subscription = hub.subscribe(["t1"])
+
+    for i in range(3):
+        hub.publish(_event(record_id=f"s{i}"))
+
+    assert subscription.dropped == 1
+    assert [(await subscription.get()).record_id for _ in range(2)] == ["s1", "s2"]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_consumers():
+    """Test that slow consumers are disconnected and unsubscribed."""
+    hub = RealtimeHub(max_pending=1, policy=DISCONNECT)
+    subscription = hub.subscribe(["t1"])
+
+    hub.publish(_event(record_id="s1"))
+    hub.publish(_event(record_id="s2"))
+
+    assert subscription.closed
+    assert subscription.close_reason == "slow consumer"
+    assert await subscription.get() is None
+    assert hub.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_get_waits_for_events():
+    """Test that a waiting consumer is woken by a publish."""
+    hub = RealtimeHub()
+    subscription = hub.subscribe(["t1"])
+
+    waiter = asyncio.create_task(subscription.get())
+    await asyncio.sleep(0)
+    hub.on_change("topics", "UPDATE", {"id": "t1", "name": "AI"})
+
+    event = await asyncio.wait_for(waiter, 1)
+    assert (event.table, event.topic_id, event.record_id) == ("topics", "t1", "t1")
+
+
+def test_websocket_receives_topic_changes() -> None:
+    """Test that WebSocket clients receive changes for their topic only."""
+    hub = app.state.realtime_hub
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/v1/ws/topics?topic_id=t1") as websocket:
+            for record in ({"id": "s9", "topic_id": "t2"}, {"id": "s1", "topic_id": "t1"}):
+                websocket.portal.call(hub.on_change, "summaries", "INSERT", record)
+
+            message = websocket.receive_json()
+
+    assert message["topic_id"] == "t1"
+    assert message["record_id"] == "s1"
+    assert message["type"] == "INSERT"
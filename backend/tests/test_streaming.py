@@ -0,0 +1,99 @@
+from fastapi.testclient import TestClient
+from starlette import status
+
+from topic_insights.api.dependencies import get_agent
+from topic_insights.main import app
+from topic_insights.models.agents import Entity
+
+
+class StreamingStubAgent:
+    """Agent stub that streams fixed deltas."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.closed = False
+
+    async def stream_analyze_topic(self, topic, context=None):
+        try:
+            for delta in ["Main ", "themes: ", topic]:
+                yield delta
+        finally:
+            self.closed = True
+
+    async def stream_summarize_content(self, content, max_length=None):
+        yield "Short "
+        if self.fail:
+            raise RuntimeError("upstream failure")
+        yield "summary"
+
+    async def stream_extract_entities(self, content):
+        yield Entity(entity="EU", category="Organizations", relevance=0.8)
+
+
+def _client(agent) -> TestClient:
+    app.dependency_overrides[get_agent] = lambda: agent
+    return TestClient(app)
+
+
+def _events(body: str) -> list[str]:
+    return [event for event in body.split("\n\n") if event]
+
+
+def test_stream_topic_analysis() -> None:
+    """Test that analysis deltas are streamed as SSE events."""
+    agent = StreamingStubAgent()
+    try:
+        response = _client(agent).post("/api/v1/analyze/stream", json={"topic": "AI"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _events(response.text) == [
+        'data: {"delta": "Main "}',
+        'data: {"delta": "themes: "}',
+        'data: {"delta": "AI"}',
+        "event: done\ndata: {}",
+    ]
+    assert agent.closed
+
+
+def test_stream_summary_reports_errors() -> None:
+    """Test that upstream failures end the stream with an error event."""
+    try:
+        response = _client(StreamingStubAgent(fail=True)).post(
+            "/api/v1/summarize/stream", json={"content": "Long content"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    events = _events(response.text)
+    assert events[0] == 'data: {"delta": "Short "}'
+    assert events[-1] == 'event: error\ndata: {"error": "upstream failure"}'
+
+
+def test_stream_summary_validates_body() -> None:
+    """Test that empty content is rejected."""
+    try:
+        response = _client(StreamingStubAgent()).post(
+            "/api/v1/summarize/stream", json={"content": ""}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 422
+
+
+def test_stream_entities_sends_one_object_per_event() -> None:
+    """Test that streamed entities are encoded as JSON objects."""
+    try:
+        response = _client(StreamingStubAgent()).post(
+            "/api/v1/entities/stream", json={"content": "The EU met."}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert _events(response.text) == [
+        'data: {"delta": {"entity": "EU", "category": "Organizations", "relevance": 0.8}}',
+        "event: done\ndata: {}",
+    ]